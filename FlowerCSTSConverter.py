@@ -3,11 +3,18 @@ FlowerCSTSConverter - Simplified/Traditional Chinese Text Converter
 Uses OpenCC library to convert between Simplified and Traditional Chinese with Taiwan localization.
 """
 
-import sys
-import subprocess
+import os
+import time
+import asyncio
+import threading
 import importlib
+import importlib.util
 from server import PromptServer
 from aiohttp import web
+from .io_executor import coalesce, run_io
+from .node_metrics import add_bytes_read
+from .result_memo import content_key, memoize, tree_signature
+from .opencc_worker import convert_file, create_converter, split_line_chunks as _split_line_chunks
 
 # Config mappings for OpenCC
 CONFIG_MAPPINGS = {
@@ -15,12 +22,51 @@ CONFIG_MAPPINGS = {
     "Simplified -> Traditional (TW)": "s2twp"
 }
 
-# Try to import opencc, set flag if successful
-try:
-    import opencc
-    HAS_OPENCC = True
-except ImportError:
-    HAS_OPENCC = False
+# When to load all converters ahead of time: "import", "first_use" or "off"
+PREWARM = os.environ.get("FLOWER_TOOLS_OPENCC_PREWARM", "off").strip().lower()
+
+# opencc is imported on first use (see _import_opencc) to keep node registration fast.
+# HAS_OPENCC is None until the first import attempt, then True/False.
+opencc = None
+HAS_OPENCC = None
+
+
+def _import_opencc():
+    """
+    Import opencc on first use and cache the module.
+    
+    Returns:
+        The opencc module, or None if it is not installed
+    """
+    global opencc, HAS_OPENCC
+    if opencc is None and HAS_OPENCC is not False:
+        try:
+            opencc = importlib.import_module("opencc")
+            HAS_OPENCC = True
+        except ImportError:
+            HAS_OPENCC = False
+    return opencc
+
+def _conversion_key(text_input="", conversion_mode="", text_list=None, source_directory="", output_directory=""):
+    """
+    Content key of a text/list conversion, or None when it must not be memoized.
+
+    Directory mode writes files, so it always runs; its IS_CHANGED key covers
+    the mtime/size of every source file instead.
+    """
+    if source_directory.strip() or _import_opencc() is None:
+        return None
+    return content_key(text_input, conversion_mode, text_list)
+
+
+def _directory_key(source_directory, conversion_mode, output_directory):
+    src = os.path.abspath(source_directory.strip())
+    try:
+        sources = tree_signature(src)
+    except OSError:
+        sources = None
+    return content_key(_import_opencc() is not None, src, conversion_mode, os.path.abspath(output_directory.strip()), sources)
+
 
 class FlowerCSTSConverter:
     """
@@ -38,149 +84,506 @@ class FlowerCSTSConverter:
                     {"default": "Traditional (TW) -> Simplified"}
                 ),
             },
+            "optional": {
+                # List mode: e.g. the LIST output of FlowerListOfStrings
+                "text_list": ("LIST",),
+                # Directory mode: convert every .txt under source into a mirrored output tree
+                "source_directory": ("STRING", {"default": ""}),
+                "output_directory": ("STRING", {"default": ""}),
+            },
         }
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("text_output",)
+    RETURN_TYPES = ("STRING", "LIST")
+    RETURN_NAMES = ("text_output", "text_list")
     FUNCTION = "convert_text"
     CATEGORY = "flower-tools"
     OUTPUT_NODE = True
 
-    def convert_text(self, text_input, conversion_mode):
+    @classmethod
+    def IS_CHANGED(s, **kwargs):
+        source_directory = kwargs.get("source_directory") or ""
+        if source_directory.strip():
+            # 來源檔案有變動時才重新轉換整個目錄
+            return _directory_key(source_directory, kwargs.get("conversion_mode", ""), kwargs.get("output_directory") or "") or ""
+        # opencc 安裝完成後 key 也會改變，不會沿用「未安裝」的錯誤結果
+        return content_key(_import_opencc() is not None, kwargs.get("text_input"), kwargs.get("conversion_mode"), kwargs.get("text_list")) or ""
+
+    @memoize("FlowerCSTSConverter", _conversion_key, cache_if=lambda out: not out["result"][0].startswith("Error"))
+    def convert_text(self, text_input, conversion_mode, text_list=None, source_directory="", output_directory=""):
         """
         Convert text between Simplified and Traditional Chinese.
         
+        Modes, in order of precedence:
+            source_directory set: convert a whole wildcard directory to output_directory
+            text_list connected: convert every item of the list
+            otherwise: convert text_input
+        
+        Large inputs are split into line-aligned chunks and converted in parallel.
+        
         Args:
             text_input: Input text to convert
             conversion_mode: Conversion direction (see CONFIG_MAPPINGS)
+            text_list: Optional list of strings to convert
+            source_directory: Optional wildcard directory to convert
+            output_directory: Destination for directory mode
             
         Returns:
             Dictionary with UI display and result tuple
         """
-        if not HAS_OPENCC:
+        if _import_opencc() is None:
             error_msg = "Error: opencc not installed. Please use the Install button below. OPENCC套件尚未安裝，請點擊下方的 Install_btn 按鈕進行安裝。"
-            return {"ui": {"text": [error_msg]}, "result": ("Error: opencc missing",)}
+            return {"ui": {"text": [error_msg]}, "result": ("Error: opencc missing", [])}
         
         try:
             config_base = CONFIG_MAPPINGS[conversion_mode]
-            converter = self._create_converter(config_base)
+            # Load here so a bad config fails before any work is handed to the workers
+            _get_converter(config_base)
             
-            result = converter.convert(text_input)
-            return {"ui": {"text": [result]}, "result": (result,)}
+            start = time.perf_counter()
+            if source_directory.strip():
+                written = convert_directory(config_base, source_directory.strip(), output_directory.strip())
+                result_list = written
+                result = f"Converted {len(written)} files to {os.path.abspath(output_directory.strip())}"
+            elif text_list is not None:
+                result_list = convert_many(config_base, [str(t) for t in text_list])
+                result = "\n".join(result_list)
+            else:
+                result = convert_many(config_base, [text_input])[0]
+                result_list = [result]
+            _record_conversion(config_base, time.perf_counter() - start)
+            return {"ui": {"text": [result]}, "result": (result, result_list)}
         except Exception as e:
             error_msg = f"Error: {str(e)}"
-            return {"ui": {"text": [error_msg]}, "result": (error_msg,)}
+            return {"ui": {"text": [error_msg]}, "result": (error_msg, [])}
 
-    def _create_converter(self, config_base):
-        """
-        Create OpenCC converter instance with fallback for different versions.
+
+# --- Parallel Chunked Conversion ---
+# OpenCC segments text with dictionaries whose entries never span a newline,
+# so converting line-aligned chunks separately gives the same output as
+# converting the whole text. opencc-python-reimplemented is pure Python and
+# holds the GIL, so threads cannot run chunks side by side: large jobs go to
+# a pool of standalone worker processes (opencc_worker.py). They are started
+# with the first large job and kept for later ones, so each loads its
+# dictionaries once; ComfyUI itself is never forked.
+
+# Target characters per chunk
+CHUNK_CHARS = 256 * 1024
+# Smaller jobs (characters, or bytes in directory mode) convert in this process;
+# sending chunks to the workers would cost more than it saves
+PARALLEL_MIN_CHARS = 2 * CHUNK_CHARS
+
+try:
+    MAX_WORKERS = max(1, int(os.environ.get("FLOWER_TOOLS_OPENCC_WORKERS", os.cpu_count() or 1)))
+except ValueError:
+    MAX_WORKERS = os.cpu_count() or 1
+
+_worker_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_worker_pool():
+    """Return the shared worker pool, created on first use next to the loaded opencc."""
+    global _worker_pool
+    with _pool_lock:
+        if _worker_pool is None:
+            from .opencc_worker import start_pool
+            # 工作行程從 opencc 所在的目錄匯入，剛安裝在其他 site 目錄的套件也找得到
+            site_dir = os.path.dirname(os.path.dirname(os.path.abspath(opencc.__file__)))
+            _worker_pool = start_pool(MAX_WORKERS, [site_dir])
+        return _worker_pool
+
+
+def _close_worker_pool():
+    global _worker_pool
+    with _pool_lock:
+        pool, _worker_pool = _worker_pool, None
+    if pool is not None:
+        pool.close()
+
+
+def split_line_chunks(text, chunk_chars=CHUNK_CHARS):
+    """
+    Split text into chunks of roughly `chunk_chars` characters, cut only after a newline.
+    
+    Args:
+        text: Text to split
+        chunk_chars: Target chunk size in characters
         
-        Args:
-            config_base: Base config name (e.g., 'tw2sp', 's2twp')
-            
-        Returns:
-            OpenCC converter instance
-            
-        Raises:
-            Exception: If converter creation fails with all options
-        """
-        # Try with and without .json extension to support different OpenCC versions
-        # opencc-python-reimplemented adds .json automatically
-        # standard opencc often requires the .json extension
-        options = [config_base, config_base + '.json']
+    Returns:
+        List of chunks whose concatenation equals `text`
+    """
+    return _split_line_chunks(text, chunk_chars)
+
+
+def convert_many(config_base, texts, chunk_chars=CHUNK_CHARS):
+    """
+    Convert a list of texts, chunking large ones and running chunks in parallel.
+    
+    Args:
+        config_base: Base config name (e.g., 'tw2sp', 's2twp')
+        texts: List of strings
+        chunk_chars: Target chunk size in characters
         
-        last_error = ""
-        for opt in options:
+    Returns:
+        List of converted strings, in input order
+    """
+    # (text index, chunk) pairs, so results can be stitched back in order
+    jobs = []
+    for i, text in enumerate(texts):
+        jobs.extend((i, chunk) for chunk in split_line_chunks(text, chunk_chars))
+
+    chunks = [chunk for _, chunk in jobs]
+    if len(chunks) <= 1 or MAX_WORKERS == 1 or sum(map(len, chunks)) < PARALLEL_MIN_CHARS:
+        converter = _get_converter(config_base)
+        converted = [converter.convert(chunk) for chunk in chunks]
+    else:
+        converted = _get_worker_pool().map("chunk", config_base, [(chunk,) for chunk in chunks])
+
+    parts = [[] for _ in texts]
+    for (i, _), out in zip(jobs, converted):
+        parts[i].append(out)
+    return ["".join(p) for p in parts]
+
+
+def convert_directory(config_base, source_directory, output_directory):
+    """
+    Convert every .txt file under a directory into a mirrored output tree.
+    
+    Files are converted in parallel; relative paths and file names are kept.
+    
+    Args:
+        config_base: Base config name (e.g., 'tw2sp', 's2twp')
+        source_directory: Wildcard directory to read
+        output_directory: Directory to write converted files to
+        
+    Returns:
+        List of written file paths
+        
+    Raises:
+        Exception: If a directory is missing or both paths are the same
+    """
+    src = os.path.abspath(source_directory)
+    if not os.path.isdir(src):
+        raise Exception(f"Directory not found: {src}")
+    if not output_directory:
+        raise Exception("output_directory is required for directory mode")
+    dst = os.path.abspath(output_directory)
+    if dst == src:
+        raise Exception("output_directory must differ from source_directory")
+
+    # Collect sources before writing, so an output tree inside the source is not re-read
+    sources = []
+    for root, dirs, files in os.walk(src):
+        if os.path.abspath(root) == dst or os.path.abspath(root).startswith(dst + os.sep):
+            dirs[:] = []
+            continue
+        dirs.sort()
+        sources.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(".txt"))
+
+    targets = [os.path.join(dst, os.path.relpath(path, src)) for path in sources]
+    # Files are read on the workers; report their size from the calling thread
+    total_bytes = sum(os.path.getsize(p) for p in sources)
+    add_bytes_read(total_bytes)
+    if len(sources) <= 1 or MAX_WORKERS == 1 or total_bytes < PARALLEL_MIN_CHARS:
+        converter = _get_converter(config_base)
+        return [convert_file(converter, p, t, CHUNK_CHARS) for p, t in zip(sources, targets)]
+    return _get_worker_pool().map("file", config_base, [(p, t, CHUNK_CHARS) for p, t in zip(sources, targets)])
+
+
+# --- Converter Pool ---
+# Loading OpenCC dictionaries from disk dominates node time, so each config is
+# built once per process and shared by every node instance and thread.
+
+_converters = {}
+_converter_lock = threading.Lock()
+_load_locks = {}  # config_base -> Lock, so loading one config does not block another
+_stats_lock = threading.Lock()
+_converter_stats = {}
+_prewarm_started = False
+
+
+def _create_converter(config_base):
+    """Create a converter with the currently imported opencc (see opencc_worker.create_converter)."""
+    return create_converter(opencc, config_base)
+
+
+def _get_converter(config_base):
+    """
+    Return the shared converter for a config, loading it on first use.
+    
+    Args:
+        config_base: Base config name (e.g., 'tw2sp', 's2twp')
+        
+    Returns:
+        Cached OpenCC converter instance
+    """
+    converter = _converters.get(config_base)
+    if converter is not None:
+        return converter
+
+    with _converter_lock:
+        load_lock = _load_locks.setdefault(config_base, threading.Lock())
+
+    with load_lock:
+        converter = _converters.get(config_base)
+        if converter is None:
+            start = time.perf_counter()
+            converter = _create_converter(config_base)
+            load_ms = (time.perf_counter() - start) * 1000
+            with _stats_lock:
+                _converter_stats[config_base] = {"load_ms": load_ms, "calls": 0, "total_ms": 0.0, "last_ms": 0.0}
+            _converters[config_base] = converter
+            print(f"--- Flower Tools: OpenCC '{config_base}' loaded in {load_ms:.1f} ms ---")
+
+    if PREWARM == "first_use":
+        prewarm_converters(background=True)
+    return converter
+
+
+def _record_conversion(config_base, seconds):
+    """Accumulate per-call conversion time for a config."""
+    with _stats_lock:
+        stats = _converter_stats.get(config_base)
+        if stats is not None:
+            stats["calls"] += 1
+            stats["last_ms"] = seconds * 1000
+            stats["total_ms"] += seconds * 1000
+
+
+def converter_stats():
+    """
+    Return load and conversion timings per config.
+    
+    Returns:
+        Dictionary of config name -> timing info (load_ms, calls, total_ms, last_ms, avg_ms)
+    """
+    with _stats_lock:
+        report = {}
+        for config_base, stats in _converter_stats.items():
+            entry = dict(stats)
+            entry["avg_ms"] = stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0
+            report[config_base] = entry
+        return report
+
+
+def prewarm_converters(background=False):
+    """
+    Load every config in CONFIG_MAPPINGS ahead of the first conversion.
+    
+    Args:
+        background: Load on a daemon thread instead of blocking the caller
+    """
+    global _prewarm_started
+    if _prewarm_started:
+        return
+    _prewarm_started = True
+
+    def _load_all():
+        # Importing opencc happens here too, so prewarm at import stays off the startup path
+        if _import_opencc() is None:
+            return
+        for config_base in CONFIG_MAPPINGS.values():
             try:
-                converter = opencc.OpenCC(opt)
-                # Test conversion to ensure config is valid
-                converter.convert("test")
-                return converter
+                _get_converter(config_base)
             except Exception as e:
-                last_error = str(e)
-                continue
-        
-        raise Exception(f"Failed to load OpenCC config '{config_base}'. Last error: {last_error}")
+                print(f"--- Flower Tools: OpenCC prewarm of '{config_base}' failed: {e} ---")
+
+    if background:
+        threading.Thread(target=_load_all, name="flower-opencc-prewarm", daemon=True).start()
+    else:
+        _load_all()
 
 
 # --- API Endpoints ---
 
+# --- Install / Status ---
+# pip runs as an asyncio subprocess job (pip_jobs.py): the event loop stays
+# free, every log line is pushed to the browser over the websocket as
+# "flower-tools.opencc-install", and a finished install is picked up without
+# restarting ComfyUI.
+
+# Packages tried in order; override (e.g. with a local wheel path) through FLOWER_TOOLS_OPENCC_PACKAGES
+OPENCC_PACKAGES = [p.strip() for p in os.environ.get("FLOWER_TOOLS_OPENCC_PACKAGES", "opencc,opencc-python-reimplemented").split(",") if p.strip()]
+
+try:
+    INSTALL_TIMEOUT = float(os.environ.get("FLOWER_TOOLS_PIP_TIMEOUT", 900))
+except ValueError:
+    INSTALL_TIMEOUT = 900.0
+
+_install_jobs = None  # PipJobs, created (and pip_jobs imported) on first use
+_opencc_status = None  # cached result of _find_opencc
+
+
+def _get_install_jobs():
+    global _install_jobs
+    if _install_jobs is None:
+        from .pip_jobs import PipJobs
+        _install_jobs = PipJobs()
+    return _install_jobs
+
+
+def reload_opencc():
+    """
+    Forget the cached import result and import opencc again.
+
+    Lets a package installed while ComfyUI is running be used right away.
+
+    Returns:
+        True if opencc is importable now
+    """
+    global opencc, HAS_OPENCC, _opencc_status
+    importlib.invalidate_caches()
+    # 工作行程仍載入舊的 opencc，下次大型轉換時重新啟動
+    _close_worker_pool()
+    with _converter_lock:
+        opencc = None
+        HAS_OPENCC = None
+        _converters.clear()
+    with _stats_lock:
+        _converter_stats.clear()
+    _opencc_status = None
+    return _import_opencc() is not None
+
+
 @PromptServer.instance.routes.get("/flower-tools/check-opencc")
 async def check_opencc(request):
-    """Check if OpenCC library is installed and return its location."""
+    """
+    Check if OpenCC library is installed and return its location.
+
+    The answer is cached until an install job finishes; pass refresh=1 to look again.
+    """
+    global _opencc_status
+    refresh = request.query.get("refresh", "0") == "1"
     try:
-        importlib.invalidate_caches()
-        spec = importlib.util.find_spec("opencc")
-        
-        if spec is not None:
-            # Get installation location
-            location = _get_install_location().strip()
-            return web.json_response({
-                "installed": True, 
-                "location": location if location else "Location unavailable"
-            })
-        else:
-            return web.json_response({"installed": False, "location": ""})
+        if _opencc_status is None or refresh:
+            # Import-system and site-packages lookups touch the disk; keep them off the event loop
+            _opencc_status = await coalesce(("check-opencc", refresh), lambda: run_io(_find_opencc, refresh))
+        status = dict(_opencc_status)
+        job = _get_install_jobs().running("opencc")
+        status["job"] = job.to_dict() if job is not None else None
+        return web.json_response(status)
+    except asyncio.TimeoutError:
+        return web.json_response({"error": "Timed out"}, status=504)
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
 
 
-@PromptServer.instance.routes.post("/flower-tools/install-opencc")
-async def install_opencc(request):
+def _find_opencc(refresh=False):
     """
-    Install OpenCC library with automatic fallback.
-    Tries 'opencc' first, falls back to 'opencc-python-reimplemented' if build fails.
+    Look up whether opencc is importable.
+
+    Args:
+        refresh: Invalidate the import system's directory caches first
+
+    Returns:
+        Dictionary with "installed" flag, whether it is "loaded" and install "location"
     """
-    try:
-        # 1. Try installing standard 'opencc'
-        print("--- Flower Tools: Attempting to install 'opencc' ---")
-        result = _install_package("opencc")
-        
-        final_log = f"--- opencc install log ---\n{result.stdout}\n{result.stderr}\n"
-        success = result.returncode == 0
+    if refresh:
+        importlib.invalidate_caches()
+    spec = importlib.util.find_spec("opencc")
+    
+    if spec is not None:
+        # Get installation location
+        location = _get_install_location().strip()
+        return {
+            "installed": True, 
+            "loaded": bool(HAS_OPENCC),
+            "location": location if location else "Location unavailable"
+        }
+    return {"installed": False, "loaded": False, "location": ""}
 
-        # 2. If failed, try 'opencc-python-reimplemented' (Common fix for Windows)
-        if not success:
-            print("--- Flower Tools: 'opencc' failed. Attempting 'opencc-python-reimplemented' ---")
-            final_log += "\n'opencc' installation failed. Retrying with 'opencc-python-reimplemented'...\n"
-            
-            result = _install_package("opencc-python-reimplemented")
-            final_log += f"--- opencc-python-reimplemented install log ---\n{result.stdout}\n{result.stderr}\n"
-            success = result.returncode == 0
-
-        if success:
-            print("--- Flower Tools: Installation Successful ---")
-            final_log += _get_install_location()
-            return web.json_response({"success": True, "log": final_log})
-        else:
-            print("--- Flower Tools: Installation FAILED ---")
-            return web.json_response({"success": False, "log": final_log})
-            
+
+def _push_install_line(job, line):
+    PromptServer.instance.send_sync("flower-tools.opencc-install", {"job_id": job.id, "line": line})
+
+
+def _install_finished(job):
+    global _opencc_status
+    _opencc_status = None
+    if not job.succeeded:
+        _publish_install_done(job, False)
+        return
+    # 🌸 安裝完成後直接重新載入 opencc，不必重新啟動 ComfyUI；匯入會讀取磁碟，改在 I/O 執行緒進行 🌸
+    task = asyncio.ensure_future(_reload_after_install(job))
+    _reload_tasks[job.id] = task
+    task.add_done_callback(lambda _: _reload_tasks.pop(job.id, None))
+
+
+_reload_tasks = {}  # job id -> task reloading opencc after that install
+
+
+async def _reload_after_install(job):
+    try:
+        loaded, location = await run_io(lambda: (reload_opencc(), _get_install_location().strip()), timeout=None)
+        job.emit(f"{location} (opencc loaded: {loaded})")
     except Exception as e:
-        print(f"--- Flower Tools: Critical Error ---\n{str(e)}")
-        return web.json_response({"success": False, "log": str(e)}, status=500)
+        loaded = False
+        job.emit(f"Error: reloading opencc failed: {e}")
+    _publish_install_done(job, loaded)
 
 
-def _install_package(package_name):
+def _publish_install_done(job, loaded):
+    print(f"--- Flower Tools: OpenCC installation {job.state} ---")
+    PromptServer.instance.send_sync("flower-tools.opencc-install", dict(job.to_dict(), done=True, loaded=loaded))
+
+
+@PromptServer.instance.routes.post("/flower-tools/install-opencc")
+async def install_opencc(request):
     """
-    Install a Python package using pip.
-    
-    Args:
-        package_name: Name of the package to install
-        
-    Returns:
-        subprocess.CompletedProcess with stdout/stderr
+    Start installing OpenCC in the background and return the job at once.
+
+    Tries each of OPENCC_PACKAGES in order ('opencc', then 'opencc-python-reimplemented'
+    as the common fix for Windows). Only one install runs at a time; a second request
+    returns the running job.
+
+    Body (optional JSON):
+        timeout: seconds before the job is cancelled (default FLOWER_TOOLS_PIP_TIMEOUT)
+        wait: true to answer only when the job has finished, with the old {"success", "log"} fields
     """
-    print(f"Installing {package_name}...")
-    cmd = [sys.executable, "-m", "pip", "install", package_name]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    # Print to console for user visibility
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr, file=sys.stderr)
-    
-    return result
+    try: body = await request.json()
+    except: body = {}
+
+    try:
+        timeout = float(body.get("timeout", INSTALL_TIMEOUT))
+    except (TypeError, ValueError):
+        return web.json_response({"error": "timeout must be a number"}, status=400)
+
+    print(f"--- Flower Tools: Attempting to install {' / '.join(OPENCC_PACKAGES)} ---")
+    job, started = _get_install_jobs().start("opencc", OPENCC_PACKAGES, timeout if timeout > 0 else None,
+                                       on_line=_push_install_line, on_done=_install_finished)
+
+    if body.get("wait"):
+        await job.wait()
+        reload = _reload_tasks.get(job.id)
+        if reload is not None:
+            await asyncio.shield(reload)
+        log, _ = job.log()
+        return web.json_response(dict(job.to_dict(), success=job.succeeded, log="\n".join(log)))
+    return web.json_response(dict(job.to_dict(), started=started), status=202)
+
+
+@PromptServer.instance.routes.get("/flower-tools/install-opencc/{job_id}")
+async def install_opencc_status(request):
+    """Return an install job's state and its log from line `since` (default 0)."""
+    job = _get_install_jobs().get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"error": "Unknown job"}, status=404)
+    try:
+        since = max(0, int(request.query.get("since", 0)))
+    except ValueError:
+        return web.json_response({"error": "since must be an integer"}, status=400)
+    return web.json_response(job.to_dict(since))
+
+
+@PromptServer.instance.routes.post("/flower-tools/install-opencc/{job_id}/cancel")
+async def cancel_install_opencc(request):
+    job = _get_install_jobs().get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"error": "Unknown job"}, status=404)
+    cancelled = job.cancel()
+    if cancelled:
+        await job.wait()
+    return web.json_response(dict(job.to_dict(), cancelled=cancelled))
 
 
 def _get_install_location():
@@ -194,11 +597,20 @@ def _get_install_location():
         import site
         loc = site.getsitepackages()[0]
         msg = f"\nInstalled to: {loc}"
-        print(msg)
         return msg
     except:
         return ""
 
 
+@PromptServer.instance.routes.get("/flower-tools/opencc-stats")
+async def opencc_stats(request):
+    """Report dictionary load time and per-call conversion time of cached converters."""
+    return web.json_response({"installed": bool(HAS_OPENCC), "converters": converter_stats()})
+
+
+if PREWARM == "import":
+    prewarm_converters(background=True)
+
+
 NODE_CLASS_MAPPINGS = {"FlowerCSTSConverter": FlowerCSTSConverter}
 NODE_DISPLAY_NAME_MAPPINGS = {"FlowerCSTSConverter": "🌸Flower CSTS Converter"}
@@ -1,4 +1,12 @@
 import datetime
+import hashlib
+from .filename_template import TIME_TOKENS, compile_template, render, template_tokens
+from .sequence_counter import sequence_counter
+
+# 這些 token 每次執行都會產生不同的值，必須強制重新執行
+VOLATILE_TOKENS = TIME_TOKENS | {"COUNTER"}
+
+_FORMAT_INPUTS = ("FullNameFormat", "PathNameFormat", "FileNameFormat")
 
 class FlowerFileNameCombination:
     @classmethod
@@ -16,14 +24,24 @@ class FlowerFileNameCombination:
                 "FullNameFormat": ("STRING", {"default": "%MainFolderName/%DATE-%SubFolderName/%FileName-%DATETIME-%Suffix"}),
                 "PathNameFormat": ("STRING", {"default": "%MainFolderName/%DATE-%SubFolderName/"}),
                 "FileNameFormat": ("STRING", {"default": "%FileName-%DATETIME-%Suffix"}),
+            },
+            "optional": {
+                # %SEED 與 %PROMPT_HASH 的來源
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+                "prompt": ("STRING", {"default": "", "forceInput": True}),
             }
         }
 
     @classmethod
     def IS_CHANGED(s, **kwargs):
-        # 回傳當前時間戳，強制 ComfyUI 認為節點已改變，從而重新執行並更新時間
-        import time
-        return time.time()
+        # 只有格式中含時間或 %COUNTER 時才強制重新執行；
+        # 其餘情況輸出只取決於輸入，交給 ComfyUI 的快取即可
+        formats = [kwargs.get(name) for name in _FORMAT_INPUTS]
+        if any(not isinstance(fmt, str) for fmt in formats) or template_tokens(*formats) & VOLATILE_TOKENS:
+            # 回傳當前時間戳，強制 ComfyUI 認為節點已改變，從而重新執行並更新時間
+            import time
+            return time.time()
+        return ""
 
     RETURN_TYPES = ("STRING", "STRING", "STRING")
     RETURN_NAMES = ("FullNameOut", "PathNameOut", "FileNameOut")
@@ -32,39 +50,40 @@ class FlowerFileNameCombination:
 
     def process(self, MainFolderName, SubFolderName, same_as_subfolder, FileName, Suffix, 
                 DATE_format, TIME_format, DATETIME_format, 
-                FullNameFormat, PathNameFormat, FileNameFormat, note=""):
+                FullNameFormat, PathNameFormat, FileNameFormat, note="", seed=0, prompt=""):
         
         # Handle same_as_subfolder logic
         actual_file_name = SubFolderName if same_as_subfolder else FileName
         
-        # Get current time
-        now = datetime.datetime.now()
-        
-        # Format time strings
-        date_str = now.strftime(DATE_format)
-        time_str = now.strftime(TIME_format)
-        datetime_str = now.strftime(DATETIME_format)
-        
+        # 格式字串依內容快取解析結果，之後只需一次 join
+        templates = [compile_template(fmt) for fmt in (FullNameFormat, PathNameFormat, FileNameFormat)]
+        used = template_tokens(FullNameFormat, PathNameFormat, FileNameFormat)
+
         # Replacement mapping
-        replacements = {
-            "%MainFolderName": MainFolderName,
-            "%SubFolderName": SubFolderName,
-            "%FileName": actual_file_name,
-            "%Suffix": Suffix,
-            "%DATETIME": datetime_str,
-            "%DATE": date_str,
-            "%TIME": time_str,
+        values = {
+            "MainFolderName": MainFolderName,
+            "SubFolderName": SubFolderName,
+            "FileName": actual_file_name,
+            "Suffix": Suffix,
         }
-        
-        def apply_format(fmt):
-            result = fmt
-            for key, val in replacements.items():
-                result = result.replace(key, val)
-            return result
 
-        full_name_out = apply_format(FullNameFormat)
-        path_name_out = apply_format(PathNameFormat)
-        file_name_out = apply_format(FileNameFormat)
+        # 只計算實際用到的 token (時間格式化、雜湊、計數器)
+        if used & {"DATE", "TIME", "DATETIME"}:
+            # Get current time
+            now = datetime.datetime.now()
+            values["DATE"] = now.strftime(DATE_format)
+            values["TIME"] = now.strftime(TIME_format)
+            values["DATETIME"] = now.strftime(DATETIME_format)
+        if "SEED" in used:
+            values["SEED"] = str(seed)
+        if "PROMPT_HASH" in used:
+            values["PROMPT_HASH"] = hashlib.sha1((prompt or "").encode("utf-8")).hexdigest()
+        if "COUNTER" in used:
+            # 每個輸出目錄各自一組計數器 (跨執行緒、跨行程不重複)，不需掃描目錄
+            scope = render(templates[1], dict(values, COUNTER=""))
+            values["COUNTER"] = str(sequence_counter.next(scope))
+
+        full_name_out, path_name_out, file_name_out = (render(t, values) for t in templates)
         
         return (full_name_out, path_name_out, file_name_out)
 
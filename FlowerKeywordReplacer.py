@@ -1,3 +1,15 @@
+import os
+import time
+from .keyword_matcher import REPLACE_MODES, compile_matcher, parse_pair_lines, replace_sequential, table_cache
+from .result_memo import file_signature
+
+# 相對路徑的替換表以外掛內的 wildcards 目錄為基準
+TABLE_BASE_DIR = os.path.join(os.path.dirname(__file__), "wildcards")
+
+def _table_path(table_file):
+    return table_file if os.path.isabs(table_file) else os.path.join(TABLE_BASE_DIR, table_file)
+
+
 class FlowerKeywordReplacer:
     @classmethod
     def INPUT_TYPES(s):
@@ -11,24 +23,79 @@ class FlowerKeywordReplacer:
         for i in range(1, 11):
             inputs["optional"][f"keyword_{i}"] = ("STRING", {"default": ""})
             inputs["optional"][f"replacement_{i}"] = ("STRING", {"multiline": True, "default": ""})
+
+        # sequential (legacy): 依序逐組 str.replace，後面的關鍵字可能命中前面替換出的文字
+        # simultaneous: 單次掃描同時替換，同一位置以最長關鍵字優先
+        inputs["optional"]["replace_mode"] = (REPLACE_MODES, {"default": REPLACE_MODES[0]})
+        # 超過 10 組時，每行一組 "keyword => replacement"
+        inputs["optional"]["extra_pairs"] = ("STRING", {"multiline": True, "default": ""})
+        # 大型替換表 (.tsv / .csv / .json)，依檔案修改時間快取編譯結果
+        inputs["optional"]["table_file"] = ("STRING", {"default": ""})
             
         return inputs
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("text",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("text", "report")
     FUNCTION = "replace_keywords"
     CATEGORY = "flower-tools"
 
-    def replace_keywords(self, text, **kwargs):
-        result = text
+    @classmethod
+    def IS_CHANGED(s, table_file="", **kwargs):
+        # 其他輸入由 ComfyUI 自行比對；只需反映替換表檔案的修改，不必雜湊整段文字
+        table_file = (table_file or "").strip()
+        return str(file_signature(_table_path(table_file))) if table_file else ""
+
+    def replace_keywords(self, text, replace_mode=REPLACE_MODES[0], extra_pairs="", table_file="", **kwargs):
+        pairs = []
         for i in range(1, 11):
             keyword = kwargs.get(f"keyword_{i}", "")
             replacement = kwargs.get(f"replacement_{i}", "")
             
             if keyword:
-                result = result.replace(keyword, replacement)
+                pairs.append((keyword, replacement))
+        if extra_pairs:
+            pairs.extend(parse_pair_lines(extra_pairs))
+
+        table_file = table_file.strip()
+        if table_file:
+            return self._replace_with_table(text, pairs, replace_mode, table_file)
+
+        start = time.perf_counter()
+        if replace_mode == "simultaneous":
+            # 編譯後的比對器會快取，關鍵字組合不變時不需重新編譯
+            result = compile_matcher(tuple(pairs)).replace(text)
+        else:
+            result = replace_sequential(text, pairs)
+        report = f"{len(pairs)} pairs, {replace_mode}, match {(time.perf_counter() - start) * 1000:.2f} ms"
         
-        return (result,)
+        return (result, report)
+
+    def _replace_with_table(self, text, pairs, replace_mode, table_file):
+        """
+        Apply a replacement table file.
+
+        Table entries are always matched in a single pass so the cost stays linear
+        in the text size however large the table is. In legacy mode the slot pairs
+        are applied sequentially first; in simultaneous mode they are merged into
+        the table matcher and take precedence over table entries.
+        """
+        path = _table_path(table_file)
+        try:
+            if replace_mode == "simultaneous":
+                matcher, info = table_cache.get(path, tuple(pairs))
+            else:
+                text = replace_sequential(text, pairs)
+                matcher, info = table_cache.get(path)
+        except Exception as e:
+            return (text, f"Error: table '{path}': {e}")
+
+        start = time.perf_counter()
+        result = matcher.replace(text)
+        match_ms = (time.perf_counter() - start) * 1000
+
+        source = "cached" if info["cached"] else f"load {info['load_ms']:.2f} ms, compile {info['compile_ms']:.2f} ms"
+        report = f"table {info['pairs']} pairs ({source}), match {match_ms:.2f} ms"
+        return (result, report)
 
 NODE_CLASS_MAPPINGS = {
     "FlowerKeywordReplacer": FlowerKeywordReplacer
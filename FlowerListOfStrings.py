@@ -1,48 +1,105 @@
+import re
+from .text_stream import TEXT_STREAM_TYPE, TextStream
+
+# 固定顯示的文字輸入槽數量；更多的 string_N / list_N 由前端動態新增
+FIXED_SLOTS = 10
+
+_VARIADIC_RE = re.compile(r"(string|list)_(\d+)$")
+
+
+class _VariadicInputs(dict):
+    """
+    Optional inputs that also accept any string_N / list_N added by the frontend.
+
+    ComfyUI looks inputs up with `in` and [] on this mapping, so undeclared
+    slots are still passed to process() instead of being dropped.
+    """
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or bool(_VARIADIC_RE.match(str(key)))
+
+    def __getitem__(self, key):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        m = _VARIADIC_RE.match(str(key))
+        if m is None:
+            raise KeyError(key)
+        if m.group(1) == "list":
+            return ("LIST",)
+        return ("STRING", {"forceInput": True})
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+def _slot_order(kwargs):
+    """Return (kind, number, value) for every string_N / list_N input, in slot order."""
+    slots = []
+    for key, value in kwargs.items():
+        m = _VARIADIC_RE.match(key)
+        if m:
+            # 先依序排列所有 string_N，再接 list_N
+            slots.append((m.group(1) != "string", int(m.group(2)), value))
+    slots.sort(key=lambda s: (s[0], s[1]))
+    return slots
+
+
 class FlowerListOfStrings:
     @classmethod
     def INPUT_TYPES(s):
         inputs = {
-            "optional": {},
+            "optional": _VariadicInputs(),
             "required": {
                 "delimiter": ("STRING", {"default": ""}),
                 "add_newline": ("BOOLEAN", {"default": True})
             }
         }
-        
-        for i in range(1, 11):
+
+        for i in range(1, FIXED_SLOTS + 1):
             inputs["optional"][f"string_{i}"] = ("STRING", {"multiline": True, "default": ""})
-            
+        # 上游的 LIST (如 FlowerMultilinePromptSelector 的 text_list) 會逐項展開
+        inputs["optional"]["list_1"] = ("LIST",)
+        inputs["optional"]["skip_empty"] = ("BOOLEAN", {"default": False})
+        # 關閉時不組出 combined_string (輸出空字串)，超長文字只經由 text_stream 交給 Save Text Stream 寫檔
+        inputs["optional"]["output_string"] = ("BOOLEAN", {"default": True})
+
         return inputs
 
-    RETURN_TYPES = ("STRING", "LIST")
-    RETURN_NAMES = ("combined_string", "string_list")
+    RETURN_TYPES = ("STRING", "LIST", TEXT_STREAM_TYPE)
+    RETURN_NAMES = ("combined_string", "string_list", "text_stream")
     FUNCTION = "process"
     CATEGORY = "flower-tools"
 
-    def process(self, delimiter, add_newline, **kwargs):
+    def process(self, delimiter, add_newline, skip_empty=False, output_string=True, **kwargs):
         # Process the delimiter to handle escaped newlines
         actual_delimiter = delimiter.replace("\\n", "\n")
-        
+        separator = actual_delimiter + "\n" if add_newline else actual_delimiter
+
+        # 固定的 10 個槽即使未傳入也保留 (與舊版相同輸出空字串)
+        for i in range(1, FIXED_SLOTS + 1):
+            kwargs.setdefault(f"string_{i}", "")
+
         string_list = []
-        combined_parts = []
-        
-        for i in range(1, 11):
-            val = kwargs.get(f"string_{i}", "")
-            # Even if empty, we might want to include it if the user intended 10 fixed slots
-            # But usually, it's better to only process non-empty ones or all of them?
-            # The prompt says "固定十個STRING輸入", implying they exist.
-            
-            string_list.append(val)
-            
-            # Combine logic
-            part = val + actual_delimiter
-            if add_newline:
-                part += "\n"
-            combined_parts.append(part)
-            
-        combined_string = "".join(combined_parts)
-        
-        return (combined_string, string_list)
+        append = string_list.append
+        for is_list, _, value in _slot_order(kwargs):
+            if not is_list:
+                value = (value,)
+            elif value is None:
+                continue
+            elif not isinstance(value, (list, tuple)):
+                value = (value,)
+            for v in value:
+                if v is None: v = ""
+                elif not isinstance(v, str): v = str(v)
+                # 空的項目可選擇略過 (預設保留，與舊版相同)
+                if v or not skip_empty: append(v)
+
+        # 每一項後面都接分隔符 (含最後一項)，一次 join 完成，不產生中間字串
+        # stream 持有自己的 tuple，下游修改 string_list 不會影響它
+        stream = TextStream(tuple(string_list), separator, separator)
+        combined_string = str(stream) if output_string else ""
+
+        return (combined_string, string_list, stream)
 
 NODE_CLASS_MAPPINGS = {
     "FlowerListOfStrings": FlowerListOfStrings
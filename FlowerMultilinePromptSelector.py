@@ -1,12 +1,67 @@
 import os
+import re
 import json
-import random
+import asyncio
 from server import PromptServer
 from aiohttp import web
+from .result_memo import content_key, memoize, tree_signature
+from .io_executor import coalesce, run_io
+# 🌸 wildcard_* 輔助模組在第一次使用時才載入，ComfyUI 啟動時只需註冊節點 🌸
+
+_watcher = None
+
+def _get_watcher():
+    """Return the shared wildcard watcher, importing it (and registering the delta listener) on first use."""
+    global _watcher
+    if _watcher is None:
+        from .wildcard_watcher import wildcard_watcher
+        wildcard_watcher.set_listener(_push_wildcard_delta)
+        _watcher = wildcard_watcher
+    return _watcher
+
+def _default_directory(directory):
+    return directory.strip() or os.path.join(os.path.dirname(__file__), "wildcards")
+
+def _selection_key(directory="", seed=0, continuous_processing=1, file_configs="{}", shuffle_mode="legacy", batch_size=1,
+                   compose_mode="pool", separator=", ", expand_wildcards=False, use_snapshot=False):
+    """
+    Content key of everything a selection depends on, or None if it cannot be computed.
+
+    Covers the mtime/size of the enabled wildcard files (every .txt under the
+    directory when references are expanded), their configs and the effective
+    process index, so seeds inside one continuous_processing block share a key.
+    """
+    base_dir = os.path.abspath(_default_directory(directory))
+    try: configs = json.loads(file_configs)
+    except: configs = {}
+    if not isinstance(configs, dict): return None
+
+    from .wildcard_snapshot import scan_sources
+    enabled = {name: cfg for name, cfg in configs.items()
+               if isinstance(cfg, dict) and cfg.get("status", "disabled") != "disabled"}
+    try:
+        if expand_wildcards:
+            sources = tree_signature(base_dir)
+        else:
+            sources = sorted([name, *sig] for name, sig in scan_sources(base_dir).items() if name in enabled)
+    except OSError:
+        return None
+
+    cp = max(1, continuous_processing)
+    if batch_size == 1:
+        process = [seed // cp]
+    else:
+        process = [seed // cp, seed % cp, cp, batch_size]
+    return content_key(base_dir, sources, enabled, process, shuffle_mode, compose_mode, separator, bool(expand_wildcards))
+
+def _is_error_output(output):
+    return output["result"][0] == "Error"
 
 class FlowerMultilinePromptSelector:
     @classmethod
     def INPUT_TYPES(s):
+        from .wildcard_selection import SHUFFLE_MODES
+        from .wildcard_combinator import COMPOSE_MODES
         return {
             "required": {
                 # Index 0: directory
@@ -17,106 +72,485 @@ class FlowerMultilinePromptSelector:
                 # Index 3: file_configs
                 "file_configs": ("STRING", {"default": "{}", "multiline": True}),
             },
+            "optional": {
+                # legacy: 與舊版 random.shuffle 結果完全相同 / fast: O(1) 種子排列
+                "shuffle_mode": (SHUFFLE_MODES, {"default": "legacy"}),
+                # 一次執行產生 seed .. seed+batch_size-1 的結果 (text_list)
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": 1000000}),
+                # pool: 所有檔案合併成一池取一行 / cartesian: 每個檔案各取一行組合
+                "compose_mode": (COMPOSE_MODES, {"default": "pool"}),
+                "separator": ("STRING", {"default": ", "}),
+                # 展開行內的 __檔名__ 引用
+                "expand_wildcards": ("BOOLEAN", {"default": False}),
+                # 將整個目錄編譯成單一 mmap 快照，多個 ComfyUI 行程共用同一份頁面快取
+                "use_snapshot": ("BOOLEAN", {"default": False}),
+            },
         }
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("text",)
+    RETURN_TYPES = ("STRING", "LIST")
+    RETURN_NAMES = ("text", "text_list")
     FUNCTION = "select_multiline_prompt"
     CATEGORY = "flower-tools"
     OUTPUT_NODE = True 
 
-    def select_multiline_prompt(self, directory, seed, continuous_processing, file_configs="{}"):
-        base_dir = directory.strip()
-        if not base_dir:
-            base_dir = os.path.join(os.path.dirname(__file__), "wildcards")
+    @classmethod
+    def IS_CHANGED(s, **kwargs):
+        # 🌸 檔案內容、啟用的設定與 process index 都相同時回傳相同的值，讓 ComfyUI 沿用快取 🌸
+        return _selection_key(**kwargs) or ""
+
+    # 相同的 key 直接回傳上次的結果 (連續處理的同一段 seed 不必重算)
+    @memoize("FlowerMultilinePromptSelector", _selection_key, cache_if=lambda out: not _is_error_output(out))
+    def select_multiline_prompt(self, directory, seed, continuous_processing, file_configs="{}", shuffle_mode="legacy", batch_size=1,
+                                compose_mode="pool", separator=", ", expand_wildcards=False, use_snapshot=False):
+        from .wildcard_selection import SelectionPlan
+        from .wildcard_combinator import CombinationSpace, ReferenceResolver, WildcardReferenceError
+        from .wildcard_snapshot import open_snapshot
+        base_dir = _default_directory(directory)
         
         if not os.path.exists(base_dir):
-            return {"ui": {"text": ["Error: Dir not found"]}, "result": ("Error",)}
+            return {"ui": {"text": ["Error: Dir not found"]}, "result": ("Error", ["Error"])}
 
         try: configs = json.loads(file_configs)
         except: configs = {}
 
         try:
-            # 使用標準 ASCII 排序
-            files = [f for f in os.listdir(base_dir) if f.endswith(".txt")]
-            files.sort() # Python 預設對 string list 做 ASCII 排序
+            files = _list_txt_files(base_dir)
         except Exception as e:
-            return {"ui": {"text": [str(e)]}, "result": ("Error",)}
+            return {"ui": {"text": [str(e)]}, "result": ("Error", ["Error"])}
+
+        snapshot = None
+        if use_snapshot:
+            # 🌸 任一檔案的 mtime 變動時自動重新編譯快照 🌸
+            try: snapshot = open_snapshot(base_dir)
+            except Exception as e:
+                return {"ui": {"text": [str(e)]}, "result": ("Error", ["Error"])}
 
-        # 🌸 核心運算邏輯: seed 除以 continuous_processing 🌸
-        process_idx = seed // max(1, continuous_processing)
+        segments = self._build_segments(base_dir, files, configs, snapshot)
+        cp = max(1, continuous_processing)
 
-        global_pool = []
+        if compose_mode == "cartesian":
+            # 🌸 第 k 個組合直接以混合進位解碼，不展開笛卡兒積 🌸
+            space = CombinationSpace(segments, separator)
+            first = seed // cp
+            combos = [text for _, text in space.iter_range(first, (seed + batch_size - 1) // cp + 1)]
+            results = [combos[(seed % cp + i) // cp] if space.total else "" for i in range(batch_size)]
+        elif batch_size > 1:
+            # 🌸 批次: 同一份檔案快照一次算出所有 seed 的結果，與逐一執行完全相同 🌸
+            results = SelectionPlan(segments).pick_batch(seed, batch_size, cp, shuffle_mode)
+        else:
+            # 🌸 不再組出完整 global_pool，改以前綴和直接定位 (檔案, 行) 🌸
+            # 🌸 核心運算邏輯: seed 除以 continuous_processing 🌸
+            results = [SelectionPlan(segments).pick(seed // cp, shuffle_mode)]
+
+        if expand_wildcards:
+            resolver = ReferenceResolver(base_dir)
+            try:
+                # 以 process index 決定引用的行，連續處理時內容保持一致
+                results = [resolver.expand(text, (seed + i) // cp) for i, text in enumerate(results)]
+            except WildcardReferenceError as e:
+                return {"ui": {"text": [str(e)]}, "result": ("Error", ["Error"])}
+
+        result = results[0]
+        display = "\n".join(results)
+
+        # path: 讓前端比對 watcher 推送的目錄變更
+        return {"ui": {"text": [display], "path": [os.path.abspath(base_dir)]}, "result": (result, results)}
+
+    def _build_segments(self, base_dir, files, configs, snapshot=None):
+        """Describe every enabled file as a Segment, in pool order (lines from `snapshot` when given)."""
+        from .wildcard_index import open_wildcard
+        from .wildcard_selection import Segment
+        segments = []
         for filename in files:
             file_cfg = configs.get(filename, {"status": "disabled"})
             status = file_cfg.get("status", "disabled")
             if status == "disabled": continue
-            
+
             filepath = os.path.join(base_dir, filename)
             try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    lines = [line.strip() for line in f.readlines() if line.strip()]
+                # 🌸 小檔經由共用快取讀取，大檔改用行索引按需讀取 🌸
+                lines = snapshot.lines(filename) if snapshot is not None else None
+                if lines is None: lines = open_wildcard(filepath)
                 if not lines: continue
                 if status == "selected":
                     line = file_cfg.get("selected_line", "")
-                    if line: global_pool.append(line)
-                elif status == "ordered":
-                    global_pool.extend(lines)
-                elif status == "random":
-                    temp_lines = lines.copy()
+                    if line: segments.append(Segment(filename, status, [line]))
+                elif status in ("ordered", "random"):
                     # 🌸 隨機也使用計算後的 process_idx 以保持連續處理時內容一致 🌸
-                    random.Random(process_idx).shuffle(temp_lines)
-                    global_pool.extend(temp_lines)
+                    segments.append(Segment(filename, status, lines))
             except: continue
+        return segments
 
-        if not global_pool: result = ""
-        else:
-            result = global_pool[process_idx % len(global_pool)]
+def _list_txt_files(directory, refresh=False):
+    """Return the .txt files of a directory in ASCII order (refresh: rescan a watched directory first)."""
+    watcher = _get_watcher()
+    if watcher.enabled:
+        # 🌸 目錄由背景 watcher 維護，之後不再每次重新掃描 🌸
+        return watcher.list_txt_files(directory, refresh=refresh)
+    # 使用標準 ASCII 排序
+    files = [f for f in os.listdir(directory) if f.endswith(".txt")]
+    files.sort() # Python 預設對 string list 做 ASCII 排序
+    return files
 
-        return {"ui": {"text": [result]}, "result": (result,)}
+def _push_wildcard_delta(delta):
+    # 由 watcher 執行緒呼叫；send_sync 可跨執行緒使用
+    PromptServer.instance.send_sync("flower-tools.wildcards-changed", delta)
 
 # --- API ---
+# 所有檔案系統操作都經由 run_io 在專用執行緒池執行，不阻塞 ComfyUI 的 event loop
+
+def _timeout_response(path):
+    return web.json_response({"error": "Timed out", "path": path}, status=504)
+
+async def _scan_directory(directory):
+    """List a directory and count every file's lines concurrently on the I/O pool."""
+    from .wildcard_index import count_lines
+    if not await run_io(os.path.isdir, directory, timeout=None):
+        raise FileNotFoundError(directory)
+    # 按下 Refresh 一律重新掃描：網路磁碟的遠端寫入不會觸發 inotify
+    names = await run_io(_list_txt_files, directory, True, timeout=None)
+    # 大檔的行數直接取自索引檔頭，不需掃描
+    counts = await asyncio.gather(
+        *(run_io(count_lines, os.path.join(directory, f), timeout=None) for f in names),
+        return_exceptions=True,
+    )
+    files = [{"name": f, "count": c} for f, c in zip(names, counts) if not isinstance(c, Exception)]
+    return {"files": files, "path": os.path.abspath(directory)}
+
 @PromptServer.instance.routes.get("/flower-tools/list-files")
 async def list_files(request):
     directory = request.query.get("directory", "").strip()
     if not directory: directory = os.path.join(os.path.dirname(__file__), "wildcards")
-    
-    if not os.path.isdir(directory):
-        return web.json_response({"error": "Directory not found", "path": directory}, status=404)
 
-    files = []
     try:
-        f_list = sorted([f for f in os.listdir(directory) if f.endswith(".txt")])
-        for f in f_list:
-            path = os.path.join(directory, f)
-            try:
-                with open(path, "r", encoding="utf-8") as file:
-                    count = sum(1 for line in file if line.strip())
-                files.append({"name": f, "count": count})
-            except: pass
+        # 🌸 多個分頁同時刷新同一目錄時，共用同一次掃描 🌸
+        key = ("list-files", os.path.abspath(directory))
+        listing = await coalesce(key, lambda: _scan_directory(directory))
+    except FileNotFoundError:
+        return web.json_response({"error": "Directory not found", "path": directory}, status=404)
+    except asyncio.TimeoutError:
+        return _timeout_response(directory)
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
     
-    return web.json_response({"files": files})
+    return web.json_response(listing)
+
+# 串流模式每批送出的行數
+STREAM_CHUNK_LINES = 2000
+# 尚未快取或建立索引、且至少這麼大的檔案，前幾頁先從檔案開頭讀取，完整掃描改在背景進行
+FIRST_PAGE_MIN_BYTES = 1024 * 1024
+
+def _build_line_filter(query):
+    """Build a predicate from the filter/regex/ignore_case query params, or None."""
+    pattern = query.get("filter", "")
+    if not pattern: return None
+    ignore_case = query.get("ignore_case", "1") != "0"
+
+    if query.get("regex", "0") == "1":
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        return lambda line: regex.search(line) is not None
+    if ignore_case:
+        needle = pattern.lower()
+        return lambda line: needle in line.lower()
+    return lambda line: pattern in line
+
+def _read_page(path, offset, limit, line_filter):
+    """
+    Read one page of a wildcard file.
+
+    `offset` is a line position in the file (not a match count), so filtered
+    pages resume from `next_offset` without rescanning earlier lines.
+    """
+    from .wildcard_index import is_ready, open_wildcard, read_head, warm_in_background
+    from .wildcard_snapshot import cached_snapshot_lines
+    # 已編譯且未過期的目錄快照直接從 mmap 讀取
+    seq = cached_snapshot_lines(*os.path.split(path))
+    if seq is None:
+        st = os.stat(path)
+        if st.st_size >= FIRST_PAGE_MIN_BYTES and not is_ready(path, st):
+            # 🌸 大檔第一次開啟：只讀開頭回傳這一頁，索引 / 快取在背景建立 🌸
+            scanned = warm_in_background(path)
+            head = read_head(path, offset + limit) if line_filter is None and limit is not None else None
+            if head is not None:
+                return _head_page(head, offset, limit)
+            # 這一頁超出開頭範圍：等背景掃描完成，不重複掃描同一個檔案
+            scanned.wait()
+        seq = open_wildcard(path)
+    total = len(seq)
+    offset = min(max(0, offset), total)
+    end = total if limit is None else min(total, offset + limit)
+
+    if line_filter is None:
+        lines = list(seq[offset:end])
+        pos = end
+    else:
+        lines = []
+        pos = offset
+        while pos < total and (limit is None or len(lines) < limit):
+            line = seq[pos]
+            pos += 1
+            if line_filter(line): lines.append(line)
+
+    return {
+        "lines": lines,
+        "offset": offset,
+        "total": total,
+        "next_offset": pos if pos < total else None,
+    }
+
+def _head_page(head, offset, limit):
+    """Page built from read_head(); total is None until the whole file has been scanned."""
+    lines, complete = head
+    offset = min(max(0, offset), len(lines))
+    page = lines[offset:offset + limit]
+    end = offset + len(page)
+    return {
+        "lines": page,
+        "offset": offset,
+        "total": len(lines) if complete else None,
+        "next_offset": None if complete and end >= len(lines) else end,
+    }
 
 @PromptServer.instance.routes.get("/flower-tools/get-file-content")
 async def get_file_content(request):
+    """
+    Return the lines of a wildcard file.
+
+    Query params:
+        offset, limit: page window (line positions); without limit the whole file is returned
+        filter: substring (or regex when regex=1) applied server-side, ignore_case=0 to match case
+        stream=1: send every matching line as chunked NDJSON instead of one JSON page
+    """
     directory = request.query.get("directory", "").strip()
     filename = request.query.get("filename", "")
     if not directory: directory = os.path.join(os.path.dirname(__file__), "wildcards")
     
     path = os.path.join(directory, filename)
-    if not os.path.isfile(path):
-        return web.json_response({"error": "File not found", "path": path}, status=404)
+    try:
+        if not await run_io(os.path.isfile, path):
+            return web.json_response({"error": "File not found", "path": path}, status=404)
+    except asyncio.TimeoutError:
+        return _timeout_response(path)
+
+    try:
+        offset = int(request.query.get("offset", 0))
+        limit = request.query.get("limit")
+        limit = max(1, int(limit)) if limit else None
+        line_filter = _build_line_filter(request.query)
+    except (ValueError, re.error) as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    if request.query.get("stream", "0") == "1":
+        return await _stream_file_content(request, path, offset, limit, line_filter)
 
-    lines = []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f.readlines() if line.strip()]
+        # 🌸 檔案讀取移出 event loop，避免大檔卡住整個伺服器 🌸
+        page = await run_io(_read_page, path, offset, limit, line_filter)
+    except asyncio.TimeoutError:
+        return _timeout_response(path)
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
     
-    return web.json_response({"lines": lines})
+    return web.json_response(page)
+
+async def _stream_file_content(request, path, offset, limit, line_filter):
+    """Write matching lines as NDJSON records, one executor call per chunk."""
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson; charset=utf-8"})
+    await resp.prepare(request)
+
+    sent = 0
+    pos = offset
+    total = 0
+    try:
+        while pos is not None and (limit is None or sent < limit):
+            chunk = STREAM_CHUNK_LINES if limit is None else min(STREAM_CHUNK_LINES, limit - sent)
+            page = await run_io(_read_page, path, pos, chunk, line_filter)
+            total = page["total"]
+            if page["lines"]:
+                await resp.write("".join(json.dumps({"line": l}, ensure_ascii=False) + "\n" for l in page["lines"]).encode("utf-8"))
+                sent += len(page["lines"])
+            pos = page["next_offset"]
+        tail = {"done": True, "sent": sent, "total": total, "next_offset": pos}
+    except asyncio.TimeoutError:
+        tail = {"done": True, "error": "Timed out", "next_offset": pos}
+    except Exception as e:
+        tail = {"done": True, "error": str(e)}
+
+    await resp.write((json.dumps(tail) + "\n").encode("utf-8"))
+    await resp.write_eof()
+    return resp
+
+# 單次 expand 請求最多輸出的組合數
+MAX_EXPAND_COUNT = 1000000
+
+def _expand_chunk(base_dir, configs, compose_mode, separator, shuffle_mode, expand, start, count):
+    """Compose `count` prompts starting at index `start` (process index, not seed)."""
+    from .wildcard_selection import SelectionPlan
+    from .wildcard_combinator import CombinationSpace, ReferenceResolver
+    segments = FlowerMultilinePromptSelector()._build_segments(base_dir, _list_txt_files(base_dir), configs)
+    if compose_mode == "cartesian":
+        space = CombinationSpace(segments, separator)
+        total = space.total
+        rows = list(space.iter_range(start, start + count))
+    else:
+        plan = SelectionPlan(segments)
+        total = plan.total
+        rows = [(k, plan.pick(k, shuffle_mode)) for k in range(start, start + count)] if total else []
+    if expand:
+        resolver = ReferenceResolver(base_dir)
+        rows = [(k, resolver.expand(text, k)) for k, text in rows]
+    return total, rows
+
+@PromptServer.instance.routes.get("/flower-tools/expand")
+async def expand_prompts(request):
+    """
+    Stream composed prompts for a range of indices as NDJSON.
+
+    Query params:
+        directory, file_configs (JSON), compose_mode (pool|cartesian), separator,
+        shuffle_mode, expand=1 to resolve __name__ references,
+        start (index, default 0), count (default 100, at most MAX_EXPAND_COUNT)
+
+    The first record is {"total": ...} (as a string, since the cartesian space
+    can exceed what JavaScript numbers hold), then one {"k", "text"} per prompt
+    and a final {"done": true}.
+    """
+    from .wildcard_combinator import COMPOSE_MODES
+    query = request.query
+    directory = query.get("directory", "").strip()
+    if not directory: directory = os.path.join(os.path.dirname(__file__), "wildcards")
+    try:
+        configs = json.loads(query.get("file_configs", "{}") or "{}")
+        start = max(0, int(query.get("start", 0)))
+        count = min(MAX_EXPAND_COUNT, max(0, int(query.get("count", 100))))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    compose_mode = query.get("compose_mode", "cartesian")
+    if compose_mode not in COMPOSE_MODES:
+        return web.json_response({"error": f"compose_mode must be one of {COMPOSE_MODES}"}, status=400)
+    separator = query.get("separator", ", ")
+    shuffle_mode = query.get("shuffle_mode", "legacy")
+    expand = query.get("expand", "0") == "1"
+
+    try:
+        if not await run_io(os.path.isdir, directory):
+            return web.json_response({"error": "Directory not found", "path": directory}, status=404)
+    except asyncio.TimeoutError:
+        return _timeout_response(directory)
+
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson; charset=utf-8"})
+    await resp.prepare(request)
+
+    sent = 0
+    pos = start
+    try:
+        first = True
+        while first or sent < count:
+            chunk = min(STREAM_CHUNK_LINES, count - sent)
+            total, rows = await run_io(_expand_chunk, directory, configs, compose_mode, separator, shuffle_mode, expand, pos, chunk)
+            if first:
+                await resp.write((json.dumps({"total": str(total)}) + "\n").encode("utf-8"))
+                first = False
+            if not rows: break
+            await resp.write("".join(json.dumps({"k": str(k), "text": t}, ensure_ascii=False) + "\n" for k, t in rows).encode("utf-8"))
+            sent += len(rows)
+            pos += len(rows)
+        tail = {"done": True, "sent": sent, "next_start": str(pos)}
+    except asyncio.TimeoutError:
+        tail = {"done": True, "error": "Timed out", "next_start": str(pos)}
+    except Exception as e:
+        tail = {"done": True, "error": str(e)}
+
+    await resp.write((json.dumps(tail) + "\n").encode("utf-8"))
+    await resp.write_eof()
+    return resp
+
+def _rebuild_indexes(directory, filename=""):
+    """Force-rebuild the line index of one file, or of every .txt file in a directory."""
+    from .wildcard_index import load_index
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(directory)
+    names = [filename] if filename else _list_txt_files(directory)
+    rebuilt = []
+    for name in names:
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        rebuilt.append({"name": name, "count": len(load_index(path, rebuild=True))})
+    return rebuilt
+
+@PromptServer.instance.routes.post("/flower-tools/rebuild-index")
+async def rebuild_index(request):
+    try: body = await request.json()
+    except: body = {}
+
+    directory = str(body.get("directory", "")).strip()
+    filename = body.get("filename", "")
+    if not directory: directory = os.path.join(os.path.dirname(__file__), "wildcards")
+
+    try:
+        # 重建大檔索引可能需要數十秒，這裡不設逾時
+        rebuilt = await run_io(_rebuild_indexes, directory, filename, timeout=None)
+    except FileNotFoundError as e:
+        return web.json_response({"error": "File not found", "path": str(e)}, status=404)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+    return web.json_response({"files": rebuilt})
+
+def _compile_snapshot(directory):
+    from .wildcard_snapshot import build_snapshot, open_snapshot
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(directory)
+    stats = build_snapshot(directory)
+    open_snapshot(directory)
+    return stats
+
+@PromptServer.instance.routes.post("/flower-tools/compile-snapshot")
+async def compile_snapshot(request):
+    """Compile a wildcard directory into its memory-mapped snapshot and return the build stats."""
+    try: body = await request.json()
+    except: body = {}
+
+    directory = str(body.get("directory", "")).strip()
+    if not directory: directory = os.path.join(os.path.dirname(__file__), "wildcards")
+
+    try:
+        stats = await run_io(_compile_snapshot, directory, timeout=None)
+    except FileNotFoundError as e:
+        return web.json_response({"error": "Directory not found", "path": str(e)}, status=404)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+    return web.json_response(stats)
+
+@PromptServer.instance.routes.get("/flower-tools/cache-stats")
+async def cache_stats(request):
+    from .wildcard_cache import wildcard_cache
+    wildcard_watcher = _get_watcher()
+    stats = wildcard_cache.stats()
+    stats["watcher"] = {
+        "mode": wildcard_watcher.mode,
+        "interval": wildcard_watcher.interval,
+        "directories": wildcard_watcher.watched(),
+        "scans": wildcard_watcher.scans,
+    }
+    return web.json_response(stats)
+
+@PromptServer.instance.routes.post("/flower-tools/cache-config")
+async def cache_config(request):
+    from .wildcard_cache import wildcard_cache
+    try: body = await request.json()
+    except: body = {}
+
+    if body.get("clear"):
+        wildcard_cache.invalidate()
+    if "max_mb" in body:
+        try: wildcard_cache.set_max_bytes(float(body["max_mb"]) * 1024 * 1024)
+        except (TypeError, ValueError):
+            return web.json_response({"error": "max_mb must be a number"}, status=400)
+
+    return web.json_response(wildcard_cache.stats())
 
 NODE_CLASS_MAPPINGS = { "FlowerMultilinePromptSelector": FlowerMultilinePromptSelector }
 NODE_DISPLAY_NAME_MAPPINGS = { "FlowerMultilinePromptSelector": "🌸Flower Multiline Prompt Selector" }
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from .text_stream import TEXT_STREAM_TYPE
+
+
+def _resolve_path(file_path):
+    """Resolve a relative file_path under ComfyUI's output directory (the working directory outside ComfyUI)."""
+    if os.path.isabs(file_path):
+        return file_path
+    try:
+        import folder_paths
+        base = folder_paths.get_output_directory()
+    except ImportError:
+        base = os.getcwd()
+    return os.path.abspath(os.path.join(base, file_path))
+
+
+class FlowerSaveTextStream:
+    """
+    Write a FLOWER_TEXT_STREAM (e.g. List of Strings' text_stream) to a text file.
+
+    The text is written chunk by chunk, so a prompt built from thousands of
+    fragments never exists as one joined string. Turn off List of Strings'
+    output_string to skip the join there as well. A relative file_path is
+    written under ComfyUI's output directory.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "text_stream": (TEXT_STREAM_TYPE,),
+                "file_path": ("STRING", {"default": ""}),
+            },
+            "optional": {
+                # 附加到檔案結尾，而不是覆寫
+                "append": ("BOOLEAN", {"default": False}),
+            },
+        }
+
+    RETURN_TYPES = ("STRING", "INT")
+    RETURN_NAMES = ("file_path", "chars")
+    FUNCTION = "save"
+    CATEGORY = "flower-tools"
+    OUTPUT_NODE = True
+
+    def save(self, text_stream, file_path, append=False):
+        file_path = file_path.strip()
+        if not file_path:
+            error_msg = "Error: file_path is required"
+            return {"ui": {"text": [error_msg]}, "result": (error_msg, 0)}
+
+        path = _resolve_path(file_path)
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            if append:
+                with open(path, "a", encoding="utf-8", newline="") as f:
+                    chars = text_stream.write_to(f)
+            else:
+                # 先寫入同目錄的暫存檔再取代，寫到一半失敗不會留下殘缺的檔案
+                fd, tmp = tempfile.mkstemp(dir=directory, prefix=".flower-", suffix=".tmp")
+                try:
+                    with open(fd, "w", encoding="utf-8", newline="") as f:
+                        chars = text_stream.write_to(f)
+                    # mkstemp 建立的檔案只有擁有者可讀寫，沿用原檔 (或一般檔案) 的權限
+                    try:
+                        mode = os.stat(path).st_mode & 0o777
+                    except OSError:
+                        mode = 0o644
+                    os.chmod(tmp, mode)
+                    os.replace(tmp, path)
+                    tmp = None
+                finally:
+                    if tmp is not None:
+                        try:
+                            os.unlink(tmp)
+                        except OSError:
+                            pass
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            return {"ui": {"text": [error_msg]}, "result": (error_msg, 0)}
+
+        return {"ui": {"text": [f"Wrote {chars} characters to {path}"]}, "result": (path, chars)}
+
+
+NODE_CLASS_MAPPINGS = {
+    "FlowerSaveTextStream": FlowerSaveTextStream
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "FlowerSaveTextStream": "🌸Flower Save Text Stream"
+}
@@ -1,3 +1,30 @@
+import re
+from .string_search import match_index, nth_match
+
+# 比對方式 -> string_search 的模式
+_SEARCH_MODES = {
+    "文字": "literal",
+    "正規表示式": "regex",
+    "多個關鍵字 (每行一個)": "multi",
+}
+
+def _needs_all_matches(prompt, unique_id):
+    """
+    True if 所有位置 or 找到次數 (outputs 2 and 3) is linked to another node.
+
+    Without the prompt (e.g. a direct call) every output is assumed to be used.
+    """
+    if not isinstance(prompt, dict) or unique_id is None:
+        return True
+    unique_id = str(unique_id)
+    for node in prompt.values():
+        inputs = node.get("inputs", {}) if isinstance(node, dict) else {}
+        for value in inputs.values():
+            if (isinstance(value, list) and len(value) == 2
+                    and str(value[0]) == unique_id and value[1] in (2, 3)):
+                return True
+    return False
+
 class FlowerStringComparison:
     @classmethod
     def INPUT_TYPES(s):
@@ -7,44 +34,47 @@ class FlowerStringComparison:
                 "字串B": ("STRING", {"multiline": True, "default": ""}),
                 "比對模式": (["從前面開始比對", "從後面開始比對"], {"default": "從前面開始比對"}),
                 "比對次數": ("INT", {"default": 1, "min": 1, "max": 999, "step": 1}),
-                "區分大小寫": ("BOOLEAN", {"default": True}),
-            }
+                "區分大小寫": ("BOOLEAN", {"default": True, "tooltip": "關閉時，文字模式將兩段字串以 lower() 轉小寫後比對 (位置以轉換後的字串計算)；正規表示式與多個關鍵字模式使用 re.IGNORECASE"}),
+            },
+            "optional": {
+                "比對方式": (list(_SEARCH_MODES), {"default": "文字"}),
+            },
+            "hidden": {"prompt": "PROMPT", "unique_id": "UNIQUE_ID"},
         }
 
-    RETURN_TYPES = ("INT", "BOOLEAN")
-    RETURN_NAMES = ("位置", "是否有找到")
+    RETURN_TYPES = ("INT", "BOOLEAN", "LIST", "INT")
+    RETURN_NAMES = ("位置", "是否有找到", "所有位置", "找到次數")
     FUNCTION = "compare"
     CATEGORY = "flower-tools"
 
-    def compare(self, 字串A, 字串B, 比對模式, 比對次數, 區分大小寫):
+    def compare(self, 字串A, 字串B, 比對模式, 比對次數, 區分大小寫, 比對方式="文字", prompt=None, unique_id=None):
         a = 字串A
         b = 字串B
+        mode = _SEARCH_MODES.get(比對方式, "literal")
+        from_end = 比對模式 != "從前面開始比對"
+
+        if mode == "literal" and not b:
+            # 空字串: 沿用舊版 find/rfind 迴圈的結果
+            index = nth_match(a, b, 比對次數, from_end, mode, not 區分大小寫)
+            return (index, index != -1, (), 0)
+
+        try:
+            if not _needs_all_matches(prompt, unique_id):
+                # 只需要第 N 個位置: 找到第 N 個就停止，不收集其他位置
+                index = nth_match(a, b, 比對次數, from_end, mode, not 區分大小寫)
+                return (index, index != -1, (), 0)
+            # 需要所有位置時一次找出並快取；同一段文字再次查詢時不必重新搜尋
+            matches = match_index(a, b, mode, not 區分大小寫)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: {e}")
 
-        if not 區分大小寫:
-            a = a.lower()
-            b = b.lower()
-
-        index = -1
-        if 比對模式 == "從前面開始比對":
-            current_pos = -1
-            for _ in range(比對次數):
-                current_pos = a.find(b, current_pos + 1)
-                if current_pos == -1:
-                    break
-            index = current_pos
-        else: # 從後面開始比對
-            current_pos = len(a)
-            for _ in range(比對次數):
-                if current_pos <= 0:
-                    current_pos = -1
-                    break
-                current_pos = a.rfind(b, 0, current_pos)
-                if current_pos == -1:
-                    break
-            index = current_pos
+        if from_end:
+            index = matches.nth_from_end(比對次數)
+        else:
+            index = matches.nth(比對次數)
 
         found = index != -1
-        return (index, found)
+        return (index, found, matches.positions, len(matches))
 
 NODE_CLASS_MAPPINGS = {
     "FlowerStringComparison": FlowerStringComparison
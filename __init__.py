@@ -1,13 +1,69 @@
-from .FlowerMultilinePromptSelector import NODE_CLASS_MAPPINGS as MS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS as MS_DISPLAY
-from .FlowerKeywordReplacer import NODE_CLASS_MAPPINGS as KR_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS as KR_DISPLAY
-from .FlowerListOfStrings import NODE_CLASS_MAPPINGS as LS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS as LS_DISPLAY
-from .FlowerFileNameCombination import NODE_CLASS_MAPPINGS as FC_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS as FC_DISPLAY
-from .FlowerCSTSConverter import NODE_CLASS_MAPPINGS as CC_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS as CC_DISPLAY
-from .FlowerStringComparison import NODE_CLASS_MAPPINGS as SC_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS as SC_DISPLAY
+import time
 
-NODE_CLASS_MAPPINGS = {**MS_MAPPINGS, **KR_MAPPINGS, **LS_MAPPINGS, **FC_MAPPINGS, **CC_MAPPINGS, **SC_MAPPINGS}
-NODE_DISPLAY_NAME_MAPPINGS = {**MS_DISPLAY, **KR_DISPLAY, **LS_DISPLAY, **FC_DISPLAY, **CC_DISPLAY, **SC_DISPLAY}
+_start = time.perf_counter()
+STARTUP_TIMINGS = {}
+
+def _timed(name, loader):
+    t = time.perf_counter()
+    mappings = loader()
+    STARTUP_TIMINGS[name] = (time.perf_counter() - t) * 1000
+    return mappings
+
+def _load_ms():
+    from .FlowerMultilinePromptSelector import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+    return NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+
+def _load_kr():
+    from .FlowerKeywordReplacer import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+    return NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+
+def _load_ls():
+    from .FlowerListOfStrings import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+    return NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+
+def _load_fc():
+    from .FlowerFileNameCombination import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+    return NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+
+def _load_cc():
+    from .FlowerCSTSConverter import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+    return NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+
+def _load_sc():
+    from .FlowerStringComparison import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+    return NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+
+def _load_ts():
+    from .FlowerSaveTextStream import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+    return NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+
+MS_MAPPINGS, MS_DISPLAY = _timed("FlowerMultilinePromptSelector", _load_ms)
+KR_MAPPINGS, KR_DISPLAY = _timed("FlowerKeywordReplacer", _load_kr)
+LS_MAPPINGS, LS_DISPLAY = _timed("FlowerListOfStrings", _load_ls)
+FC_MAPPINGS, FC_DISPLAY = _timed("FlowerFileNameCombination", _load_fc)
+CC_MAPPINGS, CC_DISPLAY = _timed("FlowerCSTSConverter", _load_cc)
+SC_MAPPINGS, SC_DISPLAY = _timed("FlowerStringComparison", _load_sc)
+TS_MAPPINGS, TS_DISPLAY = _timed("FlowerSaveTextStream", _load_ts)
+
+NODE_CLASS_MAPPINGS = {**MS_MAPPINGS, **KR_MAPPINGS, **LS_MAPPINGS, **FC_MAPPINGS, **CC_MAPPINGS, **SC_MAPPINGS, **TS_MAPPINGS}
+NODE_DISPLAY_NAME_MAPPINGS = {**MS_DISPLAY, **KR_DISPLAY, **LS_DISPLAY, **FC_DISPLAY, **CC_DISPLAY, **SC_DISPLAY, **TS_DISPLAY}
 
 WEB_DIRECTORY = "./web"
 
+# 🌸 效能分析 (預設關閉，FLOWER_TOOLS_PROFILE=1 或 POST /flower-tools/metrics 開啟) 🌸
+def _setup_metrics():
+    from server import PromptServer
+    from .node_metrics import instrument, register_routes
+    instrument(NODE_CLASS_MAPPINGS)
+    register_routes(PromptServer.instance.routes)
+
+_timed("node_metrics", _setup_metrics)
+
+# 🌸 啟動時間報告 (目標 < 20 ms) 🌸
+STARTUP_MS = (time.perf_counter() - _start) * 1000
+STARTUP_TARGET_MS = 20
+print(f"🌸 flower-tools: registered {len(NODE_CLASS_MAPPINGS)} nodes in {STARTUP_MS:.1f} ms "
+      f"({', '.join(f'{k} {v:.1f}' for k, v in STARTUP_TIMINGS.items())})"
+      + (f" ⚠️ over {STARTUP_TARGET_MS} ms target" if STARTUP_MS > STARTUP_TARGET_MS else ""))
+
 __all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS', 'WEB_DIRECTORY']
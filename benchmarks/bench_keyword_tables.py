@@ -0,0 +1,115 @@
+"""
+Benchmark FlowerKeywordReplacer replacement tables at several table sizes.
+
+Usage:
+    python benchmarks/bench_keyword_tables.py --sizes 1000 5000 20000 80000 --text-chars 200000
+
+Two keyword sets are generated. "glossary" holds CJK terms that start with
+thousands of different characters, the case where a regex alternation would
+grow with the table. "shared_prefix" holds ASCII keywords that all start with
+the same characters. Each table is written as a TSV file and loaded through
+the same cache the node uses, so the results show the load, compile and
+match times per table size. Match time should level off as the table grows.
+Results are printed as JSON; timings are in milliseconds.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Common CJK ideographs; keywords start with any of them
+CJK = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+
+
+def _load_package():
+    # Import the helper modules without running __init__ (which needs ComfyUI's server)
+    pkg = types.ModuleType("flower_tools")
+    pkg.__path__ = [ROOT]
+    sys.modules.setdefault("flower_tools", pkg)
+    return importlib.import_module("flower_tools.keyword_matcher")
+
+
+def glossary_keywords(n, rng):
+    """Return `n` distinct CJK terms of 2-5 characters."""
+    keywords = set()
+    while len(keywords) < n:
+        keywords.add("".join(rng.choice(CJK) for _ in range(rng.randint(2, 5))))
+    return sorted(keywords)
+
+
+def shared_prefix_keywords(n, rng):
+    return [f"kw{i}_{rng.randrange(10**6)}" for i in range(n)]
+
+
+def make_text(keywords, chars, rng, alphabet):
+    """Random text of about `chars` characters with keywords mixed in (~5% of tokens)."""
+    parts, length = [], 0
+    while length < chars:
+        token = rng.choice(keywords) if rng.random() < 0.05 else "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+        parts.append(token)
+        length += len(token)
+    return "".join(parts)
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 80000], help="table sizes (pairs)")
+    parser.add_argument("--text-chars", type=int, default=200000, help="length of the text to replace in")
+    parser.add_argument("--repeat", type=int, default=5, help="measured replacements per case")
+    args = parser.parse_args()
+
+    keyword_matcher = _load_package()
+    workdir = tempfile.mkdtemp(prefix="flower_bench_")
+    results = {"text_chars": args.text_chars, "repeat": args.repeat, "sets": {}}
+    try:
+        sets = {
+            "glossary": (glossary_keywords, CJK),
+            "shared_prefix": (shared_prefix_keywords, "abcdefghij _,"),
+        }
+        for name, (generate, alphabet) in sets.items():
+            rng = random.Random(7)
+            keywords = generate(max(args.sizes), rng)
+            rng.shuffle(keywords)
+            text = make_text(keywords, args.text_chars, rng, alphabet)
+            cases = {}
+            for size in args.sizes:
+                table = keywords[:size]
+                path = os.path.join(workdir, f"{name}_{size}.tsv")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.writelines(f"{kw}\t<{i}>\n" for i, kw in enumerate(table))
+                matcher, info = keyword_matcher.table_cache.get(path)
+                cases[str(size)] = {
+                    "load_ms": info["load_ms"],
+                    "compile_ms": info["compile_ms"],
+                    "match_ms": _median_ms(lambda: matcher.replace(text), args.repeat),
+                    "first_char_dispatch": matcher.first_chars is not None,
+                }
+                print(f"[bench] {name} {size} pairs: match {cases[str(size)]['match_ms']:.1f} ms", file=sys.stderr)
+            results["sets"][name] = cases
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
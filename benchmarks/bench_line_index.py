@@ -0,0 +1,125 @@
+"""
+Benchmark cold vs. warm line selection on a large generated wildcard corpus.
+
+Usage:
+    python benchmarks/bench_line_index.py --size-mb 1024 --picks 2000
+
+"cold" builds the sidecar index from scratch, "warm" opens an existing
+sidecar, and "legacy" loads the whole file the way readlines() did. Results
+are printed as JSON.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_package():
+    # Import the helper modules without running __init__ (which needs ComfyUI's server)
+    pkg = types.ModuleType("flower_tools")
+    pkg.__path__ = [ROOT]
+    sys.modules.setdefault("flower_tools", pkg)
+    return importlib.import_module("flower_tools.wildcard_index"), importlib.import_module("flower_tools.wildcard_cache")
+
+
+def generate_corpus(path, size_mb, seed=0):
+    """Write a wildcard file of roughly `size_mb` MB with mixed-length lines and blank lines."""
+    rng = random.Random(seed)
+    words = ["flower", "portrait", "cinematic", "lighting", "watercolor", "櫻花", "夜景", "少女", "masterpiece", "detailed"]
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < target:
+            block = []
+            for _ in range(1000):
+                if rng.random() < 0.05:
+                    block.append("")
+                else:
+                    block.append(", ".join(rng.choice(words) for _ in range(rng.randint(3, 30))))
+            data = "\n".join(block) + "\n"
+            f.write(data)
+            written += len(data.encode("utf-8"))
+
+
+def _pick_latencies(view, picks, rng):
+    samples = []
+    n = len(view)
+    for _ in range(picks):
+        i = rng.randrange(n)
+        t0 = time.perf_counter()
+        view[i]
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99) - 1] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024, help="corpus size in MB (default 1024)")
+    parser.add_argument("--picks", type=int, default=2000, help="random line picks per phase")
+    parser.add_argument("--skip-legacy", action="store_true", help="skip the full in-memory load")
+    parser.add_argument("--workdir", default=None, help="directory for the corpus (default: temp dir)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="flower_bench_")
+    os.environ["FLOWER_TOOLS_INDEX_DIR"] = os.path.join(workdir, "index")
+    wildcard_index, wildcard_cache = _load_package()
+
+    corpus = os.path.join(workdir, "corpus.txt")
+    results = {"size_mb": args.size_mb, "picks": args.picks}
+    try:
+        t0 = time.perf_counter()
+        generate_corpus(corpus, args.size_mb)
+        results["generate_s"] = time.perf_counter() - t0
+        rng = random.Random(1)
+
+        # Cold: no sidecar yet, index is built on first access
+        t0 = time.perf_counter()
+        view = wildcard_index.load_index(corpus)
+        view[rng.randrange(len(view))]
+        results["cold_first_pick_s"] = time.perf_counter() - t0
+        results["lines"] = len(view)
+        results["cold_picks"] = _pick_latencies(view, args.picks, rng)
+
+        # Warm: sidecar exists on disk, only the mmap is opened
+        wildcard_index._open_indexes.clear()
+        view.close()
+        t0 = time.perf_counter()
+        view = wildcard_index.load_index(corpus)
+        view[rng.randrange(len(view))]
+        results["warm_first_pick_s"] = time.perf_counter() - t0
+        results["warm_picks"] = _pick_latencies(view, args.picks, rng)
+
+        t0 = time.perf_counter()
+        wildcard_index.count_lines(corpus)
+        results["warm_count_s"] = time.perf_counter() - t0
+        view.close()
+
+        if not args.skip_legacy:
+            t0 = time.perf_counter()
+            lines = wildcard_cache.read_wildcard_lines(corpus)
+            lines[rng.randrange(len(lines))]
+            results["legacy_first_pick_s"] = time.perf_counter() - t0
+            del lines
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+Benchmark every flower-tools node and HTTP route headlessly.
+
+Usage:
+    python benchmarks/bench_nodes.py                      # full matrix
+    python benchmarks/bench_nodes.py --quick              # small corpora, a few seconds
+    python benchmarks/bench_nodes.py --only selector routes
+    python benchmarks/bench_nodes.py --compare benchmarks/results/OLD.json
+
+ComfyUI is not needed: a stub `server.PromptServer` collects the routes the
+node modules register, and the routes are exercised through aiohttp's test
+client. Wildcard corpora, the line index and counter files all live in a
+temporary directory.
+
+Results are written as JSON (default: benchmarks/results/<git commit>.json)
+together with the commit, Python version and platform, so runs from two
+commits can be compared with --compare. Timings are in milliseconds.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+WORDS = ["flower", "portrait", "cinematic", "lighting", "watercolor", "櫻花", "夜景", "少女", "masterpiece", "detailed"]
+# Common CJK ideographs for glossary keywords that start with many different characters
+CJK = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+
+# (files, lines per file) for the selector and route benchmarks
+FULL_CORPORA = [(1, 1), (1, 1000), (1, 1000000), (10, 1000), (100, 1000), (1000, 100), (1000, 1000)]
+QUICK_CORPORA = [(1, 1), (1, 1000), (10, 1000), (100, 100)]
+
+BENCHMARKS = ("selector", "keyword_replacer", "filename", "string_comparison", "list_of_strings", "csts_converter", "routes")
+
+
+# --- harness ---------------------------------------------------------------
+
+def _install_stub_server():
+    """Provide a minimal `server` module so node modules can register their routes."""
+    from aiohttp import web
+
+    class _StubPromptServer:
+        def __init__(self):
+            self.routes = web.RouteTableDef()
+            self.sent = []
+
+        def send_sync(self, event, data, sid=None):
+            self.sent.append(event)
+
+    server = types.ModuleType("server")
+    server.PromptServer = type("PromptServer", (), {"instance": _StubPromptServer()})
+    sys.modules["server"] = server
+    return server.PromptServer.instance
+
+
+def _load_package():
+    # Import the node modules without running __init__ (which needs ComfyUI)
+    pkg = types.ModuleType("flower_tools")
+    pkg.__path__ = [ROOT]
+    sys.modules.setdefault("flower_tools", pkg)
+    return lambda name: importlib.import_module(f"flower_tools.{name}")
+
+
+def measure(fn, repeat=20, warmup=2):
+    """Call `fn` `warmup` + `repeat` times; return timing stats of the measured calls in ms."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)],
+        "min_ms": samples[0],
+        "runs": repeat,
+    }
+
+
+def once(fn):
+    """Time a single call in ms (cold paths)."""
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def make_corpus(base, files, lines_per_file, seed=0):
+    """Write `files` wildcard files of `lines_per_file` lines each; returns the directory."""
+    directory = os.path.join(base, f"corpus_{files}x{lines_per_file}")
+    if os.path.isdir(directory):
+        return directory
+    os.makedirs(directory)
+    rng = random.Random(seed)
+    for i in range(files):
+        with open(os.path.join(directory, f"w{i:04d}.txt"), "w", encoding="utf-8", newline="\n") as f:
+            remaining = lines_per_file
+            while remaining:
+                n = min(remaining, 10000)
+                f.write("\n".join(", ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) for _ in range(n)))
+                f.write("\n")
+                remaining -= n
+    return directory
+
+
+def _file_configs(directory, status):
+    return json.dumps({name: {"status": status} for name in sorted(os.listdir(directory)) if name.endswith(".txt")})
+
+
+# --- node benchmarks ---------------------------------------------------------
+
+def bench_selector(load, workdir, corpora, repeat):
+    selector_mod = load("FlowerMultilinePromptSelector")
+    cache = load("wildcard_cache").wildcard_cache
+    index = load("wildcard_index")
+    node = selector_mod.FlowerMultilinePromptSelector()
+    results = {}
+    for files, lines in corpora:
+        directory = make_corpus(workdir, files, lines)
+        case = {"files": files, "lines_per_file": lines, "total_lines": files * lines}
+        for status in ("ordered", "random"):
+            configs = _file_configs(directory, status)
+            modes = ("legacy", "fast") if status == "random" else ("legacy",)
+            for mode in modes:
+                key = f"{status}_{mode}"
+                cache.invalidate()
+                index._open_indexes.clear()
+                case[f"{key}_cold_ms"] = once(lambda: node.select_multiline_prompt(directory, 12345, 1, configs, mode))
+                seeds = iter(range(10**9))
+                case[key] = measure(lambda: node.select_multiline_prompt(directory, next(seeds), 1, configs, mode), repeat)
+                if not (status == "random" and mode == "legacy" and lines > 100000):
+                    # Legacy random replays the shuffle per seed; skip batches that would take minutes
+                    case[f"{key}_batch1000"] = measure(
+                        lambda: node.select_multiline_prompt(directory, 0, 1, configs, mode, batch_size=1000), max(3, repeat // 5), 1)
+        configs = _file_configs(directory, "ordered")
+        memo = load("result_memo")
+        memo.configure(max_entries=memo.DEFAULT_MEMO_SIZE)
+        node.select_multiline_prompt(directory, 0, 1, configs)
+        # Repeated queue item: IS_CHANGED-style key check and a memo hit, no selection
+        case["memo_hit"] = measure(lambda: node.select_multiline_prompt(directory, 0, 1, configs), repeat)
+        memo.configure(max_entries=0)
+        if files <= 100:
+            case["cartesian"] = measure(lambda: node.select_multiline_prompt(directory, 10**6, 1, configs, compose_mode="cartesian"), repeat)
+        results[f"{files}x{lines}"] = case
+    return results
+
+
+def _glossary_keywords(n, rng):
+    # CJK glossary terms starting with thousands of different characters
+    keywords = set()
+    while len(keywords) < n:
+        keywords.add("".join(rng.choice(CJK) for _ in range(rng.randint(2, 5))))
+    return sorted(keywords)
+
+
+def bench_keyword_replacer(load, quick, repeat):
+    replacer_mod = load("FlowerKeywordReplacer")
+    node = replacer_mod.FlowerKeywordReplacer()
+    rng = random.Random(2)
+    text_sizes = (1024, 100 * 1024) if quick else (1024, 100 * 1024, 1024 * 1024)
+    # "kw{i}_..." keywords all share one prefix; glossary terms start with many characters
+    keyword_sets = {
+        "": ((10, 100, 1000) if quick else (10, 100, 1000, 10000),
+             lambda n: [f"kw{i}_{rng.choice(WORDS)}" for i in range(n)], WORDS, " "),
+        "glossary_": ((100, 1000, 5000) if quick else (100, 1000, 5000, 20000),
+                      lambda n: _glossary_keywords(n, rng), CJK, ""),
+    }
+    results = {}
+    for prefix, (pair_counts, make_keywords, filler, joiner) in keyword_sets.items():
+        for n_pairs in pair_counts:
+            keywords = make_keywords(n_pairs)
+            extra = "\n".join(f"{k} => R{i}" for i, k in enumerate(keywords))
+            for size in text_sizes:
+                parts, length = [], 0
+                while length < size:
+                    token = rng.choice(keywords) if rng.random() < 0.2 else rng.choice(filler)
+                    parts.append(token)
+                    length += len(token.encode("utf-8")) + len(joiner)
+                text = joiner.join(parts)
+                case = {"pairs": n_pairs, "text_bytes": size}
+                for mode in replacer_mod.REPLACE_MODES:
+                    if mode.startswith("sequential") and n_pairs * size > 1000 * 1024 * 1024 // 10:
+                        continue  # quadratic legacy path: minutes per call at this size
+                    key = "sequential" if mode.startswith("sequential") else mode
+                    case[key] = measure(lambda: node.replace_keywords(text, replace_mode=mode, extra_pairs=extra), max(3, repeat // 4), 1)
+                results[f"{prefix}{n_pairs}pairs_{size // 1024}KB"] = case
+    return results
+
+
+def bench_filename(load, repeat):
+    mod = load("FlowerFileNameCombination")
+    node = mod.FlowerFileNameCombination()
+    base = dict(MainFolderName="Main", SubFolderName="Sub", same_as_subfolder=True, FileName="f", Suffix="x",
+                DATE_format="%Y-%m-%d", TIME_format="%H-%M-%S", DATETIME_format="%Y%m%d-%H%M%S",
+                FullNameFormat="%MainFolderName/%DATE-%SubFolderName/%FileName-%DATETIME-%Suffix",
+                PathNameFormat="%MainFolderName/%DATE-%SubFolderName/", FileNameFormat="%FileName-%DATETIME-%Suffix")
+    counter = dict(base, FullNameFormat="%MainFolderName/%FileName-%COUNTER:5", FileNameFormat="%FileName-%COUNTER:5-%PROMPT_HASH")
+    calls = repeat * 50
+    return {
+        "default_formats": measure(lambda: node.process(**base), calls),
+        "counter_and_hash": measure(lambda: node.process(**counter, prompt="a prompt " * 50), calls),
+        "is_changed_static": measure(lambda: mod.FlowerFileNameCombination.IS_CHANGED(**dict(base, FullNameFormat="%FileName", PathNameFormat="%MainFolderName", FileNameFormat="%Suffix")), calls),
+    }
+
+
+def bench_string_comparison(load, quick, repeat):
+    mod = load("FlowerStringComparison")
+    search = load("string_search")
+    node = mod.FlowerStringComparison()
+    results = {}
+    for occurrences in ((1000, 100000) if quick else (1000, 100000, 1000000)):
+        text = "some prompt text, with Words; " * occurrences
+        case = {"occurrences": occurrences, "text_chars": len(text)}
+        for direction in ("從前面開始比對", "從後面開始比對"):
+            key = "forward" if direction == "從前面開始比對" else "backward"
+            for cs in (True, False):
+                name = f"{key}_{'cs' if cs else 'ci'}_k999"
+                search.match_index.cache_clear()
+                case[f"{name}_cold_ms"] = once(lambda: node.compare(text, "Words", direction, 999, cs))
+                case[name] = measure(lambda: node.compare(text, "Words", direction, 999, cs), repeat)
+        case["regex"] = measure(lambda: node.compare(text, r"W\w+", "從前面開始比對", 999, True, "正規表示式"), repeat)
+        case["multi"] = measure(lambda: node.compare(text, "prompt\ntext\nWords", "從前面開始比對", 999, True, "多個關鍵字 (每行一個)"), repeat)
+        results[f"{occurrences}_occurrences"] = case
+    return results
+
+
+def bench_list_of_strings(load, repeat):
+    mod = load("FlowerListOfStrings")
+    node = mod.FlowerListOfStrings()
+    slots = {f"string_{i}": f"fragment number {i}" for i in range(1, 11)}
+    fragments = [f"fragment number {i}" for i in range(10000)]
+    return {
+        "10_slots": measure(lambda: node.process(", ", True, **slots), repeat * 50),
+        "10000_list_items": measure(lambda: node.process(", ", True, list_1=fragments), repeat),
+        "10000_list_items_skip_empty": measure(lambda: node.process(", ", True, skip_empty=True, list_1=fragments), repeat),
+        "10000_list_items_stream_only": measure(lambda: node.process(", ", True, output_string=False, list_1=fragments), repeat),
+    }
+
+
+def bench_csts_converter(load, repeat):
+    mod = load("FlowerCSTSConverter")
+    if mod._import_opencc() is None:
+        return {"skipped": "opencc not installed"}
+    node = mod.FlowerCSTSConverter()
+    text = "这是一个用于测试繁简转换速度的句子，包含软件、信息与网络等词汇。\n" * 20000
+    mode = "Simplified -> Traditional (TW)"
+    return {
+        "first_call_ms": once(lambda: node.convert_text(text[:100], mode)),
+        "small_text": measure(lambda: node.convert_text(text[:200], mode), repeat * 5),
+        "large_text_chars": len(text),
+        "large_text": measure(lambda: node.convert_text(text, mode), max(3, repeat // 4), 1),
+        "list_1000": measure(lambda: node.convert_text("", mode, text_list=text.splitlines()[:1000]), max(3, repeat // 4), 1),
+    }
+
+
+# --- route benchmarks --------------------------------------------------------
+
+async def _route_load(client, method, path, params, concurrency, requests):
+    """Issue `requests` calls with at most `concurrency` in flight; return latency stats."""
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            resp = await client.request(method, path, params=params)
+            await resp.read()
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if resp.status != 200:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": requests / wall if wall else None,
+        "median_ms": statistics.median(latencies),
+        "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)],
+    }
+
+
+async def _bench_routes_async(stub, load, workdir, corpora, quick):
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+
+    load("FlowerMultilinePromptSelector")
+    cache = load("wildcard_cache").wildcard_cache
+    app = web.Application()
+    app.add_routes(stub.routes)
+    results = {}
+    levels = (1, 10) if quick else (1, 10, 50)
+    requests = 50 if quick else 200
+    async with TestClient(TestServer(app)) as client:
+        for files, lines in corpora:
+            directory = make_corpus(workdir, files, lines)
+            first = sorted(f for f in os.listdir(directory) if f.endswith(".txt"))[0]
+            case = {"files": files, "lines_per_file": lines}
+            cache.invalidate()
+            t0 = time.perf_counter()
+            await (await client.get("/flower-tools/list-files", params={"directory": directory})).read()
+            case["list_files_cold_ms"] = (time.perf_counter() - t0) * 1000
+            page = {"directory": directory, "filename": first, "offset": "0", "limit": "500"}
+            filtered = dict(page, filter="櫻花")
+            for level in levels:
+                case[f"list_files_c{level}"] = await _route_load(client, "GET", "/flower-tools/list-files", {"directory": directory}, level, requests)
+                case[f"file_page_c{level}"] = await _route_load(client, "GET", "/flower-tools/get-file-content", page, level, requests)
+                case[f"file_filter_c{level}"] = await _route_load(client, "GET", "/flower-tools/get-file-content", filtered, level, requests)
+            results[f"{files}x{lines}"] = case
+    return results
+
+
+def bench_routes(stub, load, workdir, corpora, quick):
+    return asyncio.run(_bench_routes_async(stub, load, workdir, corpora, quick))
+
+
+# --- reporting ---------------------------------------------------------------
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _flatten(data, prefix=""):
+    """Yield (dotted key, value) for every median_ms / *_ms number in a result tree."""
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, (int, float)) and (key == "median_ms" or key.endswith("_cold_ms") or key.endswith("first_call_ms")):
+            yield path, value
+
+
+def compare(base_path, new_results, threshold):
+    """Print per-metric ratios new/base; returns the number of regressions above `threshold`."""
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    base_metrics = dict(_flatten(base["benchmarks"]))
+    regressions = 0
+    print(f"\nCompared with {base.get('commit')} ({base_path}):")
+    for key, value in _flatten(new_results["benchmarks"]):
+        old = base_metrics.get(key)
+        if not old:
+            continue
+        ratio = value / old
+        flag = ""
+        if ratio > threshold:
+            flag = "  <-- slower"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"  {key:<70} {old:10.3f} -> {value:10.3f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small corpora and fewer iterations")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=None, help="measured calls per case (default 20, quick 10)")
+    parser.add_argument("--output", default=None, help="result JSON path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--workdir", default=None, help="directory for corpora (default: temp dir, removed afterwards)")
+    args = parser.parse_args()
+
+    selected = args.only or BENCHMARKS
+    repeat = args.repeat or (10 if args.quick else 20)
+    corpora = QUICK_CORPORA if args.quick else FULL_CORPORA
+    workdir = args.workdir or tempfile.mkdtemp(prefix="flower_bench_")
+    # Keep index, snapshot and counter files out of the repository
+    os.environ["FLOWER_TOOLS_INDEX_DIR"] = os.path.join(workdir, "index")
+    os.environ["FLOWER_TOOLS_SNAPSHOT_DIR"] = os.path.join(workdir, "snapshots")
+    os.environ["FLOWER_TOOLS_COUNTER_DIR"] = os.path.join(workdir, "counters")
+    # Measure the computation itself; repeated identical calls would otherwise be memo hits
+    os.environ["FLOWER_TOOLS_MEMO_SIZE"] = "0"
+
+    stub = _install_stub_server()
+    load = _load_package()
+    try:
+        import numpy  # noqa: F401
+        has_numpy = True
+    except ImportError:
+        has_numpy = False
+
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": has_numpy,
+        "quick": args.quick,
+        "repeat": repeat,
+        "benchmarks": {},
+    }
+    runners = {
+        "selector": lambda: bench_selector(load, workdir, corpora, repeat),
+        "keyword_replacer": lambda: bench_keyword_replacer(load, args.quick, repeat),
+        "filename": lambda: bench_filename(load, repeat),
+        "string_comparison": lambda: bench_string_comparison(load, args.quick, repeat),
+        "list_of_strings": lambda: bench_list_of_strings(load, repeat),
+        "csts_converter": lambda: bench_csts_converter(load, repeat),
+        "routes": lambda: bench_routes(stub, load, workdir, corpora, args.quick),
+    }
+    try:
+        for name in selected:
+            t0 = time.perf_counter()
+            print(f"[bench] {name} ...", file=sys.stderr, flush=True)
+            results["benchmarks"][name] = runners[name]()
+            print(f"[bench] {name} done in {time.perf_counter() - t0:.1f} s", file=sys.stderr, flush=True)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit'] or 'unknown'}{'-quick' if args.quick else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            print(f"{regressions} metric(s) slower than x{args.threshold}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Precompiled %TOKEN templates for FlowerFileNameCombination.
+
+A format string is parsed once into a tuple of literal strings and
+(token, width) pairs and cached by its text, so rendering is a single join
+with no per-call parsing. Tokens are matched longest-first, so %DATETIME is
+never mistaken for %DATE followed by "TIME".
+
+Supported tokens:
+    %MainFolderName %SubFolderName %FileName %Suffix
+    %DATE %TIME %DATETIME
+    %COUNTER      running counter
+    %SEED         seed input
+    %PROMPT_HASH  hash of the prompt input (8 hex chars by default)
+
+An optional ":N" after %COUNTER or %SEED zero-pads to N digits
+(%COUNTER:5 -> 00042); after %PROMPT_HASH it sets the number of hex chars.
+After any other token ":N" is literal text, as it always was
+(%Suffix:01 -> x:01).
+
+Examples (run with `python -m doctest filename_template.py`):
+
+    >>> values = {"Suffix": "x", "DATE": "2026", "COUNTER": "42", "SEED": "7", "PROMPT_HASH": "0123456789abcdef"}
+    >>> render(compile_template("%Suffix:01"), values)
+    'x:01'
+    >>> render(compile_template("%DATE:2024"), values)
+    '2026:2024'
+    >>> render(compile_template("%COUNTER:5-%SEED:3-%PROMPT_HASH:4-%PROMPT_HASH"), values)
+    '00042-007-0123-01234567'
+"""
+
+import re
+from functools import lru_cache
+
+TOKENS = (
+    "MainFolderName", "SubFolderName", "FileName", "Suffix",
+    "DATETIME", "DATE", "TIME",
+    "COUNTER", "SEED", "PROMPT_HASH",
+)
+
+# Tokens whose value depends on the current time
+TIME_TOKENS = frozenset({"DATETIME", "DATE", "TIME"})
+
+# Tokens that take a ":N" width; other tokens leave ":N" as literal text
+WIDTH_TOKENS = ("COUNTER", "SEED", "PROMPT_HASH")
+
+_TOKEN_RE = re.compile(
+    "%(?:(" + "|".join(WIDTH_TOKENS) + r")(?::(\d{1,3}))?|("
+    + "|".join(sorted((t for t in TOKENS if t not in WIDTH_TOKENS), key=len, reverse=True)) + "))"
+)
+
+DEFAULT_HASH_CHARS = 8
+
+
+@lru_cache(maxsize=256)
+def compile_template(fmt):
+    """
+    Parse a format string into literal and token parts.
+
+    Args:
+        fmt: Format text such as "%FileName-%DATETIME-%Suffix"
+
+    Returns:
+        Tuple whose items are either literal strings or (token, width) tuples,
+        with width None when no ":N" was given
+    """
+    parts = []
+    pos = 0
+    for m in _TOKEN_RE.finditer(fmt):
+        if m.start() > pos:
+            parts.append(fmt[pos:m.start()])
+        width = int(m.group(2)) if m.group(2) else None
+        parts.append((m.group(1) or m.group(3), width))
+        pos = m.end()
+    if pos < len(fmt):
+        parts.append(fmt[pos:])
+    return tuple(parts)
+
+
+def template_tokens(*formats):
+    """Return the set of token names used by any of the given format strings."""
+    names = set()
+    for fmt in formats:
+        names.update(part[0] for part in compile_template(fmt) if isinstance(part, tuple))
+    return names
+
+
+def _format_value(name, value, width):
+    if width is None:
+        return value if name != "PROMPT_HASH" else value[:DEFAULT_HASH_CHARS]
+    if name == "PROMPT_HASH":
+        return value[:width]
+    return value.zfill(width)
+
+
+def render(parts, values):
+    """
+    Render compiled template parts in one pass.
+
+    Args:
+        parts: Result of compile_template()
+        values: Dictionary of token name -> string value
+
+    Returns:
+        Rendered string
+    """
+    return "".join(
+        part if isinstance(part, str) else _format_value(part[0], values[part[0]], part[1])
+        for part in parts
+    )
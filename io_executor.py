@@ -0,0 +1,95 @@
+"""
+Bounded thread pool for blocking work done by the flower-tools HTTP routes.
+
+aiohttp handlers run on ComfyUI's event loop, so any os.listdir / open /
+stat they perform directly stalls websocket progress updates for every
+client. Handlers hand that work to `run_io`, which runs it on a small
+dedicated pool with a per-request timeout, and use `coalesce` so identical
+concurrent requests (e.g. several browser tabs refreshing the same
+directory) share one in-flight result.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _env_number(name, default, cast):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Worker threads for route I/O (FLOWER_TOOLS_IO_WORKERS)
+MAX_WORKERS = max(1, _env_number("FLOWER_TOOLS_IO_WORKERS", min(8, (os.cpu_count() or 1) + 4), int))
+# Seconds a route waits for its I/O before answering 504 (FLOWER_TOOLS_IO_TIMEOUT)
+DEFAULT_TIMEOUT = _env_number("FLOWER_TOOLS_IO_TIMEOUT", 30.0, float)
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="flower-io")
+_inflight = {}  # key -> asyncio.Task
+
+
+async def run_io(fn, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    Run a blocking callable on the flower-tools I/O pool.
+
+    Args:
+        fn: Blocking callable
+        *args, **kwargs: Passed to `fn`
+        timeout: Seconds to wait, or None to wait indefinitely
+
+    Returns:
+        Whatever `fn` returns
+
+    Raises:
+        asyncio.TimeoutError: If `fn` does not finish within `timeout`. The
+            worker thread keeps running; only the caller stops waiting.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+    if timeout is None:
+        return await future
+    return await asyncio.wait_for(future, timeout)
+
+
+async def coalesce(key, factory, timeout=DEFAULT_TIMEOUT):
+    """
+    Share one in-flight coroutine between concurrent callers with the same key.
+
+    The first caller starts `factory()`; callers arriving before it finishes
+    await the same task. A caller that times out or disconnects does not
+    cancel the shared work for the others.
+
+    Args:
+        key: Hashable identifying the request (e.g. ("list-files", directory))
+        factory: Zero-argument coroutine function producing the result
+        timeout: Seconds this caller waits, or None
+
+    Returns:
+        The shared result of `factory()`
+    """
+    task = _inflight.get(key)
+    if task is None or task.done():
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+
+        def _forget(t, key=key):
+            if _inflight.get(key) is t:
+                del _inflight[key]
+            # Mark the exception retrieved even if every waiter already gave up
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(_forget)
+
+    shared = asyncio.shield(task)
+    if timeout is None:
+        return await shared
+    return await asyncio.wait_for(shared, timeout)
+
+
+def shutdown():
+    """Stop accepting new work and release the worker threads."""
+    _executor.shutdown(wait=False, cancel_futures=True)
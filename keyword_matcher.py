@@ -0,0 +1,294 @@
+"""
+Single-pass multi-keyword replacement for FlowerKeywordReplacer.
+
+The text is scanned once no matter how many pairs there are. At each
+position the longest matching keyword wins, and replaced text is never
+matched again. Compiled matchers are cached until the pair set changes.
+
+Small tables compile into one regular expression built from a prefix trie.
+Python's re tries the top-level branches of that trie one by one at every
+text position, so with many distinct first characters (e.g. a CJK glossary)
+the cost would grow with the table. Those tables instead scan for a
+character class of first characters and look the candidate up in a dict
+bucketed by first character, which costs the same per position however
+large the table is.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from .node_metrics import add_bytes_read
+
+REPLACE_MODES = ["sequential (legacy)", "simultaneous"]
+
+# Beyond this keyword length the trie would nest too deeply for the re compiler
+_MAX_TRIE_KEYWORD = 200
+# Tables whose keywords start with more distinct characters use the first-character dispatch
+_MAX_TRIE_FIRST_CHARS = 32
+
+
+def _trie_pattern(keywords):
+    """
+    Build a regex matching any keyword, preferring the longest at each position.
+
+    Shared prefixes are factored out ("cat", "car" -> "ca(?:t|r)") so the
+    regex engine does not try every keyword separately. A keyword that is a
+    prefix of another becomes an optional tail ("a", "ab" -> "a(?:b)?"); the
+    greedy "?" tries the longer branch first.
+    """
+    root = {}
+    for kw in keywords:
+        node = root
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        ends_here = "" in node
+        alts = []
+        for ch in sorted(k for k in node if k):
+            alts.append(re.escape(ch) + build(node[ch]))
+        if not alts:
+            return ""
+        if len(alts) == 1 and not ends_here:
+            return alts[0]
+        group = "(?:" + "|".join(alts) + ")"
+        return group + "?" if ends_here else group
+
+    return build(root)
+
+
+def _class_escape(ch):
+    """Escape a character for use inside a regex character class."""
+    return "\\" + ch if ch in "\\]^-[" else ch
+
+
+class KeywordMatcher:
+    """
+    Compiled replacement table.
+
+    Args:
+        pairs: Sequence of (keyword, replacement); empty keywords are ignored and
+            the first pair wins when a keyword repeats
+    """
+
+    def __init__(self, pairs):
+        start = time.perf_counter()
+        self.mapping = {}
+        for keyword, replacement in pairs:
+            if keyword and keyword not in self.mapping:
+                self.mapping[keyword] = replacement
+
+        keywords = list(self.mapping)
+        self.regex = None
+        self.first_chars = None
+        self._lengths = None
+        self._pairs = None
+        if not keywords:
+            pass
+        elif (len({kw[0] for kw in keywords}) <= _MAX_TRIE_FIRST_CHARS
+              and max(map(len, keywords)) <= _MAX_TRIE_KEYWORD):
+            self.regex = re.compile(_trie_pattern(keywords))
+        else:
+            # first character -> distinct keyword lengths, longest first
+            lengths = {}
+            for kw in keywords:
+                lengths.setdefault(kw[0], set()).add(len(kw))
+            self._lengths = {ch: sorted(ls, reverse=True) for ch, ls in lengths.items()}
+            # Most candidates match nothing; one lookup of their first two characters rejects them
+            self._pairs = {kw[:2] for kw in keywords}
+            self.first_chars = re.compile("[" + "".join(map(_class_escape, sorted(lengths))) + "]")
+        self.compile_ms = (time.perf_counter() - start) * 1000
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def replace(self, text):
+        """Replace every keyword occurrence in one pass."""
+        if not text:
+            return text
+        mapping = self.mapping
+        if self.regex is not None:
+            return self.regex.sub(lambda m: mapping[m.group(0)], text)
+        if self.first_chars is None:
+            return text
+
+        lengths = self._lengths
+        prefixes = self._pairs
+        parts = []
+        pos = 0  # end of the text already copied or replaced
+        for m in self.first_chars.finditer(text):
+            i = m.start()
+            if i < pos or (text[i:i + 2] not in prefixes and text[i] not in prefixes):
+                continue  # inside the previous match, or no keyword starts here
+            for n in lengths[text[i]]:
+                keyword = text[i:i + n]
+                replacement = mapping.get(keyword)
+                if replacement is not None and len(keyword) == n:
+                    parts.append(text[pos:i])
+                    parts.append(replacement)
+                    pos = i + n
+                    break
+        if not parts:
+            return text
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+@lru_cache(maxsize=32)
+def compile_matcher(pairs):
+    """
+    Return a cached KeywordMatcher for a tuple of (keyword, replacement) pairs.
+
+    Args:
+        pairs: Tuple of (keyword, replacement) tuples (must be hashable)
+    """
+    return KeywordMatcher(pairs)
+
+
+def replace_sequential(text, pairs):
+    """
+    Legacy semantics: apply str.replace once per pair, in order.
+
+    Later keywords can match text produced by earlier replacements.
+    """
+    for keyword, replacement in pairs:
+        if keyword:
+            text = text.replace(keyword, replacement)
+    return text
+
+
+def parse_pair_lines(text, separator="=>"):
+    """
+    Parse "keyword => replacement" lines into pairs.
+
+    Whitespace around the separator is trimmed; lines without it are skipped.
+    """
+    pairs = []
+    for line in text.splitlines():
+        keyword, sep, replacement = line.partition(separator)
+        if not sep:
+            continue
+        keyword = keyword.strip()
+        if keyword:
+            pairs.append((keyword, replacement.strip()))
+    return pairs
+
+
+# --- Replacement tables loaded from files ---
+
+TABLE_EXTENSIONS = (".tsv", ".csv", ".json")
+
+
+def read_table(path):
+    """
+    Read (keyword, replacement) pairs from a TSV, CSV or JSON file.
+
+    TSV: one "keyword<TAB>replacement" per line; blank lines and lines starting with # are skipped.
+    CSV: first two columns of each row; a leading "keyword,replacement" header is skipped.
+    JSON: an object {keyword: replacement}, or a list of [keyword, replacement]
+          pairs or {"keyword": ..., "replacement": ...} objects.
+
+    Returns:
+        List of (keyword, replacement) tuples in file order
+
+    Raises:
+        ValueError: If the extension or JSON layout is not supported
+    """
+    ext = os.path.splitext(path)[1].lower()
+    pairs = []
+    if ext in TABLE_EXTENSIONS:
+        add_bytes_read(os.path.getsize(path))
+
+    if ext == ".tsv":
+        with open(path, "r", encoding="utf-8-sig") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if not line or line.startswith("#"):
+                    continue
+                keyword, _, replacement = line.partition("\t")
+                pairs.append((keyword, replacement))
+    elif ext == ".csv":
+        import csv
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for i, row in enumerate(csv.reader(f)):
+                if not row:
+                    continue
+                if i == 0 and [c.strip().lower() for c in row[:2]] == ["keyword", "replacement"]:
+                    continue
+                pairs.append((row[0], row[1] if len(row) > 1 else ""))
+    elif ext == ".json":
+        with open(path, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            pairs = [(str(k), str(v)) for k, v in data.items()]
+        elif isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict):
+                    pairs.append((str(item.get("keyword", "")), str(item.get("replacement", ""))))
+                elif isinstance(item, (list, tuple)) and item:
+                    pairs.append((str(item[0]), str(item[1]) if len(item) > 1 else ""))
+        else:
+            raise ValueError("JSON table must be an object or a list")
+    else:
+        raise ValueError(f"Unsupported table format '{ext}', expected one of {', '.join(TABLE_EXTENSIONS)}")
+
+    return [(k, v) for k, v in pairs if k]
+
+
+class TableMatcherCache:
+    """
+    Matchers compiled from table files, keyed by (path, mtime, size, extra pairs).
+
+    A table is parsed and compiled once and reused until the file changes.
+    """
+
+    def __init__(self, maxsize=8):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, extra_pairs=()):
+        """
+        Return (matcher, info) for a table file combined with extra pairs.
+
+        `extra_pairs` come first, so they take precedence over table entries
+        with the same keyword. `info` holds the table size, load/compile time
+        in ms and whether the entry came from the cache.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size, tuple(extra_pairs))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], dict(entry[1], cached=True)
+            self.misses += 1
+
+        start = time.perf_counter()
+        table = read_table(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        matcher = KeywordMatcher(list(extra_pairs) + table)
+        info = {"pairs": len(table), "load_ms": load_ms, "compile_ms": matcher.compile_ms, "cached": False}
+
+        with self._lock:
+            # Drop entries for older versions of the same file
+            for stale in [k for k in self._entries if k[0] == path and k[1:3] != key[1:3]]:
+                del self._entries[stale]
+            self._entries[key] = (matcher, info)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return matcher, info
+
+
+table_cache = TableMatcherCache()
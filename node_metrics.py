@@ -0,0 +1,290 @@
+"""
+Opt-in per-node profiling for flower-tools.
+
+When enabled (FLOWER_TOOLS_PROFILE=1, or POST /flower-tools/metrics), the
+FUNCTION method of every class in NODE_CLASS_MAPPINGS is wrapped to record,
+per node type:
+
+    calls, errors, total/max latency and a latency histogram
+    bytes read from disk by flower-tools helpers during the call
+    hits and misses of the flower-tools caches during the call
+    peak Python allocation (tracemalloc), when memory profiling is on
+
+Disabling restores the original methods, so there is no per-call overhead
+at all while profiling is off; the only remaining cost is one flag check in
+the helpers that report disk reads.
+
+Executions skipped by the per-node result memos (result_memo.py) are
+reported under "memo" whether profiling is on or not.
+
+Cache and byte counts are attributed by the difference before and after a
+node call. Route handlers reading the same caches at the same moment are
+counted too, so treat them as close approximations.
+"""
+
+import functools
+import os
+import threading
+import time
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+ENABLED = False
+MEMORY = False
+
+_lock = threading.Lock()
+_metrics = {}  # node name -> dict
+_originals = {}  # class -> (method name, original function)
+_mappings = {}
+_io = threading.local()
+
+
+def add_bytes_read(n):
+    """Report `n` bytes read from disk by the current thread (no-op unless profiling)."""
+    if ENABLED:
+        _io.bytes = getattr(_io, "bytes", 0) + n
+
+
+def _cache_counters():
+    """Return total (hits, misses) over the flower-tools caches."""
+    from .wildcard_cache import wildcard_cache
+    from .keyword_matcher import compile_matcher, table_cache
+    from .filename_template import compile_template
+    from .string_search import match_index
+
+    hits = wildcard_cache.hits + table_cache.hits
+    misses = wildcard_cache.misses + table_cache.misses
+    for fn in (compile_matcher, compile_template, match_index):
+        info = fn.cache_info()
+        hits += info.hits
+        misses += info.misses
+    return hits, misses
+
+
+def _new_entry():
+    return {
+        "calls": 0,
+        "errors": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "last_ms": 0.0,
+        "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        "bytes_read": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "peak_alloc_bytes": 0,
+    }
+
+
+def _record(name, elapsed_ms, failed, bytes_read, hits, misses, peak):
+    with _lock:
+        entry = _metrics.get(name)
+        if entry is None:
+            entry = _metrics[name] = _new_entry()
+        entry["calls"] += 1
+        entry["errors"] += failed
+        entry["total_ms"] += elapsed_ms
+        entry["last_ms"] = elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        bucket = len(LATENCY_BUCKETS_MS)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                bucket = i
+                break
+        entry["buckets"][bucket] += 1
+        entry["bytes_read"] += bytes_read
+        entry["cache_hits"] += hits
+        entry["cache_misses"] += misses
+        entry["peak_alloc_bytes"] = max(entry["peak_alloc_bytes"], peak)
+
+
+def _wrap(name, original):
+    @functools.wraps(original)
+    def profiled(self, *args, **kwargs):
+        tracemalloc = None
+        if MEMORY:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        hits0, misses0 = _cache_counters()
+        _io.bytes = 0
+        failed = 0
+        start = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        except BaseException:
+            failed = 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            hits1, misses1 = _cache_counters()
+            peak = tracemalloc.get_traced_memory()[1] - base if tracemalloc is not None else 0
+            _record(name, elapsed_ms, failed, getattr(_io, "bytes", 0), hits1 - hits0, misses1 - misses0, max(0, peak))
+
+    profiled.__flower_profiled__ = True
+    return profiled
+
+
+def _install():
+    for name, cls in _mappings.items():
+        method_name = getattr(cls, "FUNCTION", None)
+        original = cls.__dict__.get(method_name) if method_name else None
+        if original is None or cls in _originals or getattr(original, "__flower_profiled__", False):
+            continue
+        _originals[cls] = (method_name, original)
+        setattr(cls, method_name, _wrap(name, original))
+
+
+def _uninstall():
+    for cls, (method_name, original) in _originals.items():
+        setattr(cls, method_name, original)
+    _originals.clear()
+
+
+def instrument(mappings):
+    """Remember the node classes to profile; wraps them now if profiling is enabled."""
+    _mappings.update(mappings)
+    if ENABLED:
+        _install()
+
+
+def configure(enabled=None, memory=None, reset=False):
+    """
+    Turn profiling and tracemalloc on or off at runtime.
+
+    Args:
+        enabled: True/False to wrap/unwrap the node classes, None to keep
+        memory: True/False to start/stop tracemalloc, None to keep
+        reset: Clear the collected metrics
+    """
+    global ENABLED, MEMORY
+    with _lock:
+        if reset:
+            _metrics.clear()
+    if memory is not None and memory != MEMORY:
+        import tracemalloc
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        elif tracemalloc.is_tracing():
+            tracemalloc.stop()
+        MEMORY = memory
+    if enabled is not None and enabled != ENABLED:
+        ENABLED = enabled
+        if enabled:
+            _install()
+        else:
+            _uninstall()
+
+
+def snapshot():
+    """Return the collected metrics as a JSON-serializable dict."""
+    from . import result_memo
+
+    with _lock:
+        nodes = {}
+        for name, entry in _metrics.items():
+            calls = entry["calls"]
+            lookups = entry["cache_hits"] + entry["cache_misses"]
+            nodes[name] = dict(
+                entry,
+                buckets=list(entry["buckets"]),
+                avg_ms=entry["total_ms"] / calls if calls else 0.0,
+                cache_hit_rate=entry["cache_hits"] / lookups if lookups else None,
+            )
+    return {
+        "enabled": ENABLED,
+        "memory": MEMORY,
+        "bucket_bounds_ms": list(LATENCY_BUCKETS_MS),
+        "nodes": nodes,
+        "memo": result_memo.stats(),
+    }
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Render the metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = [
+        "# HELP flower_tools_profiling_enabled Whether node profiling is on.",
+        "# TYPE flower_tools_profiling_enabled gauge",
+        f"flower_tools_profiling_enabled {int(data['enabled'])}",
+    ]
+    series = (
+        ("node_calls_total", "counter", "Node executions.", "calls"),
+        ("node_errors_total", "counter", "Node executions that raised.", "errors"),
+        ("node_bytes_read_total", "counter", "Bytes read from disk during node executions.", "bytes_read"),
+        ("node_cache_hits_total", "counter", "flower-tools cache hits during node executions.", "cache_hits"),
+        ("node_cache_misses_total", "counter", "flower-tools cache misses during node executions.", "cache_misses"),
+        ("node_peak_alloc_bytes", "gauge", "Largest tracemalloc peak of a single execution.", "peak_alloc_bytes"),
+    )
+    for metric, kind, help_text, key in series:
+        lines.append(f"# HELP flower_tools_{metric} {help_text}")
+        lines.append(f"# TYPE flower_tools_{metric} {kind}")
+        for name, entry in data["nodes"].items():
+            lines.append(f'flower_tools_{metric}{{node="{_label(name)}"}} {entry[key]}')
+
+    lines.append("# HELP flower_tools_node_latency_seconds Node execution latency.")
+    lines.append("# TYPE flower_tools_node_latency_seconds histogram")
+    for name, entry in data["nodes"].items():
+        label = _label(name)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, entry["buckets"]):
+            cumulative += count
+            lines.append(f'flower_tools_node_latency_seconds_bucket{{node="{label}",le="{bound / 1000:g}"}} {cumulative}')
+        lines.append(f'flower_tools_node_latency_seconds_bucket{{node="{label}",le="+Inf"}} {entry["calls"]}')
+        lines.append(f'flower_tools_node_latency_seconds_sum{{node="{label}"}} {entry["total_ms"] / 1000}')
+        lines.append(f'flower_tools_node_latency_seconds_count{{node="{label}"}} {entry["calls"]}')
+
+    memo_series = (
+        ("memo_saved_executions_total", "counter", "Node executions answered from the result memo.", "saved_executions", 1),
+        ("memo_saved_seconds_total", "counter", "Compute time skipped by result memo hits.", "saved_ms", 1000),
+        ("memo_entries", "gauge", "Results held in the result memo.", "entries", 1),
+    )
+    for metric, kind, help_text, key, scale in memo_series:
+        lines.append(f"# HELP flower_tools_{metric} {help_text}")
+        lines.append(f"# TYPE flower_tools_{metric} {kind}")
+        for name, entry in data["memo"].items():
+            lines.append(f'flower_tools_{metric}{{node="{_label(name)}"}} {entry[key] / scale:g}')
+    return "\n".join(lines) + "\n"
+
+
+def register_routes(routes):
+    """Add GET/POST /flower-tools/metrics to an aiohttp RouteTableDef."""
+    from aiohttp import web
+
+    @routes.get("/flower-tools/metrics")
+    async def get_metrics(request):
+        if request.query.get("format") == "prometheus":
+            return web.Response(body=prometheus_text().encode("utf-8"),
+                                headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+        return web.json_response(snapshot())
+
+    @routes.post("/flower-tools/metrics")
+    async def set_metrics(request):
+        try: body = await request.json()
+        except: body = {}
+        if "memo_size" in body or body.get("memo_clear"):
+            from . import result_memo
+            try:
+                result_memo.configure(max_entries=int(body["memo_size"]) if "memo_size" in body else None,
+                                      clear=bool(body.get("memo_clear")))
+            except (TypeError, ValueError):
+                return web.json_response({"error": "memo_size must be an integer"}, status=400)
+        configure(
+            enabled=bool(body["enabled"]) if "enabled" in body else None,
+            memory=bool(body["memory"]) if "memory" in body else None,
+            reset=bool(body.get("reset")),
+        )
+        return web.json_response(snapshot())
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+configure(enabled=_env_flag("FLOWER_TOOLS_PROFILE"), memory=_env_flag("FLOWER_TOOLS_PROFILE_MEMORY"))
@@ -0,0 +1,242 @@
+"""
+Standalone OpenCC worker processes for FlowerCSTSConverter.
+
+opencc-python-reimplemented is pure Python and holds the GIL, so large
+conversions run on separate interpreters. They are started as
+`python opencc_worker.py` rather than forked from ComfyUI, which is
+multi-threaded and has torch loaded, or started through multiprocessing's
+spawn/forkserver, which re-runs ComfyUI's main.py in every worker. This module
+imports only the standard library (and opencc inside a worker), so it is
+cheap to import on both sides.
+
+A worker reads pickled jobs from stdin and writes one pickled reply per job
+to stdout, in order. WorkerPool keeps its workers running between jobs, so the
+dictionaries each one loads are reused, and hands jobs to idle workers from a
+few threads that mostly wait on the pipes. A worker exits when its stdin
+closes, including when ComfyUI exits without closing the pool.
+"""
+
+import atexit
+import os
+import pickle
+import queue
+import sys
+import threading
+
+
+def create_converter(opencc_module, config_base):
+    """
+    Create OpenCC converter instance with fallback for different versions.
+
+    Args:
+        opencc_module: The imported opencc module
+        config_base: Base config name (e.g., 'tw2sp', 's2twp')
+
+    Returns:
+        OpenCC converter instance
+
+    Raises:
+        Exception: If converter creation fails with all options
+    """
+    # Try with and without .json extension to support different OpenCC versions
+    # opencc-python-reimplemented adds .json automatically
+    # standard opencc often requires the .json extension
+    options = [config_base, config_base + '.json']
+
+    last_error = ""
+    for opt in options:
+        try:
+            converter = opencc_module.OpenCC(opt)
+            # Test conversion to ensure config is valid
+            converter.convert("test")
+            return converter
+        except Exception as e:
+            last_error = str(e)
+            continue
+
+    raise Exception(f"Failed to load OpenCC config '{config_base}'. Last error: {last_error}")
+
+
+def split_line_chunks(text, chunk_chars):
+    """
+    Split text into chunks of roughly `chunk_chars` characters, cut only after a newline.
+
+    Args:
+        text: Text to split
+        chunk_chars: Target chunk size in characters
+
+    Returns:
+        List of chunks whose concatenation equals `text`
+    """
+    if len(text) <= chunk_chars:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + chunk_chars)
+        if end == -1:
+            chunks.append(text[start:])
+            break
+        chunks.append(text[start:end + 1])
+        start = end + 1
+    return chunks
+
+
+def convert_file(converter, path, target, chunk_chars):
+    """Convert one file into `target`, a chunk at a time, and return `target`."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    out = "".join(converter.convert(chunk) for chunk in split_line_chunks(text, chunk_chars))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "w", encoding="utf-8", newline="") as f:
+        f.write(out)
+    return target
+
+
+# --- Worker side ---
+
+def _serve(inp, out):
+    """Answer (kind, config_base, args) jobs until stdin closes."""
+    import opencc
+    converters = {}
+    while True:
+        try:
+            kind, config_base, args = pickle.load(inp)
+        except EOFError:
+            return
+        try:
+            converter = converters.get(config_base)
+            if converter is None:
+                converter = converters[config_base] = create_converter(opencc, config_base)
+            if kind == "chunk":
+                reply = (True, converter.convert(*args))
+            else:
+                reply = (True, convert_file(converter, *args))
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        pickle.dump(reply, out, protocol=pickle.HIGHEST_PROTOCOL)
+        out.flush()
+
+
+# --- ComfyUI side ---
+
+class WorkerError(Exception):
+    """A job failed inside a worker, or the worker died."""
+
+
+class WorkerPool:
+    """
+    Long-lived `opencc_worker.py` processes.
+
+    Args:
+        size: Number of workers, started on the first map()
+        paths: Directories prepended to the workers' PYTHONPATH (where opencc lives)
+    """
+
+    def __init__(self, size, paths=()):
+        self.size = max(1, size)
+        self.paths = [p for p in paths if p]
+        self._idle = queue.Queue()
+        self._procs = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self):
+        import subprocess
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(self.paths + [p for p in [env.get("PYTHONPATH")] if p])
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__)], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, env=env, **kwargs)
+        self._procs.append(proc)
+        return proc
+
+    def _start(self):
+        with self._lock:
+            if self._closed:
+                raise WorkerError("worker pool is closed")
+            while len(self._procs) < self.size:
+                self._idle.put(self._spawn())
+
+    def _replace(self, proc):
+        """Kill a worker that failed mid-job and return a fresh one."""
+        proc.kill()
+        proc.wait()
+        with self._lock:
+            self._procs.remove(proc)
+            return self._spawn()
+
+    def _call(self, job):
+        proc = self._idle.get()
+        try:
+            pickle.dump(job, proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+            proc.stdin.flush()
+            ok, value = pickle.load(proc.stdout)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            # 工作行程中途結束 (例如被系統終止)，換一個新的再回報錯誤
+            proc = self._replace(proc)
+            raise WorkerError(f"OpenCC worker exited: {e}")
+        finally:
+            self._idle.put(proc)
+        if not ok:
+            raise WorkerError(value)
+        return value
+
+    def map(self, kind, config_base, arg_lists):
+        """
+        Run one job per set of arguments and return the results in input order.
+
+        Args:
+            kind: "chunk" (args: text) or "file" (args: path, target, chunk_chars)
+            config_base: Base config name (e.g., 'tw2sp', 's2twp')
+            arg_lists: List of argument tuples
+
+        Raises:
+            WorkerError: If a job failed; the other jobs still finish first
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        self._start()
+        jobs = [(kind, config_base, args) for args in arg_lists]
+        with ThreadPoolExecutor(max_workers=min(self.size, len(jobs)), thread_name_prefix="flower-opencc") as pool:
+            return list(pool.map(self._call, jobs))
+
+    def close(self):
+        """Stop every worker; idle workers exit when their stdin closes."""
+        with self._lock:
+            self._closed = True
+            procs, self._procs = self._procs, []
+        for proc in procs:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+        for proc in procs:
+            try:
+                proc.wait(timeout=5)
+            except Exception:
+                proc.kill()
+
+
+_pools = []
+
+
+@atexit.register
+def _close_pools():
+    for pool in _pools:
+        pool.close()
+
+
+def start_pool(size, paths=()):
+    """Return a new WorkerPool that is closed when the interpreter exits."""
+    pool = WorkerPool(size, paths)
+    _pools.append(pool)
+    return pool
+
+
+if __name__ == "__main__":
+    # stdout carries the replies; anything a library prints goes to stderr instead
+    _out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    _serve(sys.stdin.buffer, _out)
@@ -0,0 +1,230 @@
+"""
+Cancellable pip install jobs run as asyncio subprocesses.
+
+Installing a package can take minutes. The old routes ran pip through
+subprocess.run inside an aiohttp handler, which froze ComfyUI's event loop
+(and every websocket client) until pip returned. A PipJob runs pip with
+asyncio.create_subprocess_exec on the server's own loop instead, so the loop
+stays free. It forwards every output line to a listener as it arrives. Each
+job has an id, can be cancelled, and has an overall timeout.
+"""
+
+import asyncio
+import os
+import shlex
+import sys
+import time
+import uuid
+from collections import OrderedDict, deque
+
+# Log lines kept per job; older lines are dropped (the listener saw them all)
+MAX_LOG_LINES = 5000
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 10
+# Seconds a terminated pip gets to exit before it is killed
+TERMINATE_GRACE = 5.0
+
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMEOUT = "timeout"
+
+
+def pip_extra_args():
+    """Extra pip arguments from FLOWER_TOOLS_PIP_ARGS (e.g. "--no-index --find-links ./wheels")."""
+    return shlex.split(os.environ.get("FLOWER_TOOLS_PIP_ARGS", ""), posix=os.name != "nt")
+
+
+class PipJob:
+    """
+    One `pip install` run that tries each candidate package until one succeeds.
+
+    Args:
+        packages: Package specs to try in order (e.g. a fallback implementation)
+        timeout: Seconds for the whole job, or None for no limit
+        on_line: Optional listener(job, line) called for every log line
+        on_done: Optional listener(job) called once the job has finished
+    """
+
+    def __init__(self, packages, timeout=None, on_line=None, on_done=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.packages = list(packages)
+        self.timeout = timeout
+        self.state = RUNNING
+        self.package = None  # candidate currently (or finally) being installed
+        self.returncode = None
+        self.started = time.time()
+        self.finished = None
+        self._log = deque(maxlen=MAX_LOG_LINES)
+        self._lines = 0
+        self._on_line = on_line
+        self._on_done = on_done
+        self._proc = None
+        self._task = None
+        self._cancelling = False
+
+    def start(self):
+        """Schedule the job on the running event loop and return it."""
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def wait(self):
+        """Wait for the job to finish (cancelling the waiter does not cancel the job)."""
+        await asyncio.shield(self._task)
+        return self
+
+    def cancel(self):
+        """Request cancellation; returns False if the job has already finished."""
+        if self.state != RUNNING or self._task is None or self._cancelling:
+            return False
+        self._cancelling = True
+        self._task.cancel()
+        return True
+
+    @property
+    def done(self):
+        return self.state != RUNNING
+
+    @property
+    def succeeded(self):
+        return self.state == SUCCEEDED
+
+    def log(self, since=0):
+        """Return (log lines from line number `since`, next line number)."""
+        first = self._lines - len(self._log)
+        lines = list(self._log)[max(0, since - first):]
+        return lines, self._lines
+
+    def to_dict(self, since=None):
+        data = {
+            "job_id": self.id,
+            "state": self.state,
+            "packages": self.packages,
+            "package": self.package,
+            "returncode": self.returncode,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed": (self.finished or time.time()) - self.started,
+        }
+        if since is not None:
+            data["log"], data["next_line"] = self.log(since)
+        return data
+
+    def emit(self, line):
+        """Append a line to the log and forward it to the listener."""
+        self._log.append(line)
+        self._lines += 1
+        print(line)
+        if self._on_line is not None:
+            try:
+                self._on_line(self, line)
+            except Exception as e:
+                print(f"--- Flower Tools: pip log listener failed: {e} ---", file=sys.stderr)
+
+    # --- internals -------------------------------------------------------
+
+    async def _run(self):
+        try:
+            await asyncio.wait_for(self._install_all(), self.timeout)
+        except asyncio.TimeoutError:
+            self.state = TIMEOUT
+            self.emit(f"Timed out after {self.timeout:g} s")
+        except asyncio.CancelledError:
+            self.state = CANCELLED
+            self.emit("Cancelled")
+        except Exception as e:
+            self.state = FAILED
+            self.emit(f"Error: {e}")
+        finally:
+            await self._stop_process()
+            self.finished = time.time()
+            if self._on_done is not None:
+                try:
+                    self._on_done(self)
+                except Exception as e:
+                    print(f"--- Flower Tools: pip job listener failed: {e} ---", file=sys.stderr)
+
+    async def _install_all(self):
+        for i, package in enumerate(self.packages):
+            if i:
+                self.emit(f"'{self.packages[i - 1]}' installation failed. Retrying with '{package}'...")
+            self.package = package
+            self.returncode = await self._install(package)
+            if self.returncode == 0:
+                self.state = SUCCEEDED
+                return
+        self.state = FAILED
+
+    async def _install(self, package):
+        cmd = [sys.executable, "-m", "pip", "install", *pip_extra_args(), package]
+        self.emit(f"--- {package} install log ---")
+        self.emit("$ " + " ".join(cmd))
+        self._proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            env=dict(os.environ, PYTHONUNBUFFERED="1", PIP_NO_INPUT="1"),
+        )
+        while True:
+            raw = await self._proc.stdout.readline()
+            if not raw:
+                break
+            self.emit(raw.decode("utf-8", "replace").rstrip("\r\n"))
+        returncode = await self._proc.wait()
+        self._proc = None
+        return returncode
+
+    async def _stop_process(self):
+        proc, self._proc = self._proc, None
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            proc.terminate()
+            try:
+                await asyncio.wait_for(proc.wait(), TERMINATE_GRACE)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+        except ProcessLookupError:
+            pass
+
+
+class PipJobs:
+    """Registry that allows one running job per name and keeps a few finished ones."""
+
+    def __init__(self):
+        self._jobs = OrderedDict()  # job id -> PipJob
+        self._running = {}  # name -> PipJob
+
+    def start(self, name, packages, timeout=None, on_line=None, on_done=None):
+        """
+        Start a job under `name`, or return the one already running.
+
+        Returns:
+            (job, started) where started is False if an existing job was returned
+        """
+        current = self._running.get(name)
+        if current is not None and not current.done:
+            return current, False
+
+        def _finished(job):
+            self._running.pop(name, None)
+            if on_done is not None:
+                on_done(job)
+
+        job = PipJob(packages, timeout, on_line, _finished)
+        self._running[name] = job
+        self._jobs[job.id] = job
+        self._trim()
+        return job.start(), True
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def running(self, name):
+        job = self._running.get(name)
+        return job if job is not None and not job.done else None
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
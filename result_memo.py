@@ -0,0 +1,228 @@
+"""
+Content-hash keys and bounded result memos for flower-tools nodes.
+
+ComfyUI reuses a node's output only while its inputs and IS_CHANGED value
+stay the same within one server session. The nodes here also need to notice
+changes that are not inputs, such as a wildcard file edited on disk. They
+should also reuse work when the inputs differ but the result cannot, for
+example two seeds that map to the same process index.
+
+`content_key` hashes input values. The file helpers below fold on-disk state
+into a key. `memoize` keeps the last results of a node method per key in a
+small LRU shared by every instance of the node, so repeated queue items with
+identical inputs skip the computation. Hits are counted as saved executions
+and reported through /flower-tools/metrics.
+
+The memo stores each result once with its lists turned into tuples, and every
+hit returns that same frozen value, so a downstream node cannot change what
+later hits return and a hit costs no copying.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def _env_int(name, default):
+    try:
+        return max(0, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+DEFAULT_MEMO_SIZE = 32
+# Results kept per node (FLOWER_TOOLS_MEMO_SIZE); 0 disables memoization
+MEMO_SIZE = _env_int("FLOWER_TOOLS_MEMO_SIZE", DEFAULT_MEMO_SIZE)
+
+
+def _freeze(value):
+    """Hashable, type-tagged form of a JSON-like value (strings stay as they are)."""
+    cls = type(value)
+    if cls is str:
+        return value
+    if cls is list or cls is tuple:
+        return ("l", tuple([v if type(v) is str else _freeze(v) for v in value]))
+    if cls is dict:
+        return ("d", tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if value is None or cls in (bool, int, float):
+        # 1, 1.0 and True hash alike, so keep the type in the key
+        return (cls.__name__, value)
+    raise TypeError(cls.__name__)
+
+
+def content_key(*values):
+    """
+    Return a hex key of the given values, or None if one cannot be hashed.
+
+    Supports None, bool, int, float, str and lists/tuples/dicts of those. Keys
+    are built from Python's hash(); a str caches its hash, so hashing the same
+    long text again (IS_CHANGED, then the memo lookup) costs nothing. Keys are
+    only meaningful within one process, like ComfyUI's own cache.
+    """
+    try:
+        return format(hash(_freeze(values)) & 0xFFFFFFFFFFFFFFFF, "016x")
+    except TypeError:
+        return None
+
+
+def file_signature(path):
+    """Return (mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def tree_signature(directory, suffix=".txt"):
+    """Return sorted [relative path, mtime_ns, size] of every `suffix` file under a directory."""
+    entries = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(suffix):
+                path = os.path.join(root, name)
+                sig = file_signature(path)
+                if sig is not None:
+                    entries.append([os.path.relpath(path, directory), sig[0], sig[1]])
+    return entries
+
+
+def freeze_result(value):
+    """
+    Return a node result with every list turned into a tuple.
+
+    Dicts (the {"ui": ..., "result": ...} form) are rebuilt with frozen values;
+    strings and other scalars are shared.
+    """
+    cls = type(value)
+    if cls is list or cls is tuple:
+        return tuple([v if type(v) is str else freeze_result(v) for v in value])
+    if cls is dict:
+        return {k: freeze_result(v) for k, v in value.items()}
+    return value
+
+
+class ResultMemo:
+    """
+    LRU of node results keyed by content hash.
+
+    Args:
+        max_entries: Results kept; 0 disables the memo
+    """
+
+    def __init__(self, max_entries=MEMO_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (result, compute ms)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def get(self, key):
+        """Return (True, result) on a hit, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_ms += entry[1]
+            return True, entry[0]
+
+    def put(self, key, result, elapsed_ms):
+        with self._lock:
+            if self.max_entries <= 0:
+                return
+            self._entries[key] = (result, elapsed_ms)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def resize(self, max_entries):
+        with self._lock:
+            self.max_entries = max(0, int(max_entries))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "saved_executions": self.hits,
+                "misses": self.misses,
+                "saved_ms": self.saved_ms,
+            }
+
+
+_memos = {}  # node name -> ResultMemo
+
+
+def memo_for(name):
+    """Return the shared memo of a node type."""
+    memo = _memos.get(name)
+    if memo is None:
+        memo = _memos.setdefault(name, ResultMemo(MEMO_SIZE))
+    return memo
+
+
+def memoize(name, key_func, cache_if=None):
+    """
+    Memoize a node method in the shared memo `name`.
+
+    Args:
+        name: Node type name used for the memo and in reports
+        key_func: Called with the method's arguments (without self); returns a
+            content key, or None to run the method without memoizing
+        cache_if: Optional predicate on the result; False keeps it out of the memo
+            (e.g. error outputs that may succeed on retry)
+    """
+    memo = memo_for(name)
+
+    def decorator(method):
+        @functools.wraps(method)
+        def memoized(self, *args, **kwargs):
+            if memo.max_entries <= 0:
+                return method(self, *args, **kwargs)
+            key = key_func(*args, **kwargs)
+            if key is None:
+                return method(self, *args, **kwargs)
+            hit, result = memo.get(key)
+            if hit:
+                return result
+            start = time.perf_counter()
+            result = method(self, *args, **kwargs)
+            if cache_if is None or cache_if(result):
+                # 存入與回傳同一份凍結的結果，之後命中不需複製
+                result = freeze_result(result)
+                memo.put(key, result, (time.perf_counter() - start) * 1000)
+            return result
+
+        return memoized
+
+    return decorator
+
+
+def stats():
+    """Return {node name: memo stats} for every memoized node."""
+    return {name: memo.stats() for name, memo in sorted(_memos.items())}
+
+
+def configure(max_entries=None, clear=False):
+    """Resize or clear every memo at runtime."""
+    global MEMO_SIZE
+    if max_entries is not None:
+        MEMO_SIZE = max(0, int(max_entries))
+    for memo in list(_memos.values()):
+        if clear:
+            memo.clear()
+        if max_entries is not None:
+            memo.resize(max_entries)
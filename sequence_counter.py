@@ -0,0 +1,143 @@
+"""
+Persistent sequence counters for the %COUNTER filename token.
+
+Each scope (the rendered output directory of FlowerFileNameCombination) has
+its own counter file in the counter directory. Taking a number holds a
+per-scope thread lock and an exclusive OS file lock, so values are unique
+across threads and across ComfyUI processes sharing the same counter
+directory, and the output directory itself is never scanned.
+
+The last value handed out by this process is cached as a high-water mark:
+if the counter file is deleted or rolled back, numbering continues above it
+instead of repeating names this process already produced.
+
+Counter file layout: the next value as ASCII digits, replaced atomically.
+"""
+
+import hashlib
+import os
+import threading
+
+COUNTER_DIR = os.environ.get(
+    "FLOWER_TOOLS_COUNTER_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".flower_cache", "counters"),
+)
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock(f):
+        f.seek(0)
+        # LK_LOCK retries for ~10 s before raising; loop so waiting is unbounded like flock
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _read_value(path):
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_value(path, value):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="ascii") as f:
+        f.write(str(value))
+    os.replace(tmp_path, path)
+
+
+class SequenceCounter:
+    """
+    Per-scope counters that never hand out the same value twice.
+
+    Args:
+        directory: Where counter and lock files are kept
+        start: First value of a new scope
+    """
+
+    def __init__(self, directory=COUNTER_DIR, start=1):
+        self.directory = directory
+        self.start = start
+        self._lock = threading.Lock()
+        self._scope_locks = {}
+        self._high_water = {}  # scope -> last value handed out by this process
+
+    def _scope_lock(self, scope):
+        with self._lock:
+            lock = self._scope_locks.get(scope)
+            if lock is None:
+                lock = self._scope_locks[scope] = threading.Lock()
+            return lock
+
+    def path_for(self, scope):
+        """Return the counter file used for a scope."""
+        digest = hashlib.sha1(scope.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.counter")
+
+    def next(self, scope=""):
+        """
+        Take the next value of a scope.
+
+        Args:
+            scope: Counter scope, e.g. the output directory
+
+        Returns:
+            int, strictly greater than every value previously returned for this
+            scope by any process using the same counter directory
+        """
+        path = self.path_for(scope)
+        with self._scope_lock(scope):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".lock", "a+b") as lock_file:
+                _lock(lock_file)
+                try:
+                    stored = _read_value(path)
+                    value = max(stored, self._high_water.get(scope, 0) + 1, self.start)
+                    _write_value(path, value + 1)
+                finally:
+                    _unlock(lock_file)
+            self._high_water[scope] = value
+        return value
+
+    def peek(self, scope=""):
+        """Return the value the next call to `next(scope)` would hand out (no locking)."""
+        return max(_read_value(self.path_for(scope)), self._high_water.get(scope, 0) + 1, self.start)
+
+    def reset(self, scope="", value=None):
+        """
+        Restart a scope so its next value is `value` (default: `start`).
+
+        The high-water mark of this process is reset too, so numbers may repeat.
+        """
+        value = self.start if value is None else value
+        path = self.path_for(scope)
+        with self._scope_lock(scope):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".lock", "a+b") as lock_file:
+                _lock(lock_file)
+                try:
+                    _write_value(path, value)
+                finally:
+                    _unlock(lock_file)
+            self._high_water.pop(scope, None)
+
+
+sequence_counter = SequenceCounter()
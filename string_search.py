@@ -0,0 +1,250 @@
+"""
+Match-position engine for FlowerStringComparison.
+
+All matches of a query are found in one pass and kept in a small cache keyed
+by (text, query, mode, case), so asking for another occurrence, the other
+direction or the match count on the same text is a lookup instead of a new
+scan. Each entry keeps its text alive, so the cache is bounded by the bytes
+of the texts and offsets it holds as well as by its entry count.
+
+nth_match answers a single "k-th match" question without collecting the
+other matches, stopping after k of them.
+
+Case-insensitive literal search lowers both strings with str.lower() and
+searches the copy, exactly as the original node did (so 'İ', which lowers
+to two characters, shifts later offsets). Regex and multi-needle queries use
+re.IGNORECASE on the original text instead.
+"""
+
+import functools
+import re
+import sys
+import threading
+from array import array
+from collections import OrderedDict, namedtuple
+from itertools import islice
+
+from .keyword_matcher import _trie_pattern
+
+# literal: 字串B 整段 / regex: 正規表示式 / multi: 每行一個關鍵字
+SEARCH_MODES = ("literal", "regex", "multi")
+
+# match_index keeps at most this many results, holding at most MATCH_CACHE_BYTES
+# of texts, queries and offsets; a larger single result is not cached
+MATCH_CACHE_ENTRIES = 64
+MATCH_CACHE_BYTES = 32 * 1024 * 1024
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class MatchIndex:
+    """
+    Start and end offsets of every match of one query in one text, ascending.
+
+    Literal and multi-needle matches may overlap (each position is tested, as
+    the original find loop did); regex matches follow re.finditer and do not.
+    """
+
+    __slots__ = ("starts", "ends", "_positions")
+
+    def __init__(self, starts, ends):
+        self.starts = starts
+        self.ends = ends
+        self._positions = None
+
+    @property
+    def positions(self):
+        """All start offsets as a tuple, built once per index."""
+        if self._positions is None:
+            self._positions = tuple(self.starts)
+        return self._positions
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def nbytes(self):
+        return (len(self.starts) + len(self.ends)) * self.starts.itemsize
+
+    def nth(self, k):
+        """Start of the k-th match from the front (1-based), or -1."""
+        return self.starts[k - 1] if 0 < k <= len(self.starts) else -1
+
+    def nth_from_end(self, k):
+        """
+        Start of the k-th match from the back (1-based), or -1.
+
+        Like the original rfind loop, each match must end at or before the
+        start of the previous one, so overlapping matches are skipped.
+        """
+        starts, ends = self.starts, self.ends
+        limit = None
+        i = len(starts) - 1
+        for _ in range(k):
+            while i >= 0 and limit is not None and ends[i] > limit:
+                i -= 1
+            if i < 0:
+                return -1
+            limit = starts[i]
+            i -= 1
+        return limit
+
+
+def _compile(query, mode, ignore_case):
+    """Return (compiled regex, whether the match end comes from group 1), or (None, False)."""
+    flags = re.IGNORECASE if ignore_case else 0
+    if mode == "regex":
+        return re.compile(query, flags), False
+    needles = [line for line in query.splitlines() if line]
+    if not needles:
+        return None, False
+    pattern = _trie_pattern(needles)
+    # The lookahead makes matches zero-width, so every start position is found
+    # (overlapping matches included); the group captures the matched text
+    return re.compile(f"(?=({pattern}))", flags), True
+
+
+class _SizedCache:
+    """
+    LRU cache of a (text, query, mode, ignore_case) function, bounded by entries and bytes.
+
+    Offers lru_cache's cache_info() and cache_clear(), which the metrics and
+    benchmarks use.
+    """
+
+    def __init__(self, func, max_entries, max_bytes):
+        functools.update_wrapper(self, func)
+        self._func = func
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (MatchIndex, nbytes)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, text, query, mode="literal", ignore_case=False):
+        key = (text, query, mode, ignore_case)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        index = self._func(text, query, mode, ignore_case)
+        nbytes = sys.getsizeof(text) + sys.getsizeof(query) + index.nbytes
+        if nbytes > self.max_bytes:
+            return index
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (index, nbytes)
+                self._total_bytes += nbytes
+                while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                    _, (_, size) = self._entries.popitem(last=False)
+                    self._total_bytes -= size
+        return index
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.max_entries, len(self._entries))
+
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self.hits = self.misses = 0
+
+
+def _sized_cache(max_entries, max_bytes):
+    return lambda func: _SizedCache(func, max_entries, max_bytes)
+
+
+@_sized_cache(MATCH_CACHE_ENTRIES, MATCH_CACHE_BYTES)
+def match_index(text, query, mode="literal", ignore_case=False):
+    """
+    Return the cached MatchIndex of `query` in `text`.
+
+    Args:
+        text: Text to search
+        query: Needle, regular expression, or newline-separated needles
+        mode: One of SEARCH_MODES
+        ignore_case: Match with Unicode case folding
+
+    Raises:
+        re.error: If a regex query does not compile
+    """
+    starts = array("q")
+    ends = array("q")
+    if not query:
+        return MatchIndex(starts, ends)
+
+    if mode == "literal":
+        # str.find is the fastest scan for a single needle
+        if ignore_case:
+            text, query = text.lower(), query.lower()
+        width = len(query)
+        find = text.find
+        pos = find(query)
+        while pos != -1:
+            starts.append(pos)
+            ends.append(pos + width)
+            pos = find(query, pos + 1)
+        return MatchIndex(starts, ends)
+
+    regex, lookahead = _compile(query, mode, ignore_case)
+    if regex is None:
+        return MatchIndex(starts, ends)
+    if not lookahead:
+        for m in regex.finditer(text):
+            starts.append(m.start())
+            ends.append(m.end())
+    else:
+        for m in regex.finditer(text):
+            starts.append(m.start())
+            ends.append(m.end(1))
+    return MatchIndex(starts, ends)
+
+
+def nth_match(text, query, k, from_end=False, mode="literal", ignore_case=False):
+    """
+    Return the start of the k-th match (1-based) of `query` in `text`, or -1.
+
+    Stops after the k-th match instead of collecting all of them, so asking
+    for an early occurrence in a long text stays cheap. Literal queries use
+    the original find/rfind loops; a regex or multi-needle query from the end
+    needs every match and goes through the cached match_index.
+
+    Raises:
+        re.error: If a regex query does not compile
+    """
+    if mode == "literal":
+        if ignore_case:
+            text, query = text.lower(), query.lower()
+        if from_end:
+            pos = len(text)
+            for _ in range(k):
+                if pos <= 0:
+                    return -1
+                pos = text.rfind(query, 0, pos)
+                if pos == -1:
+                    break
+            return pos
+        pos = -1
+        for _ in range(k):
+            pos = text.find(query, pos + 1)
+            if pos == -1:
+                break
+        return pos
+
+    if not query:
+        return -1
+    if from_end:
+        return match_index(text, query, mode, ignore_case).nth_from_end(k)
+    regex, _ = _compile(query, mode, ignore_case)
+    if regex is None:
+        return -1
+    m = next(islice(regex.finditer(text), k - 1, None), None)
+    return m.start() if m is not None else -1
+
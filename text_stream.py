@@ -0,0 +1,68 @@
+"""
+Lazy joined text for very large combined prompts.
+
+A TextStream holds the item list and separator of a join without building
+the joined string. Consumers iterate over it chunk by chunk (or write it to a
+file, as FlowerSaveTextStream does) instead of receiving one huge STRING;
+str() still produces the full text for nodes that need it.
+"""
+
+from itertools import chain, islice, repeat
+
+# ComfyUI socket type of TextStream outputs
+TEXT_STREAM_TYPE = "FLOWER_TEXT_STREAM"
+
+
+class TextStream:
+    """
+    `separator.join(items) + suffix`, produced on demand.
+
+    Args:
+        items: Sequence of strings, kept by reference (pass a tuple so later
+            changes to a shared list cannot alter the stream)
+        separator: Placed between items
+        suffix: Appended after the last item
+    """
+
+    __slots__ = ("items", "separator", "suffix")
+
+    def __init__(self, items, separator="", suffix=""):
+        self.items = items
+        self.separator = separator
+        self.suffix = suffix
+
+    def __iter__(self):
+        """Yield the text as a sequence of chunks (items, separators and suffix)."""
+        items = self.items
+        if not items:
+            return
+        yield items[0]
+        if self.separator:
+            yield from chain.from_iterable(zip(repeat(self.separator), islice(items, 1, None)))
+        else:
+            yield from islice(items, 1, None)
+        if self.suffix:
+            yield self.suffix
+
+    def __len__(self):
+        """Length in characters of the joined text, computed without joining."""
+        if not self.items:
+            return 0
+        return sum(map(len, self.items)) + len(self.separator) * (len(self.items) - 1) + len(self.suffix)
+
+    def __str__(self):
+        if not self.items:
+            return ""
+        if self.suffix == self.separator:
+            # A trailing "" item adds the suffix inside the same join, avoiding
+            # a second copy of the whole text for "+ suffix"
+            return self.separator.join(chain(self.items, ("",)))
+        return self.separator.join(self.items) + self.suffix
+
+    def write_to(self, f):
+        """Write the text to a file object chunk by chunk; returns characters written."""
+        written = 0
+        for chunk in self:
+            f.write(chunk)
+            written += len(chunk)
+        return written
@@ -31,16 +31,18 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
             return na.localeCompare(nb, undefined, { numeric: true, sensitivity: 'base' });
         };
 
+        // --- 地基元件順序 (檔案按鈕一律排在這些元件之後) ---
+        const baseOrder = ["directory", "seed", "seed_control", "continuous_processing", "file_configs", "result_dialog", "refresh_btn", "shuffle_mode", "batch_size", "compose_mode", "separator", "expand_wildcards", "use_snapshot"];
+
         const rebuildFileButtons = function (node, filesFromApi) {
             if (!node.widgets) return;
 
-            // 1. 固定鎖定前 7 個 (索引 0-6)。其餘全部移除
-            if (node.widgets.length > 7) {
-                for (let i = node.widgets.length - 1; i >= 7; i--) {
-                    const w = node.widgets[i];
-                    if (w.inputEl) w.inputEl.remove();
-                    node.widgets.splice(i, 1);
-                }
+            // 1. 只移除先前建立的檔案按鈕，地基元件全部保留
+            for (let i = node.widgets.length - 1; i >= 0; i--) {
+                const w = node.widgets[i];
+                if (!w.__flowerFileButton) continue;
+                if (w.inputEl) w.inputEl.remove();
+                node.widgets.splice(i, 1);
             }
 
             // 2. 確定數據來源 (API 優先，但保持 ASCII)
@@ -54,12 +56,13 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
                 }));
             }
 
-            // 3. 從索引 7 開始新增按鈕，並加入間距
+            // 3. 於地基元件之後新增按鈕，並加入間距
             for (const file of displayList) {
                 const widget = node.addWidget("button", file.name, null, () => {
                     node.showSelectionPopup(file.name);
                 });
                 widget.type = "button";
+                widget.__flowerFileButton = true;
                 widget.last_count = file.count || "?";
 
                 // 設定高度 40 (35橫條 + 5間隔)
@@ -107,6 +110,45 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
             node.setDirtyCanvas(true);
         };
 
+        // --- 套用後端 watcher 推送的目錄變更 (新增/修改/刪除檔案) ---
+        const applyWildcardDelta = (node, delta) => {
+            const configs = node.fileConfigs || {};
+            let structural = false;
+            (delta.removed || []).forEach(name => {
+                if (configs[name]) { delete configs[name]; structural = true; }
+            });
+            [...(delta.added || []), ...(delta.modified || [])].forEach(f => {
+                if (configs[f.name]) {
+                    configs[f.name].count = f.count;
+                } else {
+                    configs[f.name] = { status: "disabled", count: f.count };
+                    structural = true;
+                }
+            });
+            node.fileConfigs = configs;
+
+            const cfw = node.widgets?.find(w => w.name === "file_configs");
+            if (cfw) cfw.value = JSON.stringify(configs, null, 2);
+
+            if (structural) {
+                rebuildFileButtons(node, null);
+            } else {
+                node.widgets?.forEach(w => {
+                    if (w.__flowerFileButton && configs[w.name]) w.last_count = configs[w.name].count ?? "?";
+                });
+                node.setDirtyCanvas(true);
+            }
+        };
+
+        api.addEventListener("flower-tools.wildcards-changed", ({ detail }) => {
+            if (!detail || !app.graph) return;
+            for (const node of app.graph._nodes || []) {
+                if (node.comfyClass === TARGET_KEY && node.__flowerWatchPath === detail.directory) {
+                    applyWildcardDelta(node, detail);
+                }
+            }
+        });
+
         const onNodeCreated = nodeType.prototype.onNodeCreated;
         nodeType.prototype.onNodeCreated = function () {
             onNodeCreated?.apply(this, arguments);
@@ -152,6 +194,8 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
                             return;
                         }
                         const data = await response.json();
+                        // 記錄後端解析後的絕對路徑，用來比對 watcher 推送
+                        if (data && data.path) this.__flowerWatchPath = data.path;
                         if (data && data.files && data.files.length > 0) {
                             // 🌸 重新構建 fileConfigs，只保留當前目錄有的檔案，避免不同目錄檔案混雜 (Fix Task 1) 🌸
                             const newConfigs = {};
@@ -184,7 +228,6 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
             }
 
             // --- 強制地基排序 (防止索引偏移) ---
-            const baseOrder = ["directory", "seed", "seed_control", "continuous_processing", "file_configs", "result_dialog", "refresh_btn"];
             const reorder = () => {
                 baseOrder.forEach((name, targetIdx) => {
                     const idx = this.widgets.findIndex(w => w.name === name);
@@ -214,6 +257,7 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
         const onExecuted = nodeType.prototype.onExecuted;
         nodeType.prototype.onExecuted = function (message) {
             onExecuted?.apply(this, arguments);
+            if (message.path) this.__flowerWatchPath = message.path[0];
             if (message.text) {
                 // 使用全新的 result_dialog 名稱進行同步
                 const res = this.widgets.find(w => w.name === "result_dialog");
@@ -225,11 +269,16 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
             }
         };
 
+        // 每次向後端請求的行數 (分頁載入，避免大檔一次塞爆瀏覽器)
+        const PAGE_SIZE = 500;
+
         nodeType.prototype.showSelectionPopup = async function (fileName) {
             const dir = (this.widgets.find(w => w.name === "directory")?.value || "").trim();
-            const resp = await api.fetchApi(`/flower-tools/get-file-content?directory=${encodeURIComponent(dir)}&filename=${encodeURIComponent(fileName)}`);
-            const data = await resp.json();
-            const lines = data.lines || [];
+            const fetchPage = async (offset, filter) => {
+                const qs = `directory=${encodeURIComponent(dir)}&filename=${encodeURIComponent(fileName)}&offset=${offset}&limit=${PAGE_SIZE}&filter=${encodeURIComponent(filter)}`;
+                const resp = await api.fetchApi(`/flower-tools/get-file-content?${qs}`);
+                return await resp.json();
+            };
 
             const overlay = document.createElement('div');
             Object.assign(overlay.style, { position: 'fixed', top: '0', left: '0', width: '100%', height: '100%', backgroundColor: 'rgba(0,0,0,0.85)', zIndex: '10000', display: 'flex', justifyContent: 'center', alignItems: 'center', backdropFilter: 'blur(6px)' });
@@ -267,20 +316,127 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
             Object.assign(listDiv.style, { flex: '1', overflowY: 'auto', padding: '0 10px 20px 10px' });
             dialog.appendChild(listDiv);
 
-            const render = (f) => {
-                listDiv.innerHTML = "";
-                lines.filter(l => l.toLowerCase().includes(f.toLowerCase())).forEach(line => {
+            // --- 分頁渲染：過濾交給後端，捲動到底部時再載入下一頁 ---
+            let currentFilter = "";
+            let nextOffset = 0;
+            let loading = false;
+            let generation = 0;
+
+            const appendLines = (lines) => {
+                const frag = document.createDocumentFragment();
+                lines.forEach(line => {
                     const item = document.createElement('div');
                     item.textContent = line; Object.assign(item.style, { padding: '15px', cursor: 'pointer', borderRadius: '8px', fontSize: '18px' });
                     item.onmouseover = () => item.style.backgroundColor = "#333"; item.onmouseout = () => item.style.backgroundColor = "transparent";
                     item.onclick = () => { updateCfg({ status: "selected", selected_line: line }); document.body.removeChild(overlay); };
-                    listDiv.appendChild(item);
+                    frag.appendChild(item);
                 });
+                listDiv.appendChild(frag);
+            };
+
+            const loadMore = async () => {
+                if (loading || nextOffset === null) return;
+                loading = true;
+                const gen = generation;
+                try {
+                    const data = await fetchPage(nextOffset, currentFilter);
+                    if (gen !== generation) return; // 搜尋字已變更，丟棄過期結果
+                    appendLines(data.lines || []);
+                    nextOffset = data.next_offset ?? null;
+                } catch (e) {
+                    console.error("Load lines failed:", e);
+                    nextOffset = null;
+                } finally {
+                    if (gen === generation) loading = false;
+                }
+                // 內容不足一頁高度時繼續載入
+                if (nextOffset !== null && listDiv.scrollHeight <= listDiv.clientHeight) loadMore();
+            };
+
+            const render = (f) => {
+                generation++;
+                currentFilter = f;
+                nextOffset = 0;
+                loading = false;
+                listDiv.innerHTML = "";
+                listDiv.scrollTop = 0;
+                loadMore();
             };
-            searchInput.oninput = (e) => render(e.target.value);
-            render(""); overlay.appendChild(dialog);
+
+            let searchTimer = null;
+            searchInput.oninput = (e) => {
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => render(e.target.value), 200);
+            };
+            listDiv.onscroll = () => {
+                if (listDiv.scrollTop + listDiv.clientHeight >= listDiv.scrollHeight - 200) loadMore();
+            };
+            overlay.appendChild(dialog);
             overlay.onclick = (e) => { if (e.target === overlay) document.body.removeChild(overlay); };
             document.body.appendChild(overlay); searchInput.focus();
+            render("");
+        };
+    };
+
+    const setupListOfStrings = (nodeType, nodeName) => {
+        if (nodeType.__flower_list_setup_done) return;
+        nodeType.__flower_list_setup_done = true;
+
+        // 可變數量的輸入槽: 最後一個槽被連上時自動補一個新的空槽
+        // string_1 ~ string_10 為固定文字欄位，從 string_11 起為動態槽；list_1 起皆可擴充
+        const DYNAMIC_SLOTS = [
+            { prefix: "string_", type: "STRING", base: 11 },
+            { prefix: "list_", type: "LIST", base: 1 },
+        ];
+
+        const ensureSpareSlots = (node) => {
+            if (!node.inputs) return;
+            for (const { prefix, type, base } of DYNAMIC_SLOTS) {
+                const slots = [];
+                node.inputs.forEach((inp) => {
+                    if (!inp.name?.startsWith(prefix)) return;
+                    const n = parseInt(inp.name.slice(prefix.length), 10);
+                    if (n >= base) slots.push({ inp, n });
+                });
+                slots.sort((a, b) => a.n - b.n);
+
+                // 移除多餘的未連接尾端槽，只保留一個空槽
+                while (slots.length >= 2) {
+                    const last = slots[slots.length - 1];
+                    const prev = slots[slots.length - 2];
+                    if (last.inp.link != null || prev.inp.link != null || last.n <= base) break;
+                    node.removeInput(node.inputs.indexOf(last.inp));
+                    slots.pop();
+                }
+
+                const last = slots[slots.length - 1];
+                if (!last || last.inp.link != null) {
+                    node.addInput(`${prefix}${last ? last.n + 1 : base}`, type);
+                }
+            }
+            node.setDirtyCanvas(true, true);
+        };
+
+        const onNodeCreated = nodeType.prototype.onNodeCreated;
+        nodeType.prototype.onNodeCreated = function () {
+            const r = onNodeCreated ? onNodeCreated.apply(this, arguments) : undefined;
+            ensureSpareSlots(this);
+            return r;
+        };
+
+        const onConfigure = nodeType.prototype.onConfigure;
+        nodeType.prototype.onConfigure = function () {
+            const r = onConfigure ? onConfigure.apply(this, arguments) : undefined;
+            ensureSpareSlots(this);
+            return r;
+        };
+
+        const onConnectionsChange = nodeType.prototype.onConnectionsChange;
+        nodeType.prototype.onConnectionsChange = function (type) {
+            const r = onConnectionsChange ? onConnectionsChange.apply(this, arguments) : undefined;
+            // type 1 = input
+            if (type === 1) ensureSpareSlots(this);
+            return r;
         };
     };
 
@@ -371,13 +527,19 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
         const MESSAGES = {
             INSTALLED: "✅ OpenCC is already installed! (OpenCC 已安裝)\n\nLocation info is printed in the server console.",
             CONFIRM_INSTALL: "⚠️ OpenCC not found. Install now? (這可能需要一點時間)\n\n未檢測到 OpenCC。是否立即安裝？\n\n檢查後台黑色視窗(Console)可看到即時進度。\nCheck your ComfyUI console for live progress.",
-            INSTALLING: "⏳ Installing... Please wait.\n\nCheck the console window for live progress.\n正在安裝... 請稍候。請查看後台黑色視窗以獲取即時進度。",
-            SUCCESS: "✅ Installation Successful! Please RESTART ComfyUI.\n\n安裝成功！請重新啟動 ComfyUI 以生效。\n\n",
-            SUCCESS_ALERT: "✅ Installation Successful! Please RESTART ComfyUI.",
+            INSTALLING: "⏳ Installing... Click the button again to cancel.\n正在安裝... 再按一次按鈕可取消。\n\n",
+            CONFIRM_CANCEL: "Cancel the running OpenCC installation?\n\n要取消正在進行的 OpenCC 安裝嗎？",
+            SUCCESS: "✅ Installation Successful! OpenCC is loaded, no restart needed.\n\n安裝成功！已自動載入，不需重新啟動 ComfyUI。\n\n",
+            SUCCESS_ALERT: "✅ Installation Successful! OpenCC is ready to use.",
+            RESTART: "✅ Installation Successful! Please RESTART ComfyUI.\n\n安裝成功！請重新啟動 ComfyUI 以生效。\n\n",
             FAILED: "❌ Installation Failed.\n\n安裝失敗。\n\n",
-            FAILED_ALERT: "❌ Installation Failed. See details in the result box."
+            FAILED_ALERT: "❌ Installation Failed. See details in the result box.",
+            CANCELLED: "⛔ Installation cancelled. (已取消安裝)\n\n"
         };
 
+        // 安裝紀錄只保留最後幾行顯示在結果框
+        const INSTALL_LOG_LINES = 200;
+
         // Helper function to update result widget with text
         const updateResultWidget = (widget, text) => {
             if (!widget) return;
@@ -387,6 +549,33 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
             }
         };
 
+        // pip 的輸出由後端逐行透過 websocket 推送 (job_id 對應到節點)
+        api.addEventListener("flower-tools.opencc-install", ({ detail }) => {
+            if (!detail || !app.graph) return;
+            for (const node of app.graph._nodes || []) {
+                if (node.comfyClass !== "FlowerCSTSConverter" || node.__flowerInstallJob !== detail.job_id) continue;
+                const resWidget = node.widgets?.find(w => w.name === "result_dialog");
+                if (!detail.done) {
+                    node.__flowerInstallLog.push(detail.line);
+                    if (node.__flowerInstallLog.length > INSTALL_LOG_LINES) node.__flowerInstallLog.shift();
+                    updateResultWidget(resWidget, MESSAGES.INSTALLING + node.__flowerInstallLog.join("\n"));
+                    continue;
+                }
+                node.__flowerInstallJob = null;
+                const log = node.__flowerInstallLog.join("\n");
+                if (detail.state === "succeeded") {
+                    window.alert(detail.loaded ? MESSAGES.SUCCESS_ALERT : MESSAGES.RESTART);
+                    updateResultWidget(resWidget, (detail.loaded ? MESSAGES.SUCCESS : MESSAGES.RESTART) + log);
+                } else if (detail.state === "cancelled") {
+                    updateResultWidget(resWidget, MESSAGES.CANCELLED + log);
+                } else {
+                    window.alert(MESSAGES.FAILED_ALERT);
+                    updateResultWidget(resWidget, MESSAGES.FAILED + log);
+                }
+                node.setDirtyCanvas(true);
+            }
+        });
+
         const onNodeCreated = nodeType.prototype.onNodeCreated;
         nodeType.prototype.onNodeCreated = function () {
             if (onNodeCreated) onNodeCreated.apply(this, arguments);
@@ -414,11 +603,25 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
             if (!this.widgets.find(w => w.name === "install_btn")) {
                 const btn = this.addWidget("button", "自動偵測並安裝 OPENCC", null, async () => {
                     try {
-                        // Check if OpenCC is already installed
-                        const checkResp = await api.fetchApi("/flower-tools/check-opencc");
-                        const checkData = await checkResp.json();
                         const resWidget = this.widgets.find(w => w.name === "result_dialog");
 
+                        // 安裝進行中: 再按一次為取消
+                        if (this.__flowerInstallJob) {
+                            const statusResp = await api.fetchApi(`/flower-tools/install-opencc/${this.__flowerInstallJob}`);
+                            const status = statusResp.ok ? await statusResp.json() : null;
+                            if (status && status.state === "running") {
+                                if (window.confirm(MESSAGES.CONFIRM_CANCEL)) {
+                                    await api.fetchApi(`/flower-tools/install-opencc/${this.__flowerInstallJob}/cancel`, { method: "POST" });
+                                }
+                                return;
+                            }
+                            this.__flowerInstallJob = null;
+                        }
+
+                        // Check if OpenCC is already installed (refresh=1: look again instead of the cached answer)
+                        const checkResp = await api.fetchApi("/flower-tools/check-opencc?refresh=1");
+                        const checkData = await checkResp.json();
+
                         if (checkData.installed) {
                             const locationMsg = checkData.location ? `\n\n安裝位置 / Installed at:\n${checkData.location}` : "";
                             const msg = `✅ OpenCC is already installed! (OpenCC 已安裝)${locationMsg}`;
@@ -427,24 +630,20 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
                             return;
                         }
 
-                        // Confirm installation
-                        if (!window.confirm(MESSAGES.CONFIRM_INSTALL)) return;
+                        // Confirm installation (an install started from another tab is followed instead)
+                        if (!checkData.job && !window.confirm(MESSAGES.CONFIRM_INSTALL)) return;
 
-                        // Show installing message
-                        updateResultWidget(resWidget, MESSAGES.INSTALLING);
-
-                        // Execute installation
+                        // Start the background install; log lines arrive over the websocket
                         const installResp = await api.fetchApi("/flower-tools/install-opencc", { method: "POST" });
-                        const installData = await installResp.json();
-
-                        // Handle result
-                        if (installData.success) {
-                            window.alert(MESSAGES.SUCCESS_ALERT);
-                            updateResultWidget(resWidget, MESSAGES.SUCCESS + installData.log);
-                        } else {
-                            window.alert(MESSAGES.FAILED_ALERT);
-                            updateResultWidget(resWidget, MESSAGES.FAILED + installData.log);
+                        const job = await installResp.json();
+                        this.__flowerInstallJob = job.job_id;
+                        this.__flowerInstallLog = [];
+                        if (!job.started) {
+                            // 加入已在執行的安裝時，先補上之前的紀錄
+                            const statusResp = await api.fetchApi(`/flower-tools/install-opencc/${job.job_id}?since=0`);
+                            if (statusResp.ok) this.__flowerInstallLog = (await statusResp.json()).log.slice(-INSTALL_LOG_LINES);
                         }
+                        updateResultWidget(resWidget, MESSAGES.INSTALLING + this.__flowerInstallLog.join("\n"));
                         this.setDirtyCanvas(true);
 
                     } catch (e) {
@@ -474,13 +673,123 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
         };
     };
 
+    // --- 效能分析面板 (/flower-tools/metrics) ---
+    const setupMetricsPanel = () => {
+        if (document.getElementById("flower-metrics-toggle")) return;
+
+        const toggle = document.createElement("button");
+        toggle.id = "flower-metrics-toggle";
+        toggle.textContent = "🌸 metrics";
+        toggle.title = "flower-tools 節點效能分析";
+        Object.assign(toggle.style, { position: "fixed", right: "12px", bottom: "12px", zIndex: "9999", padding: "3px 8px", fontSize: "11px", background: "#2a2a2a", color: "#ddd", border: "1px solid #555", borderRadius: "4px", cursor: "pointer", opacity: "0.7" });
+
+        const panel = document.createElement("div");
+        Object.assign(panel.style, { position: "fixed", right: "12px", bottom: "42px", zIndex: "9999", display: "none", minWidth: "520px", maxHeight: "50vh", overflow: "auto", padding: "10px", background: "#1e1e1e", color: "#ddd", border: "1px solid #555", borderRadius: "6px", fontSize: "12px", fontFamily: "monospace", boxShadow: "0 4px 16px rgba(0,0,0,0.5)" });
+
+        let timer = null;
+        const fmtBytes = (n) => n >= 1048576 ? `${(n / 1048576).toFixed(1)} MB` : n >= 1024 ? `${(n / 1024).toFixed(1)} KB` : `${n} B`;
+
+        const post = async (body) => {
+            await api.fetchApi("/flower-tools/metrics", { method: "POST", headers: { "Content-Type": "application/json" }, body: JSON.stringify(body) });
+            refresh();
+        };
+
+        const refresh = async () => {
+            let data;
+            try {
+                const resp = await api.fetchApi("/flower-tools/metrics");
+                data = await resp.json();
+            } catch (e) {
+                panel.textContent = "metrics unavailable: " + e;
+                return;
+            }
+
+            panel.innerHTML = "";
+            const header = document.createElement("div");
+            Object.assign(header.style, { display: "flex", gap: "6px", alignItems: "center", marginBottom: "8px" });
+            const title = document.createElement("b");
+            title.textContent = `Profiling: ${data.enabled ? "ON" : "OFF"}${data.memory ? " (+memory)" : ""}`;
+            title.style.flex = "1";
+            header.appendChild(title);
+            const addBtn = (label, body) => {
+                const b = document.createElement("button");
+                b.textContent = label;
+                b.onclick = () => post(body);
+                header.appendChild(b);
+            };
+            addBtn(data.enabled ? "Disable" : "Enable", { enabled: !data.enabled });
+            addBtn(data.memory ? "Memory off" : "Memory on", { memory: !data.memory });
+            addBtn("Reset", { reset: true });
+            addBtn("Clear memo", { memo_clear: true });
+            panel.appendChild(header);
+
+            // 結果快取 (memo) 省下的執行次數，不需開啟效能分析也會統計
+            const memoNames = Object.keys(data.memo || {}).filter(n => data.memo[n].saved_executions || data.memo[n].entries);
+            if (memoNames.length) {
+                const memo = document.createElement("div");
+                memo.style.marginBottom = "8px";
+                memo.textContent = "Memo saved: " + memoNames.map(n => {
+                    const m = data.memo[n];
+                    return `${n.replace(/^Flower/, "")} ${m.saved_executions}× (${m.saved_ms.toFixed(1)} ms)`;
+                }).join(", ");
+                panel.appendChild(memo);
+            }
+
+            const names = Object.keys(data.nodes);
+            if (!names.length) {
+                const empty = document.createElement("div");
+                empty.textContent = data.enabled ? "尚無資料，執行工作流程後會顯示。" : "效能分析已關閉 (Enable 開啟)。";
+                panel.appendChild(empty);
+                return;
+            }
+
+            const table = document.createElement("table");
+            table.style.borderCollapse = "collapse";
+            const cols = ["node", "calls", "avg ms", "max ms", "read", "cache hit", "peak mem"];
+            const tr = table.insertRow();
+            cols.forEach(c => { const th = document.createElement("th"); th.textContent = c; th.style.padding = "2px 8px"; th.style.textAlign = "left"; tr.appendChild(th); });
+            for (const name of names) {
+                const m = data.nodes[name];
+                const row = table.insertRow();
+                [
+                    name.replace(/^Flower/, ""),
+                    `${m.calls}${m.errors ? ` (${m.errors} err)` : ""}`,
+                    m.avg_ms.toFixed(2),
+                    m.max_ms.toFixed(2),
+                    fmtBytes(m.bytes_read),
+                    m.cache_hit_rate == null ? "-" : `${(m.cache_hit_rate * 100).toFixed(0)}%`,
+                    data.memory ? fmtBytes(m.peak_alloc_bytes) : "-",
+                ].forEach(v => { const td = row.insertCell(); td.textContent = v; td.style.padding = "2px 8px"; });
+            }
+            panel.appendChild(table);
+        };
+
+        toggle.onclick = () => {
+            const open = panel.style.display === "none";
+            panel.style.display = open ? "block" : "none";
+            clearInterval(timer);
+            if (open) {
+                refresh();
+                timer = setInterval(refresh, 2000);
+            }
+        };
+
+        document.body.appendChild(panel);
+        document.body.appendChild(toggle);
+    };
+
     app.registerExtension({
         name: "Flower.MultilinePromptSelector.V31",
+        async setup() {
+            setupMetricsPanel();
+        },
         async beforeRegisterNodeDef(nodeType, nodeData, app) {
             if (nodeData.name === TARGET_KEY) {
                 setupNode(nodeType, nodeData.name);
             } else if (nodeData.name === "FlowerKeywordReplacer") {
                 setupKeywordReplacer(nodeType, nodeData.name);
+            } else if (nodeData.name === "FlowerListOfStrings") {
+                setupListOfStrings(nodeType, nodeData.name);
             } else if (nodeData.name === "FlowerStringComparison") {
                 setupStringComparison(nodeType, nodeData.name);
             } else if (nodeData.name === "FlowerCSTSConverter") {
@@ -507,6 +816,11 @@ console.log("🌸🌸🌸 Flower Multiline Prompt Selector: The Final Solution V
    - %DATE           : 格式化日期 (依 DATE format)
    - %TIME           : 格式化時間 (依 TIME format)
    - %DATETIME       : 格式化日期時間 (依 DATETIME format)
+   - %COUNTER        : 流水號，依輸出目錄分開計數，不會重複
+   - %SEED           : seed 輸入的數值
+   - %PROMPT_HASH    : prompt 輸入的雜湊值 (預設 8 碼)
+   - 在 %COUNTER / %SEED 後加上 :N 可補零到 N 位 (如 %COUNTER:5 → 00042)，
+     %PROMPT_HASH:N 則取 N 碼雜湊
 
 2. 格式範例：
    - FullNameOut: %MainFolderName/%DATE-%SubFolderName/%FileName-%Suffix
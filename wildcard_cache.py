@@ -0,0 +1,178 @@
+"""
+Process-wide cache of parsed wildcard files.
+
+Every consumer of wildcard .txt files (the prompt selector node and the
+/flower-tools/* routes) reads lines through the shared `wildcard_cache`
+instance, so a file is only read from disk again when its mtime or size
+changes. Entries are evicted in LRU order once the memory budget is exceeded.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from .node_metrics import add_bytes_read
+
+# Memory budget in MB, overridable with the FLOWER_TOOLS_CACHE_MB environment variable
+DEFAULT_CACHE_MB = 256
+
+
+def read_wildcard_lines(path):
+    """
+    Read a wildcard file and return its non-empty, stripped lines.
+
+    Args:
+        path: Path to a UTF-8 .txt file
+
+    Returns:
+        List of stripped, non-empty lines
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+        add_bytes_read(os.fstat(f.fileno()).st_size)
+    return lines
+
+
+def _estimate_size(lines):
+    """Approximate memory held by a list of strings, in bytes."""
+    return sys.getsizeof(lines) + sum(sys.getsizeof(line) for line in lines)
+
+
+class WildcardCache:
+    """
+    Thread-safe LRU cache of wildcard line lists keyed by (path, mtime, size).
+    """
+
+    def __init__(self, max_bytes):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path -> (stat_key, lines, nbytes)
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        self._oversized = {}  # path -> stat_key of files read once that did not fit the budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_lines(self, path):
+        """
+        Return the parsed lines of a wildcard file, reading it only when needed.
+
+        The returned list is shared between callers and must not be mutated.
+
+        Args:
+            path: Path to the wildcard file
+
+        Returns:
+            List of stripped, non-empty lines
+
+        Raises:
+            OSError: If the file cannot be stat'ed or read
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Read outside the lock so a slow file does not block other lookups
+        lines = read_wildcard_lines(path)
+        nbytes = _estimate_size(lines)
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._total_bytes -= old[2]
+            # Files larger than the whole budget are returned but never cached;
+            # they are remembered so too_large() can send them to the line index
+            if nbytes <= self._max_bytes:
+                self._oversized.pop(path, None)
+                self._entries[path] = (key, lines, nbytes)
+                self._total_bytes += nbytes
+                self._evict()
+            else:
+                self._oversized[path] = key
+        return lines
+
+    def is_cached(self, path, st=None):
+        """Return True if a file's current contents are in the cache (without counting a lookup)."""
+        st = st or os.stat(path)
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+            return entry is not None and entry[0] == (st.st_mtime_ns, st.st_size)
+
+    def too_large(self, path, st=None):
+        """
+        Return True if a file cannot be held within the memory budget.
+
+        True when the file has more bytes than the whole budget, or when its
+        current contents were read before and did not fit.
+        """
+        st = st or os.stat(path)
+        with self._lock:
+            if st.st_size > self._max_bytes:
+                return True
+            return self._oversized.get(os.path.abspath(path)) == (st.st_mtime_ns, st.st_size)
+
+    def get_count(self, path):
+        """Return the number of non-empty lines in a wildcard file."""
+        return len(self.get_lines(path))
+
+    def invalidate(self, path=None):
+        """Drop one cached file, or every entry when `path` is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._oversized.clear()
+                self._total_bytes = 0
+                return
+            self._oversized.pop(os.path.abspath(path), None)
+            old = self._entries.pop(os.path.abspath(path), None)
+            if old is not None:
+                self._total_bytes -= old[2]
+
+    def set_max_bytes(self, max_bytes):
+        """Change the memory budget, evicting entries if it shrank."""
+        with self._lock:
+            self._max_bytes = max(0, int(max_bytes))
+            # A larger budget may now hold files that did not fit before
+            self._oversized.clear()
+            self._evict()
+
+    def stats(self):
+        """Return a JSON-serializable snapshot of the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _evict(self):
+        # Caller must hold self._lock
+        while self._total_bytes > self._max_bytes and self._entries:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self._total_bytes -= nbytes
+            self.evictions += 1
+
+
+def _budget_from_env():
+    try:
+        mb = float(os.environ.get("FLOWER_TOOLS_CACHE_MB", DEFAULT_CACHE_MB))
+    except ValueError:
+        mb = DEFAULT_CACHE_MB
+    return int(mb * 1024 * 1024)
+
+
+wildcard_cache = WildcardCache(_budget_from_env())
@@ -0,0 +1,187 @@
+"""
+Combinatorial composition for FlowerMultilinePromptSelector.
+
+In "cartesian" mode every enabled file is one dimension and a prompt is one
+line from each file, joined with a separator. The k-th combination is decoded
+from k in mixed radix (the last file varies fastest, like itertools.product),
+so neither the product nor any per-file list is ever built; a space of 10^12
+combinations costs the same as one of ten.
+
+Lines may also reference other wildcard files as __name__ (name.txt in the
+same directory, subfolders allowed). References are expanded recursively
+with a line picked deterministically from the seed; reference cycles raise
+instead of recursing forever.
+"""
+
+import os
+import re
+import zlib
+from functools import lru_cache
+
+from .wildcard_index import open_wildcard
+from .wildcard_selection import _M64, _mix64, permuted_index
+
+COMPOSE_MODES = ["pool", "cartesian"]
+
+# Nested references deeper than this are treated as a cycle
+MAX_REFERENCE_DEPTH = 32
+
+_REF_RE = re.compile(r"__([^\s_][^\s]*?)__")
+
+
+def _name_seed(name):
+    return zlib.crc32(name.encode("utf-8", "surrogateescape"))
+
+
+class CombinationSpace:
+    """
+    Mixed-radix view over the enabled files: one line per file per combination.
+
+    Args:
+        segments: Segments (see wildcard_selection.Segment) in dimension order
+        separator: Text placed between the lines of a combination
+    """
+
+    def __init__(self, segments, separator=", "):
+        self.segments = [seg for seg in segments if seg.size]
+        self.separator = separator
+        self.radices = [seg.size for seg in self.segments]
+        total = 1
+        for r in self.radices:
+            total *= r
+        # Python ints: exact for any number of dimensions
+        self.total = total if self.segments else 0
+        # "random" dimensions use a fixed permutation per file, so enumeration
+        # still visits every combination exactly once
+        self._dim_seeds = [_name_seed(seg.name) for seg in self.segments]
+
+    def digits(self, k):
+        """Decode k (wrapped modulo total) into one local line index per dimension."""
+        k %= self.total
+        out = [0] * len(self.radices)
+        for i in range(len(self.radices) - 1, -1, -1):
+            k, out[i] = divmod(k, self.radices[i])
+        return out
+
+    def _line(self, dim, digit):
+        seg = self.segments[dim]
+        if seg.status == "random":
+            digit = permuted_index(digit, seg.size, self._dim_seeds[dim])
+        return seg.lines[digit]
+
+    def _join(self, digits):
+        return self.separator.join(self._line(i, d) for i, d in enumerate(digits))
+
+    def combination(self, k):
+        """Return the k-th combination as text ("" when there are no dimensions)."""
+        if not self.total:
+            return ""
+        return self._join(self.digits(k))
+
+    def iter_range(self, start, stop):
+        """
+        Lazily yield (k, text) for k in range(start, stop).
+
+        Digits are decoded once and then advanced like an odometer, so each
+        further combination costs one carry step instead of a full decode.
+        """
+        if not self.total or stop <= start:
+            return
+        digits = self.digits(start)
+        radices = self.radices
+        for k in range(start, stop):
+            yield k, self._join(digits)
+            i = len(digits) - 1
+            while i >= 0:
+                digits[i] += 1
+                if digits[i] < radices[i]:
+                    break
+                digits[i] = 0
+                i -= 1
+
+
+@lru_cache(maxsize=4096)
+def _split_refs(line):
+    """Split a line into literal strings and reference names (memoized per line)."""
+    parts = []
+    pos = 0
+    for m in _REF_RE.finditer(line):
+        if m.start() > pos:
+            parts.append(line[pos:m.start()])
+        parts.append((m.group(1),))
+        pos = m.end()
+    if not parts:
+        return (line,)
+    if pos < len(line):
+        parts.append(line[pos:])
+    return tuple(parts)
+
+
+class WildcardReferenceError(ValueError):
+    """Raised when __name__ references form a cycle."""
+
+
+class ReferenceResolver:
+    """
+    Expands __name__ references against the wildcard files of a directory.
+
+    The line picked for a reference depends on the seed, the reference chain
+    and the occurrence in its line, so two __color__ in one prompt can differ
+    while the same seed always gives the same prompt. Target files are looked
+    up once per resolver and parsed lines are memoized.
+
+    Args:
+        base_dir: Directory the referenced .txt files live in
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = os.path.abspath(base_dir)
+        self._targets = {}  # name -> Sequence of lines, or None when missing
+
+    def _lines_for(self, name):
+        if name in self._targets:
+            return self._targets[name]
+        path = os.path.normpath(os.path.join(self.base_dir, name + ".txt"))
+        lines = None
+        # Only files inside base_dir can be referenced
+        if path.startswith(self.base_dir + os.sep) and os.path.isfile(path):
+            try:
+                lines = open_wildcard(path)
+            except OSError:
+                lines = None
+        self._targets[name] = lines or None
+        return self._targets[name]
+
+    def expand(self, text, seed):
+        """
+        Return `text` with every resolvable reference expanded.
+
+        Unknown references are left as they are.
+
+        Raises:
+            WildcardReferenceError: If references lead back to a file being expanded
+        """
+        if "__" not in text:
+            return text
+        return self._expand(text, seed & _M64, ())
+
+    def _expand(self, text, seed, chain):
+        parts = _split_refs(text)
+        if len(parts) == 1 and isinstance(parts[0], str):
+            return text
+        out = []
+        for occurrence, part in enumerate(parts):
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name = part[0]
+            lines = self._lines_for(name)
+            if lines is None:
+                out.append(f"__{name}__")
+                continue
+            if name in chain or len(chain) >= MAX_REFERENCE_DEPTH:
+                raise WildcardReferenceError("Wildcard reference cycle: " + " -> ".join(chain + (name,)))
+            child_seed = _mix64(seed ^ _name_seed(name) ^ (occurrence << 32))
+            line = lines[child_seed % len(lines)]
+            out.append(self._expand(line, child_seed, chain + (name,)))
+        return "".join(out)
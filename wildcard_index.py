@@ -0,0 +1,387 @@
+"""
+Byte-offset line index for very large wildcard files.
+
+Files above the index threshold are never loaded into memory. Instead a
+sidecar index holding the byte offset of every non-empty line is written to
+the index directory, and lines are read on demand by seeking straight to
+their offset. The sidecar records the source file's mtime and size and is
+rebuilt automatically when either changes.
+
+Sidecar layout:
+    8 bytes   magic b"FLIDX001"
+    3 x int64 source mtime_ns, source size, line count (little-endian)
+    N x uint64 byte offset of each non-empty line (native byte order)
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import Sequence
+
+from .node_metrics import add_bytes_read
+from .wildcard_cache import wildcard_cache
+
+_MAGIC = b"FLIDX001"
+_HEADER = struct.Struct("<8sqqq")
+
+# Files at least this large (in MB) are served through the line index instead of the cache
+DEFAULT_INDEX_MIN_MB = 16
+
+INDEX_DIR = os.environ.get(
+    "FLOWER_TOOLS_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".flower_cache", "index"),
+)
+
+
+def _threshold_from_env():
+    try:
+        mb = float(os.environ.get("FLOWER_TOOLS_INDEX_MIN_MB", DEFAULT_INDEX_MIN_MB))
+    except ValueError:
+        mb = DEFAULT_INDEX_MIN_MB
+    return int(mb * 1024 * 1024)
+
+
+INDEX_MIN_BYTES = _threshold_from_env()
+
+# A file neither cached nor indexed yet serves its first pages from at most
+# this many bytes (characters for cached files) at its start; see read_head
+HEAD_MAX_BYTES = 4 * 1024 * 1024
+
+
+def index_path_for(path):
+    """Return the sidecar index path used for a wildcard file."""
+    path = os.path.abspath(path)
+    digest = hashlib.sha1(path.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(INDEX_DIR, f"{digest}_{os.path.basename(path)}.idx")
+
+
+def _is_blank(raw):
+    """Match the str.strip() emptiness test used by read_wildcard_lines on raw bytes."""
+    stripped = raw.strip()
+    if not stripped:
+        return True
+    if stripped.isascii():
+        return False
+    # Non-ASCII lines may consist only of Unicode whitespace (e.g. U+3000)
+    return not raw.decode("utf-8", "replace").strip()
+
+
+def build_index(path):
+    """
+    Scan a wildcard file once and write its sidecar index.
+
+    Args:
+        path: Path to the wildcard file
+
+    Returns:
+        Path of the written index file
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    offsets = array("Q")
+
+    pos = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            if not _is_blank(raw):
+                offsets.append(pos)
+            pos += len(raw)
+    add_bytes_read(pos)
+
+    idx_path = index_path_for(path)
+    os.makedirs(os.path.dirname(idx_path), exist_ok=True)
+    tmp_path = f"{idx_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, st.st_mtime_ns, st.st_size, len(offsets)))
+        offsets.tofile(f)
+    # Atomic replace keeps existing mmaps of the old index valid
+    os.replace(tmp_path, idx_path)
+    return idx_path
+
+
+def _read_header(idx_path):
+    try:
+        with open(idx_path, "rb") as f:
+            data = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(data) != _HEADER.size:
+        return None
+    magic, mtime_ns, size, count = _HEADER.unpack(data)
+    if magic != _MAGIC:
+        return None
+    return mtime_ns, size, count
+
+
+def index_is_fresh(path, st=None):
+    """Return True if the sidecar index exists and matches the file's mtime and size."""
+    st = st or os.stat(path)
+    header = _read_header(index_path_for(path))
+    return header is not None and header[:2] == (st.st_mtime_ns, st.st_size)
+
+
+class IndexedLines(Sequence):
+    """
+    Read-only sequence of the non-empty, stripped lines of a wildcard file.
+
+    Offsets come from the memory-mapped sidecar; each line is fetched with a
+    positioned read (os.pread) so only the requested bytes are touched. The
+    data file itself is not mmapped, so a file truncated underneath us cannot
+    crash the process with SIGBUS.
+    """
+
+    _CHUNK = 4096
+
+    def __init__(self, path, idx_path):
+        self.path = path
+        self.idx_path = idx_path
+        self._mm = self._offsets = self._fd = None
+        with open(idx_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, self.mtime_ns, self.size, self._count = _HEADER.unpack_from(self._mm, 0)
+        self._offsets = memoryview(self._mm)[_HEADER.size:_HEADER.size + self._count * 8].cast("Q")
+        self._fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("line index out of range")
+
+        start = self._offsets[i]
+        end = self._offsets[i + 1] if i + 1 < self._count else self.size
+        # Fast path: the next non-empty line's offset bounds this one
+        if end - start <= self._CHUNK * 4:
+            raw = self._pread(end - start, start)
+            nl = raw.find(b"\n")
+            if nl != -1:
+                raw = raw[:nl]
+        else:
+            raw = self._read_until_newline(start)
+        return raw.decode("utf-8", "replace").strip()
+
+    def _pread(self, n, offset):
+        if hasattr(os, "pread"):
+            data = os.pread(self._fd, n, offset)
+        else:
+            # Windows has no pread; fall back to seek + read under a lock
+            with _PREAD_LOCK:
+                os.lseek(self._fd, offset, os.SEEK_SET)
+                data = os.read(self._fd, n)
+        add_bytes_read(len(data))
+        return data
+
+    def _read_until_newline(self, start):
+        parts = []
+        pos = start
+        while True:
+            chunk = self._pread(self._CHUNK, pos)
+            if not chunk:
+                break
+            nl = chunk.find(b"\n")
+            if nl != -1:
+                parts.append(chunk[:nl])
+                break
+            parts.append(chunk)
+            pos += len(chunk)
+        return b"".join(parts)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        try:
+            if self._offsets is not None:
+                self._offsets.release()
+            if self._mm is not None:
+                self._mm.close()
+        except (BufferError, ValueError):
+            pass
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+_PREAD_LOCK = threading.Lock()
+_open_lock = threading.Lock()
+_open_indexes = {}  # abspath -> IndexedLines
+
+
+def load_index(path, rebuild=False):
+    """
+    Return an IndexedLines view of a wildcard file, (re)building its sidecar if stale.
+
+    Args:
+        path: Path to the wildcard file
+        rebuild: Force a rebuild even if the sidecar looks fresh
+
+    Returns:
+        IndexedLines instance shared between callers
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+
+    with _open_lock:
+        current = _open_indexes.get(path)
+        if current is not None and not rebuild and (current.mtime_ns, current.size) == (st.st_mtime_ns, st.st_size):
+            return current
+
+    if rebuild or not index_is_fresh(path, st):
+        build_index(path)
+    view = IndexedLines(path, index_path_for(path))
+
+    with _open_lock:
+        # Old views are left for the garbage collector; callers may still hold them
+        _open_indexes[path] = view
+    return view
+
+
+def uses_index(path, st=None):
+    """
+    Return True if a file is served through the line index.
+
+    That is every file of at least INDEX_MIN_BYTES, and smaller ones the
+    in-memory cache cannot hold: caching them would fail on every read, so
+    each page request would scan the whole file again.
+    """
+    st = st or os.stat(path)
+    return st.st_size >= INDEX_MIN_BYTES or wildcard_cache.too_large(path, st)
+
+
+def open_wildcard(path):
+    """
+    Return the non-empty lines of a wildcard file as a sequence.
+
+    Small files come from the shared in-memory cache; files above
+    INDEX_MIN_BYTES, or too large for the cache, are served lazily from their
+    sidecar index.
+    """
+    if uses_index(path):
+        return load_index(path)
+    return wildcard_cache.get_lines(path)
+
+
+def count_lines(path):
+    """
+    Return the number of non-empty lines in a wildcard file.
+
+    Large files with a fresh sidecar are counted from the index header
+    without scanning the file.
+    """
+    st = os.stat(path)
+    if uses_index(path, st):
+        header = _read_header(index_path_for(path))
+        if header is not None and header[:2] == (st.st_mtime_ns, st.st_size):
+            return header[2]
+        return len(load_index(path))
+    return wildcard_cache.get_count(path)
+
+
+def is_ready(path, st=None):
+    """Return True if open_wildcard() can serve a file without scanning it (cached, or a fresh sidecar)."""
+    st = st or os.stat(path)
+    if not uses_index(path, st):
+        return wildcard_cache.is_cached(path, st)
+    with _open_lock:
+        current = _open_indexes.get(os.path.abspath(path))
+    if current is not None and (current.mtime_ns, current.size) == (st.st_mtime_ns, st.st_size):
+        return True
+    return index_is_fresh(path, st)
+
+
+def read_head(path, count, max_bytes=HEAD_MAX_BYTES):
+    """
+    Return the first `count` non-empty lines of a wildcard file, reading only its start.
+
+    Lines are split and stripped the way open_wildcard() will return them, so
+    a page served from here matches the same page served later from the
+    cache or the index.
+
+    Args:
+        path: Path to the wildcard file
+        count: Lines wanted
+        max_bytes: Stop reading after about this many bytes
+
+    Returns:
+        (lines, complete) where complete is True if the whole file was read,
+        or None if `count` lines are not within the first `max_bytes`
+    """
+    lines = []
+    read = 0
+    if uses_index(path):
+        with open(path, "rb") as f:
+            for raw in f:
+                read += len(raw)
+                if read > max_bytes:
+                    break
+                if not _is_blank(raw):
+                    lines.append(raw.decode("utf-8", "replace").strip())
+                    if len(lines) >= count:
+                        add_bytes_read(read)
+                        return lines, False
+            else:
+                add_bytes_read(read)
+                return lines, True
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                read += len(line)
+                if read > max_bytes:
+                    break
+                line = line.strip()
+                if line:
+                    lines.append(line)
+                    if len(lines) >= count:
+                        add_bytes_read(read)
+                        return lines, False
+            else:
+                add_bytes_read(read)
+                return lines, True
+    add_bytes_read(read)
+    return None
+
+
+_warm_lock = threading.Lock()
+_warming = {}  # abspath -> Event set when the background scan has finished
+
+
+def warm_in_background(path):
+    """
+    Build a file's sidecar index (or load it into the cache) on a daemon thread.
+
+    Only one scan per file runs at a time.
+
+    Returns:
+        Event set once the scan has finished; a caller that needs the whole
+        file can wait on it instead of scanning the file a second time
+    """
+    path = os.path.abspath(path)
+    with _warm_lock:
+        event = _warming.get(path)
+        if event is not None:
+            return event
+        event = _warming[path] = threading.Event()
+
+    def _scan():
+        try:
+            count_lines(path)
+        except Exception as e:
+            print(f"[flower-tools] background scan of {path} failed: {e}")
+        finally:
+            with _warm_lock:
+                _warming.pop(path, None)
+            event.set()
+
+    threading.Thread(target=_scan, name="flower-wildcard-warm", daemon=True).start()
+    return event
@@ -0,0 +1,278 @@
+"""
+Index-based selection engine for FlowerMultilinePromptSelector.
+
+Instead of concatenating every enabled file into one pool and indexing it,
+the selector describes each enabled file as a segment (a line count plus how
+to map a local index to a line). Prefix sums over the segment sizes resolve a
+global index to (segment, local index) with a binary search, so the cost of
+picking one prompt no longer grows with the size of the wildcard files.
+
+Batches (`SelectionPlan.pick_batch`) resolve all their indices together with
+NumPy when it is installed and fall back to a plain loop otherwise; both give
+the same lines as picking each seed separately.
+"""
+
+import bisect
+import random
+
+_M64 = 0xFFFFFFFFFFFFFFFF
+
+# Shuffle algorithms available for "random" files
+SHUFFLE_MODES = ["legacy", "fast"]
+
+
+def _mix64(x):
+    """splitmix64 finalizer, used as the Feistel round function."""
+    x = (x + 0x9E3779B97F4A7C15) & _M64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _M64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _M64
+    return x ^ (x >> 31)
+
+
+def permuted_index(k, n, seed, rounds=4):
+    """
+    Return the k-th element of a seeded pseudo-random permutation of range(n).
+
+    Uses a balanced Feistel network with cycle walking, so any single element
+    is computed in O(1) without building the permutation.
+
+    Args:
+        k: Position in the permutation (0 <= k < n)
+        n: Size of the permuted range
+        seed: Integer seed selecting the permutation
+        rounds: Number of Feistel rounds
+
+    Returns:
+        Index in range(n)
+    """
+    if n <= 1:
+        return 0
+    half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+    mask = (1 << half_bits) - 1
+    key = _mix64(seed & _M64)
+
+    x = k
+    while True:
+        left, right = x >> half_bits, x & mask
+        for r in range(rounds):
+            left, right = right, left ^ (_mix64(key ^ (r << 56) ^ right) & mask)
+        x = (left << half_bits) | right
+        # Cycle walking: the Feistel domain is at most 4n, so this ends quickly
+        if x < n:
+            return x
+
+
+def permuted_indices(ks, n, seeds, rounds=4):
+    """
+    Vectorized permuted_index: element-wise over NumPy uint64 arrays.
+
+    Args:
+        ks: uint64 array of positions (each < n)
+        n: Size of the permuted range
+        seeds: uint64 array of seeds, same shape as `ks`
+        rounds: Number of Feistel rounds
+
+    Returns:
+        uint64 array with permuted_index(ks[i], n, seeds[i]) at each position
+    """
+    np = _numpy()
+    ks = np.asarray(ks, dtype=np.uint64)
+    if n <= 1:
+        return np.zeros_like(ks)
+    half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+    shift = np.uint64(half_bits)
+    mask = np.uint64((1 << half_bits) - 1)
+    keys = _mix64_array(np, np.asarray(seeds, dtype=np.uint64))
+    round_keys = [np.uint64(r << 56) for r in range(rounds)]
+
+    out = ks.copy()
+    pending = np.arange(len(ks))
+    x = ks.copy()
+    while len(pending):
+        key = keys[pending]
+        left, right = x >> shift, x & mask
+        for rk in round_keys:
+            left, right = right, left ^ (_mix64_array(np, key ^ rk ^ right) & mask)
+        x = (left << shift) | right
+        # Cycle walking, as in permuted_index
+        done = x < np.uint64(n)
+        out[pending[done]] = x[done]
+        pending, x = pending[~done], x[~done]
+    return out
+
+
+def _mix64_array(np, x):
+    """_mix64 on a uint64 array (NumPy arithmetic wraps modulo 2**64)."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+_np = None
+
+
+def _numpy():
+    """Import NumPy on first use; returns None when it is not installed."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+
+def legacy_shuffle_index(k, n, seed):
+    """
+    Return which original index lands at position k after
+    `random.Random(seed).shuffle(list(range(n)))`.
+
+    Replays the Fisher-Yates swaps that shuffle() performs, but only tracks
+    displaced positions and stops as soon as position k is final, so no list
+    of lines is copied or shuffled.
+
+    Args:
+        k: Position in the shuffled list (0 <= k < n)
+        n: Length of the shuffled list
+        seed: Seed passed to random.Random
+
+    Returns:
+        Index in range(n)
+    """
+    if n <= 1:
+        return 0
+    randbelow = random.Random(seed)._randbelow
+    displaced = {}
+    for i in range(n - 1, 0, -1):
+        j = randbelow(i + 1)
+        if i == k:
+            # Position k is never touched again once i drops below it
+            return displaced.get(j, j)
+        vi = displaced.get(i, i)
+        displaced[i] = displaced.get(j, j)
+        displaced[j] = vi
+    return displaced.get(0, 0)
+
+
+class Segment:
+    """
+    One enabled wildcard file as seen by the selector.
+
+    Args:
+        name: File name, used for reporting
+        status: "selected", "ordered" or "random"
+        lines: Sequence of lines (or the single picked line for "selected")
+    """
+
+    __slots__ = ("name", "status", "lines", "size")
+
+    def __init__(self, name, status, lines):
+        self.name = name
+        self.status = status
+        self.lines = lines
+        self.size = len(lines)
+
+    def line_at(self, local_idx, seed, shuffle_mode="legacy"):
+        """Return the line at `local_idx` of this segment's (possibly shuffled) order."""
+        if self.status == "random":
+            if shuffle_mode == "fast":
+                local_idx = permuted_index(local_idx, self.size, seed)
+            else:
+                local_idx = legacy_shuffle_index(local_idx, self.size, seed)
+        return self.lines[local_idx]
+
+
+class SelectionPlan:
+    """
+    Prefix sums over segment sizes, mapping a global pool index to a line.
+    """
+
+    def __init__(self, segments):
+        self.segments = [seg for seg in segments if seg.size]
+        self.offsets = []
+        total = 0
+        for seg in self.segments:
+            self.offsets.append(total)
+            total += seg.size
+        self.total = total
+
+    def resolve(self, global_idx):
+        """
+        Map a global index to (segment, local index).
+
+        Args:
+            global_idx: Index into the virtual concatenated pool (wrapped modulo total)
+
+        Returns:
+            Tuple of (Segment, local index), or (None, -1) when the pool is empty
+        """
+        if not self.total:
+            return None, -1
+        global_idx %= self.total
+        pos = bisect.bisect_right(self.offsets, global_idx) - 1
+        return self.segments[pos], global_idx - self.offsets[pos]
+
+    def pick(self, process_idx, shuffle_mode="legacy"):
+        """Return the line the legacy global_pool[process_idx % len(global_pool)] would give."""
+        seg, local_idx = self.resolve(process_idx)
+        if seg is None:
+            return ""
+        return seg.line_at(local_idx, process_idx, shuffle_mode)
+
+    def pick_batch(self, seed, batch_size, continuous_processing=1, shuffle_mode="legacy"):
+        """
+        Return the lines for seeds seed .. seed + batch_size - 1.
+
+        Identical to calling pick(s // continuous_processing) for each seed.
+        Consecutive seeds share a process index when continuous_processing > 1,
+        so each distinct index is resolved only once.
+
+        Args:
+            seed: First seed of the batch
+            batch_size: Number of seeds
+            continuous_processing: Seeds per process index
+            shuffle_mode: "legacy" or "fast"
+
+        Returns:
+            List of batch_size lines
+        """
+        cp = max(1, continuous_processing)
+        first = seed // cp
+        last = (seed + batch_size - 1) // cp
+        # Position of each seed in the distinct process indices first..last
+        offset = seed % cp
+        if not self.total:
+            return [""] * batch_size
+
+        np = _numpy()
+        if np is None or last > _M64:
+            lines = [self.pick(p, shuffle_mode) for p in range(first, last + 1)]
+            return [lines[(offset + i) // cp] for i in range(batch_size)]
+
+        process = np.arange(last - first + 1, dtype=np.uint64) + np.uint64(first)
+        global_idx = process % np.uint64(self.total)
+        offsets = np.asarray(self.offsets, dtype=np.uint64)
+        seg_pos = np.searchsorted(offsets, global_idx, side="right") - 1
+        local = global_idx - offsets[seg_pos]
+
+        lines = np.empty(len(process), dtype=object)
+        for pos in np.unique(seg_pos).tolist():
+            seg = self.segments[pos]
+            hit = seg_pos == pos
+            idx = local[hit]
+            if seg.status == "random":
+                if shuffle_mode == "fast":
+                    idx = permuted_indices(idx, seg.size, process[hit])
+                else:
+                    # The Mersenne Twister cannot be vectorized; replay per index
+                    idx = [legacy_shuffle_index(k, seg.size, p)
+                           for k, p in zip(idx.tolist(), process[hit].tolist())]
+            if not isinstance(idx, list):
+                idx = idx.tolist()
+            seg_lines = seg.lines
+            lines[hit] = [seg_lines[i] for i in idx]
+
+        order = (np.arange(batch_size, dtype=np.uint64) + np.uint64(offset)) // np.uint64(cp)
+        return lines[order].tolist()
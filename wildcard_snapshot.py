@@ -0,0 +1,318 @@
+"""
+Compiled binary snapshots of wildcard directories.
+
+A snapshot packs every .txt file of a directory into one file that is
+memory-mapped read-only. Identical lines are stored once, and a line is
+read by looking up its string id and slicing the mmap, so no per-file
+Python lists are held. Every ComfyUI process on the host maps the same file
+and shares a single page-cached copy.
+
+Each snapshot records the mtime and size of every source file. It is rebuilt
+when a file changes, or when a file is added or removed.
+
+Layout (header little-endian, tables native byte order, sections 8-byte aligned):
+    header       magic b"FLSNAP01", file count, string count, total lines,
+                 offsets of the file table, line table, string table and blob
+    file table   per file: name string id, first line, line count, mtime_ns, size
+    line table   uint32 string id of every line, files concatenated in order
+    string table uint64 blob offset of every unique string, plus the blob end
+    blob         UTF-8 bytes of the unique strings (names and lines)
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+
+from .node_metrics import add_bytes_read
+
+_MAGIC = b"FLSNAP01"
+_HEADER = struct.Struct("<8sQQQQQQQ")
+_FILE_ENTRY = struct.Struct("=QQQqq")
+
+SNAPSHOT_DIR = os.environ.get(
+    "FLOWER_TOOLS_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".flower_cache", "snapshots"),
+)
+
+
+def snapshot_path_for(directory):
+    """Return the snapshot file used for a wildcard directory."""
+    directory = os.path.abspath(directory)
+    digest = hashlib.sha1(directory.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(SNAPSHOT_DIR, f"{digest}_{os.path.basename(directory) or 'root'}.flsnap")
+
+
+def scan_sources(directory):
+    """Return {name: (mtime_ns, size)} of the .txt files of a directory."""
+    sources = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.name.endswith(".txt"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if entry.is_file():
+                sources[entry.name] = (st.st_mtime_ns, st.st_size)
+    return sources
+
+
+def _align(pos):
+    return (pos + 7) & ~7
+
+
+def build_snapshot(directory):
+    """
+    Compile a wildcard directory into its snapshot file.
+
+    Lines are read with the same rules as the selector (UTF-8, stripped, blank
+    lines dropped). A file that cannot be decoded is recorded with no lines.
+
+    Returns:
+        Dictionary with the snapshot path, file/line/unique string counts,
+        snapshot size in bytes and build time in ms
+    """
+    start = time.perf_counter()
+    directory = os.path.abspath(directory)
+    sources = scan_sources(directory)
+    names = sorted(sources)
+
+    string_ids = {}
+    blob_offsets = array("Q")
+    blob_parts = []
+    blob_size = 0
+
+    def intern(data):
+        nonlocal blob_size
+        sid = string_ids.get(data)
+        if sid is None:
+            sid = string_ids[data] = len(blob_offsets)
+            blob_offsets.append(blob_size)
+            blob_parts.append(data)
+            blob_size += len(data)
+        return sid
+
+    entries = []
+    line_ids = array("I")
+    for name in names:
+        first = len(line_ids)
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        line_ids.append(intern(line.encode("utf-8")))
+            add_bytes_read(sources[name][1])
+        except (OSError, UnicodeDecodeError):
+            del line_ids[first:]
+        mtime_ns, size = sources[name]
+        entries.append((intern(name.encode("utf-8", "surrogateescape")), first, len(line_ids) - first, mtime_ns, size))
+    blob_offsets.append(blob_size)
+
+    file_table = _align(_HEADER.size)
+    line_table = _align(file_table + _FILE_ENTRY.size * len(entries))
+    string_table = _align(line_table + line_ids.itemsize * len(line_ids))
+    blob = _align(string_table + blob_offsets.itemsize * len(blob_offsets))
+
+    snap_path = snapshot_path_for(directory)
+    os.makedirs(os.path.dirname(snap_path), exist_ok=True)
+    tmp_path = f"{snap_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(entries), len(string_ids), len(line_ids), file_table, line_table, string_table, blob))
+        f.write(b"\0" * (file_table - f.tell()))
+        for entry in entries:
+            f.write(_FILE_ENTRY.pack(*entry))
+        f.write(b"\0" * (line_table - f.tell()))
+        line_ids.tofile(f)
+        f.write(b"\0" * (string_table - f.tell()))
+        blob_offsets.tofile(f)
+        f.write(b"\0" * (blob - f.tell()))
+        for part in blob_parts:
+            f.write(part)
+        total_bytes = f.tell()
+    # Atomic replace keeps processes that still map the old snapshot valid
+    os.replace(tmp_path, snap_path)
+
+    return {
+        "path": snap_path,
+        "files": len(entries),
+        "lines": len(line_ids),
+        "unique_strings": len(string_ids),
+        "bytes": total_bytes,
+        "build_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+class SnapshotLines(Sequence):
+    """Read-only lines of one file in a snapshot, decoded on access."""
+
+    __slots__ = ("_snap", "_first", "_count")
+
+    def __init__(self, snap, first, count):
+        self._snap = snap
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("line index out of range")
+        return self._snap.string(self._snap._line_ids[self._first + i])
+
+
+class WildcardSnapshot:
+    """
+    A memory-mapped snapshot of one wildcard directory.
+
+    Args:
+        directory: The wildcard directory the snapshot was compiled from
+        path: Snapshot file path
+    """
+
+    def __init__(self, directory, path):
+        self.directory = os.path.abspath(directory)
+        self.path = path
+        self._mm = None
+        self._views = []
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, n_files, n_strings, n_lines,
+         file_table, line_table, string_table, blob) = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a wildcard snapshot")
+        self._blob = blob
+        view = memoryview(self._mm)
+        self._line_ids = view[line_table:line_table + n_lines * 4].cast("I")
+        self._string_offsets = view[string_table:string_table + (n_strings + 1) * 8].cast("Q")
+        self._views = [view, self._line_ids, self._string_offsets]
+
+        self.files = {}  # name -> (first line, line count, mtime_ns, size)
+        for i in range(n_files):
+            name_id, first, count, mtime_ns, size = _FILE_ENTRY.unpack_from(self._mm, file_table + i * _FILE_ENTRY.size)
+            self.files[self.string(name_id)] = (first, count, mtime_ns, size)
+        self.line_count = n_lines
+        self.unique_strings = n_strings
+
+    def string(self, sid):
+        start = self._string_offsets[sid]
+        end = self._string_offsets[sid + 1]
+        return self._mm[self._blob + start:self._blob + end].decode("utf-8", "surrogateescape")
+
+    def names(self):
+        """Return the file names in ASCII order."""
+        return sorted(self.files)
+
+    def lines(self, name):
+        """Return the lines of one file as a sequence, or None if it is not in the snapshot."""
+        entry = self.files.get(name)
+        if entry is None:
+            return None
+        return SnapshotLines(self, entry[0], entry[1])
+
+    def sources(self):
+        return {name: (entry[2], entry[3]) for name, entry in self.files.items()}
+
+    def file_is_fresh(self, name, st=None):
+        """Return True if one source file still matches the snapshot."""
+        entry = self.files.get(name)
+        if entry is None:
+            return False
+        st = st or os.stat(os.path.join(self.directory, name))
+        return (entry[2], entry[3]) == (st.st_mtime_ns, st.st_size)
+
+    def close(self):
+        try:
+            for view in reversed(self._views):
+                view.release()
+            if self._mm is not None:
+                self._mm.close()
+        except (BufferError, ValueError):
+            pass
+
+    def __del__(self):
+        self.close()
+
+
+_lock = threading.Lock()
+_build_locks = {}
+_open_snapshots = {}  # directory -> WildcardSnapshot
+
+
+def open_snapshot(directory, rebuild=False):
+    """
+    Return the snapshot of a directory, (re)building it if any source changed.
+
+    Args:
+        directory: Wildcard directory
+        rebuild: Force a rebuild even if the snapshot looks fresh
+
+    Returns:
+        WildcardSnapshot instance shared between callers
+    """
+    directory = os.path.abspath(directory)
+    sources = scan_sources(directory)
+
+    with _lock:
+        current = _open_snapshots.get(directory)
+        if current is not None and not rebuild and current.sources() == sources:
+            return current
+        build_lock = _build_locks.setdefault(directory, threading.Lock())
+
+    with build_lock:
+        path = snapshot_path_for(directory)
+        snap = None
+        if os.path.exists(path):
+            try:
+                snap = WildcardSnapshot(directory, path)
+            except (OSError, ValueError, struct.error):
+                snap = None
+        if rebuild or snap is None or snap.sources() != sources:
+            if snap is not None:
+                snap.close()
+            build_snapshot(directory)
+            snap = WildcardSnapshot(directory, path)
+
+    with _lock:
+        # Old snapshots are left for the garbage collector; callers may still hold them
+        _open_snapshots[directory] = snap
+    return snap
+
+
+def cached_snapshot_lines(directory, name):
+    """
+    Return a file's lines from an existing, up-to-date snapshot, or None.
+
+    Never builds: used by routes to prefer a compiled snapshot when one exists.
+    """
+    directory = os.path.abspath(directory)
+    with _lock:
+        snap = _open_snapshots.get(directory)
+    if snap is None:
+        path = snapshot_path_for(directory)
+        if not os.path.exists(path):
+            return None
+        try:
+            snap = WildcardSnapshot(directory, path)
+        except (OSError, ValueError, struct.error):
+            return None
+        with _lock:
+            snap = _open_snapshots.setdefault(directory, snap)
+    try:
+        if not snap.file_is_fresh(name):
+            return None
+    except OSError:
+        return None
+    return snap.lines(name)
@@ -0,0 +1,339 @@
+"""
+Background watcher for wildcard directories.
+
+Directories used by FlowerMultilinePromptSelector (by the node or the
+list-files route) are registered here. A single daemon thread keeps their
+.txt listing up to date, refreshes line counts and cached contents of files
+that change, and reports each change as a delta to a listener (the selector
+module forwards it to the browser with PromptServer.send_sync).
+
+On Linux, inotify is used through ctypes so changes are seen immediately.
+Everywhere else, and for directories inotify cannot watch, the directory is
+rescanned every FLOWER_TOOLS_WATCH_INTERVAL seconds. Network mounts do not
+deliver inotify events for remote writes, so inotify-watched directories are
+also rescanned every FLOWER_TOOLS_WATCH_RESCAN seconds, and the list-files
+route (the node's Refresh button) always rescans. Set
+FLOWER_TOOLS_WATCH_MODE=poll to poll network mounts at the shorter interval.
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from .wildcard_cache import wildcard_cache
+from .wildcard_index import count_lines
+
+# auto (inotify when available, else poll) | inotify | poll | off
+WATCH_MODE = os.environ.get("FLOWER_TOOLS_WATCH_MODE", "auto").strip().lower()
+
+try:
+    POLL_INTERVAL = max(0.1, float(os.environ.get("FLOWER_TOOLS_WATCH_INTERVAL", 2.0)))
+except ValueError:
+    POLL_INTERVAL = 2.0
+
+# Safety-net rescan of inotify-watched directories in seconds (0 disables)
+try:
+    RESCAN_INTERVAL = max(0.0, float(os.environ.get("FLOWER_TOOLS_WATCH_RESCAN", 30.0)))
+except ValueError:
+    RESCAN_INTERVAL = 30.0
+
+# Oldest directories stop being watched beyond this many
+MAX_WATCHED_DIRS = 64
+
+# inotify event masks (see <sys/inotify.h>)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_WATCH_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+                  | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_IN_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal ctypes binding for Linux inotify; raises OSError when unavailable."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        # Imported here: ctypes is only needed once a directory is actually watched
+        import ctypes
+
+        self._ctypes = ctypes
+        # CDLL(None) resolves symbols from the running process (libc included)
+        # without ctypes.util.find_library, which shells out to ldconfig
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path):
+        wd = self._add_watch(self.fd, os.fsencode(path), _IN_WATCH_MASK)
+        if wd < 0:
+            raise OSError(self._ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def rm_watch(self, wd):
+        self._rm_watch(self.fd, wd)
+
+    def read_wds(self):
+        """Drain pending events and return the set of watch descriptors that fired."""
+        wds = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return wds
+            if not data:
+                return wds
+            pos = 0
+            while pos + _IN_EVENT.size <= len(data):
+                wd, _, _, name_len = _IN_EVENT.unpack_from(data, pos)
+                wds.add(wd)
+                pos += _IN_EVENT.size + name_len
+
+
+def _scan(directory):
+    """Return {name: (mtime_ns, size)} for the .txt files of a directory."""
+    entries = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.name.endswith(".txt"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries[entry.name] = (st.st_mtime_ns, st.st_size)
+    return entries
+
+
+class WildcardWatcher:
+    """
+    Keeps the .txt listing of registered directories current and reports deltas.
+
+    Args:
+        mode: "auto", "inotify", "poll" or "off"
+        interval: Polling interval in seconds
+        rescan_interval: Seconds between rescans of inotify-watched directories
+            (inotify misses remote writes on network mounts); 0 disables
+    """
+
+    def __init__(self, mode=WATCH_MODE, interval=POLL_INTERVAL, rescan_interval=RESCAN_INTERVAL):
+        self.mode = mode
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._rescan_lock = threading.Lock()  # one rescan at a time (watcher thread or refresh)
+        self._dirs = {}  # abspath -> {name: (mtime_ns, size)}
+        self._wds = {}  # wd -> abspath
+        self._dir_wds = {}  # abspath -> wd
+        self._dirty = set()
+        self._listener = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._inotify = None
+        self.scans = 0
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def set_listener(self, listener):
+        """Register `listener(delta)`, called from the watcher thread for every change."""
+        self._listener = listener
+
+    def list_txt_files(self, directory, refresh=False):
+        """
+        Return the sorted .txt files of a directory, watching it from now on.
+
+        The first call scans the directory; later calls return the watched
+        listing without touching the disk.
+
+        Args:
+            directory: Directory to list
+            refresh: Rescan a watched directory first (reporting any changes),
+                for changes the watcher cannot see such as remote writes
+
+        Raises:
+            FileNotFoundError: If the directory does not exist
+        """
+        path = os.path.abspath(directory)
+        with self._lock:
+            state = self._dirs.get(path)
+        if state is not None:
+            if not refresh:
+                return sorted(state)
+            self._rescan(path)
+            with self._lock:
+                state = self._dirs.get(path)
+            if state is not None:
+                return sorted(state)
+            raise FileNotFoundError(directory)
+
+        state = _scan(path)
+        if not self.enabled:
+            return sorted(state)
+
+        with self._lock:
+            if path not in self._dirs:
+                self._dirs[path] = state
+                self._evict_locked()
+                self._ensure_thread_locked()
+                self._add_watch_locked(path)
+            return sorted(self._dirs[path])
+
+    def watched(self):
+        """Return the directories currently being watched."""
+        with self._lock:
+            return list(self._dirs)
+
+    def unwatch(self, directory):
+        path = os.path.abspath(directory)
+        with self._lock:
+            self._dirs.pop(path, None)
+            self._remove_watch_locked(path)
+
+    def stop(self):
+        self._stop.set()
+
+    # --- internals -------------------------------------------------------
+
+    def _evict_locked(self):
+        while len(self._dirs) > MAX_WATCHED_DIRS:
+            oldest = next(iter(self._dirs))
+            del self._dirs[oldest]
+            self._remove_watch_locked(oldest)
+
+    def _ensure_thread_locked(self):
+        if self._thread is not None:
+            return
+        if self.mode in ("auto", "inotify"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+        self._thread = threading.Thread(target=self._run, name="flower-wildcard-watcher", daemon=True)
+        self._thread.start()
+
+    def _add_watch_locked(self, path):
+        if self._inotify is None:
+            return
+        try:
+            wd = self._inotify.add_watch(path)
+        except OSError:
+            return  # this directory falls back to polling
+        self._wds[wd] = path
+        self._dir_wds[path] = wd
+
+    def _remove_watch_locked(self, path):
+        wd = self._dir_wds.pop(path, None)
+        if wd is not None:
+            self._wds.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.rm_watch(wd)
+
+    def _run(self):
+        next_poll = time.monotonic() + self.interval
+        next_rescan = time.monotonic() + self.rescan_interval
+        while not self._stop.is_set():
+            timeout = max(0.0, next_poll - time.monotonic())
+            if self._inotify is not None:
+                ready, _, _ = select.select([self._inotify.fd], [], [], timeout)
+                if ready:
+                    # Let a burst of writes settle before rescanning
+                    time.sleep(0.05)
+                    with self._lock:
+                        wds = self._inotify.read_wds()
+                        if -1 in wds:
+                            # IN_Q_OVERFLOW: events were dropped, rescan everything
+                            self._dirty.update(self._dirs)
+                        self._dirty.update(self._wds[wd] for wd in wds if wd in self._wds)
+            else:
+                self._stop.wait(timeout)
+
+            with self._lock:
+                targets = set(self._dirty)
+                self._dirty.clear()
+                if time.monotonic() >= next_poll:
+                    # Directories without an inotify watch are polled
+                    targets.update(p for p in self._dirs if p not in self._dir_wds)
+                    next_poll = time.monotonic() + self.interval
+                if self.rescan_interval and self._dir_wds and time.monotonic() >= next_rescan:
+                    # inotify sees no remote writes on network mounts; rescan those too now and then
+                    targets.update(self._dir_wds)
+                    next_rescan = time.monotonic() + self.rescan_interval
+
+            for path in targets:
+                try:
+                    self._rescan(path)
+                except Exception as e:
+                    print(f"[flower-tools] watcher failed on {path}: {e}")
+
+    def _rescan(self, path):
+        with self._rescan_lock:
+            self._rescan_locked(path)
+
+    def _rescan_locked(self, path):
+        self.scans += 1
+        with self._lock:
+            old = self._dirs.get(path)
+        if old is None:
+            return
+
+        try:
+            new = _scan(path)
+        except OSError:
+            # Directory vanished: report everything as removed and stop watching
+            self.unwatch(path)
+            for name in old:
+                wildcard_cache.invalidate(os.path.join(path, name))
+            self._emit({"directory": path, "added": [], "modified": [], "removed": sorted(old), "missing": True})
+            return
+
+        removed = sorted(set(old) - set(new))
+        changed = sorted(name for name, key in new.items() if old.get(name) != key)
+        if not removed and not changed:
+            return
+
+        for name in removed:
+            wildcard_cache.invalidate(os.path.join(path, name))
+
+        added, modified = [], []
+        for name in changed:
+            try:
+                # Re-reads the file into the shared cache (or refreshes its line index)
+                count = count_lines(os.path.join(path, name))
+            except (OSError, ValueError) as e:
+                # Unreadable or not UTF-8: skip the file but still record the new listing,
+                # otherwise the directory would fail again on every later event
+                print(f"[flower-tools] watcher skipped {os.path.join(path, name)}: {e}")
+                continue
+            (modified if name in old else added).append({"name": name, "count": count})
+
+        with self._lock:
+            if path in self._dirs:
+                self._dirs[path] = new
+        self._emit({"directory": path, "added": added, "modified": modified, "removed": removed})
+
+    def _emit(self, delta):
+        if self._listener is None:
+            return
+        try:
+            self._listener(delta)
+        except Exception as e:
+            print(f"[flower-tools] watcher listener failed: {e}")
+
+
+wildcard_watcher = WildcardWatcher()